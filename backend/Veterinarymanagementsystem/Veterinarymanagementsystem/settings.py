@@ -55,6 +55,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'Vetmanagementsystem.metrics.MetricsMiddleware',
+    # Streams exports and downloads chunk by chunk under ASGI (see
+    # Vetmanagementsystem/streaming.py); a no-op under WSGI.
+    'Vetmanagementsystem.streaming.AsyncStreamingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -108,11 +112,17 @@ WSGI_APPLICATION = 'Veterinarymanagementsystem.wsgi.application'
 database_url = (os.getenv("DATABASE_URL") or "").strip()
 database_scheme = urlparse(database_url).scheme if database_url else ""
 
+# "wsgi" (default) or "asgi"; gunicorn.conf.py picks the worker class
+# from the same variable.
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi").strip().lower()
+
 if database_url and database_scheme:
     DATABASES = {
         "default": dj_database_url.config(
             default=database_url,
-            conn_max_age=600,
+            # Under ASGI each request runs in a fresh thread, so
+            # persistent per-thread connections would pile up.
+            conn_max_age=0 if SERVER_MODE == "asgi" else 600,
             ssl_require=True,
         )
     }
@@ -120,7 +130,10 @@ else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH") or BASE_DIR / "db.sqlite3",
+            # Take the write lock at BEGIN so check-then-insert blocks
+            # (e.g. appointment overlap checks) cannot interleave.
+            "OPTIONS": {"transaction_mode": "IMMEDIATE"},
         }
     }
 
@@ -172,23 +185,127 @@ AUTH_USER_MODEL = 'Vetmanagementsystem.CustomUser'
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Content-addressed patient photos (see Vetmanagementsystem/photos.py)
+PATIENT_PHOTO_ROOT = MEDIA_ROOT / "photos"
+PATIENT_PHOTO_SIZES = (96, 320)
+
+# Background jobs (see Vetmanagementsystem/jobs.py, run with
+# `manage.py run_workers`). Running jobs whose worker has not renewed
+# its lease for JOBS_LEASE_SECONDS are queued again.
+JOBS_WORKER_THREADS = int(os.getenv("JOBS_WORKER_THREADS", "4"))
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BASE_SECONDS = 10
+JOBS_RETRY_MAX_SECONDS = 3600
+JOBS_LEASE_SECONDS = int(os.getenv("JOBS_LEASE_SECONDS", "300"))
+JOBS_OUTPUT_ROOT = MEDIA_ROOT / "jobs"
+
+# Patient photo thumbnails are rendered by a job; PatientPhotoView
+# renders any that are still missing when first requested.
+PATIENT_PHOTO_THUMBNAILS_IN_BACKGROUND = os.getenv("PATIENT_PHOTO_THUMBNAILS_IN_BACKGROUND", "True").lower() == "true"
+
+# Document files and resumable uploads (see Vetmanagementsystem/documents.py).
+# DOCUMENT_SENDFILE hands download bytes to the web server:
+# "x-accel-redirect" for nginx (an internal location at
+# DOCUMENT_ACCEL_PREFIX aliased to MEDIA_ROOT) or "x-sendfile" for Apache.
+DOCUMENT_UPLOAD_ROOT = MEDIA_ROOT / "uploads"
+DOCUMENT_MAX_BYTES = int(os.getenv("DOCUMENT_MAX_BYTES", str(512 * 1024 * 1024)))
+DOCUMENT_SENDFILE = os.getenv("DOCUMENT_SENDFILE", "")
+DOCUMENT_ACCEL_PREFIX = os.getenv("DOCUMENT_ACCEL_PREFIX", "/protected-media/")
+
+# Follow-up and appointment reminders (see Vetmanagementsystem/reminders.py,
+# run with `manage.py send_reminders` or the "reminders.run" job).
+# REMINDER_SENDER is the dotted path of the sender class; the default
+# writes one JSON line per message under REMINDER_OUTBOX.
+REMINDER_FOLLOW_UP_LEAD_DAYS = int(os.getenv("REMINDER_FOLLOW_UP_LEAD_DAYS", "2"))
+REMINDER_APPOINTMENT_LEAD_HOURS = int(os.getenv("REMINDER_APPOINTMENT_LEAD_HOURS", "24"))
+REMINDER_SENDER = os.getenv("REMINDER_SENDER", "Vetmanagementsystem.reminders.FileSender")
+REMINDER_OUTBOX = Path(os.getenv("REMINDER_OUTBOX", str(MEDIA_ROOT / "outbox")))
+REMINDER_BATCH_SIZE = 1000
+REMINDER_MAX_ATTEMPTS = 3
+REMINDER_SENDING_TIMEOUT_SECONDS = 600
+
 
 from datetime import timedelta
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'Vetmanagementsystem.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'Vetmanagementsystem.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'Vetmanagementsystem.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'Vetmanagementsystem.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'Vetmanagementsystem.serializers.ClaimsTokenRefreshSerializer',
+    'TOKEN_USER_CLASS': 'Vetmanagementsystem.authentication.ClaimsUser',
+}
+
+# Revoked tokens are re-read from the database at most this often per process
+AUTH_DENYLIST_CACHE_SECONDS = 30
+
+# Appointment scheduling (see Vetmanagementsystem/scheduling.py).
+# Days are weekday numbers, Monday = 0; times are in TIME_ZONE.
+CLINIC_HOURS = {"open": "09:00", "close": "17:00", "days": [0, 1, 2, 3, 4, 5]}
+APPOINTMENT_SLOT_MINUTES = 15
+APPOINTMENT_MAX_MINUTES = 480
+APPOINTMENT_AVAILABILITY_MAX_DAYS = 31
+
+# Vitals time series (see Vetmanagementsystem/timeseries.py): longer
+# histories are downsampled to at most this many points per response.
+VITALS_SERIES_MAX_POINTS = 1000
+
+# Revenue reports (see Vetmanagementsystem/revenue.py) read the
+# RevenueRollup table; this caps the months one request may span.
+REVENUE_REPORT_MAX_MONTHS = 120
+
+# Async dashboard/overview (Vetmanagementsystem/async_views.py), on by
+# default in the ASGI profile. Fan-out reads use this many threads,
+# each holding one database connection.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", str(SERVER_MODE == "asgi")).lower() == "true"
+DB_FANOUT_WORKERS = int(os.getenv("DB_FANOUT_WORKERS", "8"))
+
+# Request timings and /metrics (see Vetmanagementsystem/metrics.py).
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py)
+# lets one scrape cover every worker.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+
+# Rendered GET responses (see Vetmanagementsystem/response_cache.py).
+# Local memory is per process: with several workers, set
+# RESPONSE_CACHE_DIR to a shared directory so invalidations reach all.
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() == "true"
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_SECONDS = 300
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", "")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": (
+        {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": RESPONSE_CACHE_DIR,
+            "OPTIONS": {"MAX_ENTRIES": 20000},
+        }
+        if RESPONSE_CACHE_DIR
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "responses",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    ),
 }
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -30,7 +30,7 @@ from Vetmanagementsystem.auth_views import (
     ClientLoginView,
     DoctorRegistrationView,
     DoctorLoginView,
-    
+    LogoutView,
 )
 
 urlpatterns = [
@@ -42,6 +42,7 @@ urlpatterns = [
     path('api/login/', ClientLoginView.as_view(), name='api-login'),
     path('api/doctor/register/', DoctorRegistrationView.as_view(), name='api-doctor-register'),
     path('api/doctor/login/', DoctorLoginView.as_view(), name='api-doctor-login'),
+    path('api/logout/', LogoutView.as_view(), name='api-logout'),
 
     # JWT token endpoints
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class VetmanagementsystemConfig(AppConfig):
     name = 'Vetmanagementsystem'
+
+    def ready(self):
+        from . import metrics, signals  # noqa: F401
+
+        connection_created.connect(metrics.install, dispatch_uid="vetms-metrics-install")
@@ -0,0 +1,263 @@
+# Vetmanagementsystem/async_views.py
+"""
+Async versions of the dashboard and customer overview, routed instead
+of the DRF views when settings.ASYNC_VIEWS is on (the ASGI profile).
+
+DRF views are sync-only, so these are plain Django async views that
+reuse DRF authentication and JSON rendering for identical responses.
+"""
+import asyncio
+import contextvars
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import counters
+from .models import DashboardCounter, Patient
+from .renderers import TimedJSONRenderer
+from .serializers import PatientOverviewSerializer
+from .views import _client_id_for_user, _overview_prefetches, _overview_scope
+
+
+_executor = None
+
+
+def _fanout_executor():
+    """
+    Dedicated threads for concurrent reads. Each keeps its own
+    connection open between requests, so the pool doubles as a
+    small fixed-size connection pool.
+    """
+
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.DB_FANOUT_WORKERS,
+            thread_name_prefix="db-fanout",
+        )
+
+    return _executor
+
+
+def _fetch(queryset):
+
+    if connection.connection is not None and not connection.is_usable():
+        connection.close()
+
+    return list(queryset)
+
+
+async def gather_querysets(querysets):
+    """Evaluate independent querysets concurrently: {name: [rows]}."""
+
+    loop = asyncio.get_running_loop()
+    # run_in_executor does not carry contextvars over; copying them
+    # keeps the queries attributed to this request's timings.
+    results = await asyncio.gather(*(
+        loop.run_in_executor(_fanout_executor(), contextvars.copy_context().run, _fetch, queryset)
+        for queryset in querysets.values()
+    ))
+
+    return dict(zip(querysets, results))
+
+
+# ============================================================
+# REQUEST / RESPONSE
+# ============================================================
+
+def _json(data, status_code=200):
+    return HttpResponse(
+        TimedJSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+    )
+
+
+def _authenticate(request):
+    """
+    (user, failure, WWW-Authenticate value) as DRF's APIView sees them;
+    failure is the AuthenticationFailed raised, if any.
+    """
+
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    authenticators = drf_request.authenticators
+    header = authenticators[0].authenticate_header(drf_request) if authenticators else None
+
+    try:
+        return drf_request.user, None, header
+    except exceptions.AuthenticationFailed as exc:
+        return None, exc, header
+
+
+async def authenticated_user(request):
+    """The DRF-authenticated user, or an error response."""
+
+    user, failure, header = await sync_to_async(_authenticate)(request)
+
+    if failure is not None:
+        detail = failure.detail if isinstance(failure.detail, (list, dict)) else {"detail": failure.detail}
+    elif not user or not user.is_authenticated:
+        detail = {"detail": exceptions.NotAuthenticated.default_detail}
+    else:
+        return user, None
+
+    # As APIView.handle_exception: without a scheme to name, 401 becomes 403.
+    if header is None:
+        return None, _json(detail, status.HTTP_403_FORBIDDEN)
+
+    response = _json(detail, status.HTTP_401_UNAUTHORIZED)
+    response["WWW-Authenticate"] = header
+
+    return None, response
+
+
+# ============================================================
+# DASHBOARD
+# ============================================================
+
+class AsyncDashboardView(View):
+
+    async def get(self, request):
+
+        user, error = await authenticated_user(request)
+
+        if error:
+            return error
+
+        if user.is_staff:
+            client_id = None
+            dashboard_for = "doctor"
+        else:
+            client_id = await sync_to_async(_client_id_for_user)(user)
+
+            if not client_id:
+                return _json({"detail": "Client not found"}, status.HTTP_404_NOT_FOUND)
+
+            dashboard_for = "client"
+
+        counter = await DashboardCounter.objects.filter(
+            key=DashboardCounter.key_for(client_id)
+        ).afirst()
+
+        if counter is None:
+            counter = await sync_to_async(counters.rebuild)(client_id)
+
+        return _json({
+            "dashboard_for": dashboard_for,
+            "patients_count": counter.patients_count,
+            "appointments_count": counter.appointments_count,
+            "receipts_count": counter.receipts_count,
+            "receipts_total": counter.receipts_total,
+        })
+
+
+# ============================================================
+# CUSTOMER OVERVIEW
+# ============================================================
+
+def _relation_chain(path):
+    """Reverse relations along a prefetch path, e.g. visits__vitals."""
+
+    model = Patient
+    chain = []
+
+    for part in path.split("__"):
+        rel = model._meta.get_field(part)
+        chain.append(rel)
+        model = rel.related_model
+
+    return chain
+
+
+def _overview_querysets(patient_filter):
+    """
+    The patient query plus one query per overview relation, each
+    filtered by the patient scope directly (visit__patient__client_id,
+    ...) instead of by parent ids, so none waits for another.
+    """
+
+    querysets = {"": Patient.objects.filter(**patient_filter).select_related("summary").order_by("name", "id")}
+
+    for prefetch in _overview_prefetches():
+        prefix = ""
+        for rel in _relation_chain(prefetch.prefetch_through):
+            prefix = f"{rel.field.name}__{prefix}"
+
+        querysets[prefetch.prefetch_through] = prefetch.queryset.filter(
+            **{prefix + key: value for key, value in patient_filter.items()}
+        )
+
+    return querysets
+
+
+def _attach(parent, rel, children):
+    # Same cache prefetch_related fills, so serializers read it as-is.
+    queryset = getattr(parent, rel.get_accessor_name()).get_queryset()
+    queryset._result_cache = children
+    queryset._prefetch_done = True
+    parent._prefetched_objects_cache[rel.cache_name] = queryset
+
+
+def _stitch(rows):
+
+    for path in sorted(rows, key=lambda item: item.count("__") if item else -1):
+
+        if not path:
+            continue
+
+        rel = _relation_chain(path)[-1]
+        parent_path = path.rpartition("__")[0]
+        grouped = defaultdict(list)
+
+        for child in rows[path]:
+            grouped[getattr(child, rel.field.attname)].append(child)
+
+        for parent in rows[parent_path]:
+            if not hasattr(parent, "_prefetched_objects_cache"):
+                parent._prefetched_objects_cache = {}
+
+            children = grouped.get(parent.pk, [])
+
+            for child in children:
+                rel.field.set_cached_value(child, parent)
+
+            _attach(parent, rel, children)
+
+    return rows[""]
+
+
+class AsyncOverviewCustomerView(View):
+
+    async def get(self, request):
+
+        user, error = await authenticated_user(request)
+
+        if error:
+            return error
+
+        client_id, patient_filter, error = await sync_to_async(_overview_scope)(user, request.GET)
+
+        if error:
+            return _json({"detail": error[1]}, error[0])
+
+        rows = await gather_querysets(_overview_querysets(patient_filter))
+        patients = _stitch(rows)
+
+        return _json({
+            "client": client_id,
+            "patients": PatientOverviewSerializer(
+                patients, many=True, context={"request": request}
+            ).data,
+        })
@@ -3,9 +3,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate, get_user_model
+from .authentication import revoke_token
 from .models import Client
+from .serializers import ClaimsTokenObtainPairSerializer
 
 User = get_user_model()
 
@@ -107,8 +110,8 @@ class ClientLoginView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        # Generate JWT tokens (role/client claims included)
+        refresh = ClaimsTokenObtainPairSerializer.get_token(user)
 
         return Response({
             'access': str(refresh.access_token),
@@ -217,8 +220,8 @@ class DoctorLoginView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        # Generate JWT tokens (role/client claims included)
+        refresh = ClaimsTokenObtainPairSerializer.get_token(user)
 
         return Response({
             'access': str(refresh.access_token),
@@ -230,3 +233,35 @@ class DoctorLoginView(APIView):
                 'role': 'doctor'
             }
         }, status=status.HTTP_200_OK)
+
+
+class LogoutView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        """
+        Revoke the refresh token and the access token in use.
+        POST /api/logout/
+        """
+        raw_refresh = request.data.get('refresh')
+
+        if not raw_refresh:
+            return Response(
+                {"detail": "Missing refresh token"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            refresh = RefreshToken(raw_refresh)
+        except TokenError as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        revoke_token(refresh)
+
+        if request.auth is not None:
+            revoke_token(request.auth)
+
+        return Response({"detail": "Logged out"}, status=status.HTTP_200_OK)
@@ -0,0 +1,170 @@
+# Vetmanagementsystem/authentication.py
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import Client, RevokedToken
+
+
+DENYLIST_CACHE_KEY = "auth:denylist"
+
+
+# ============================================================
+# TOKEN CLAIMS
+# ============================================================
+
+def add_identity_claims(token, user):
+    """
+    Embed role and client id so requests can be scoped without
+    loading the user or Client rows.
+    """
+
+    token["role"] = "doctor" if user.is_staff else "customer"
+    token["is_staff"] = bool(user.is_staff)
+
+    if not user.is_staff:
+        client_id = (
+            Client.objects.filter(user=user)
+            .values_list("id", flat=True)
+            .first()
+        )
+        token["client"] = client_id
+
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user built from token claims alone.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get("role", "")
+
+    @cached_property
+    def client_pk(self):
+        return self.token.get("client")
+
+
+# ============================================================
+# DENY-LIST
+# ============================================================
+
+def _denylist():
+
+    snapshot = cache.get(DENYLIST_CACHE_KEY)
+
+    if snapshot is not None:
+        return snapshot
+
+    now = timezone.now()
+    rows = RevokedToken.objects.filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+    ).values_list("jti", "user_id", "revoked_at")
+
+    jtis = set()
+    users = {}
+
+    for jti, user_id, revoked_at in rows:
+        if jti:
+            jtis.add(jti)
+        elif user_id is not None:
+            users[str(user_id)] = max(users.get(str(user_id), 0), revoked_at.timestamp())
+
+    snapshot = {"jtis": jtis, "users": users}
+    cache.set(DENYLIST_CACHE_KEY, snapshot, settings.AUTH_DENYLIST_CACHE_SECONDS)
+
+    return snapshot
+
+
+def _token_expiry(token):
+
+    exp = token.get("exp")
+
+    if exp is None:
+        return None
+
+    return datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+
+
+def revoke_token(token):
+    """Deny one token (by jti) until it would have expired anyway."""
+
+    jti = token.get(api_settings.JTI_CLAIM)
+
+    if not jti:
+        return
+
+    RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            "user_id": token.get(api_settings.USER_ID_CLAIM),
+            "expires_at": _token_expiry(token),
+        },
+    )
+    cache.delete(DENYLIST_CACHE_KEY)
+
+
+def revoke_user(user_id):
+    """Deny every token issued to the user before now."""
+
+    refresh_lifetime = api_settings.REFRESH_TOKEN_LIFETIME
+
+    RevokedToken.objects.update_or_create(
+        jti=None,
+        user_id=user_id,
+        defaults={
+            "revoked_at": timezone.now(),
+            "expires_at": timezone.now() + refresh_lifetime,
+        },
+    )
+    cache.delete(DENYLIST_CACHE_KEY)
+
+
+def is_revoked(token):
+
+    snapshot = _denylist()
+
+    if token.get(api_settings.JTI_CLAIM) in snapshot["jtis"]:
+        return True
+
+    revoked_at = snapshot["users"].get(str(token.get(api_settings.USER_ID_CLAIM)))
+
+    if revoked_at is None:
+        return False
+
+    return token.get("iat", 0) <= revoked_at
+
+
+# ============================================================
+# AUTHENTICATION
+# ============================================================
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the role/client claims minted at
+    login instead of loading CustomUser. Tokens issued before claims
+    existed fall back to the database lookup.
+    """
+
+    def get_user(self, validated_token):
+
+        if is_revoked(validated_token):
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+
+        if "role" not in validated_token:
+            return super().get_user(validated_token)
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        return ClaimsUser(validated_token)
@@ -0,0 +1,195 @@
+# Vetmanagementsystem/counters.py
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Appointment, Client, DashboardCounter, Patient, Receipt
+
+
+# Columns a counter contribution depends on, per model.
+TRACKED_FIELDS = {
+    Patient: ("client_id",),
+    Appointment: ("client_id",),
+    Receipt: ("client_id", "amount"),
+}
+
+
+# ============================================================
+# CONTRIBUTIONS
+# ============================================================
+
+def contribution(instance):
+    """
+    What one row adds to the counters of its client:
+    {client_id: {field: delta}}.
+    """
+
+    client_id = getattr(instance, "client_id", None)
+
+    if client_id is None:
+        return {}
+
+    if isinstance(instance, Patient):
+        return {client_id: {"patients_count": 1}}
+
+    if isinstance(instance, Appointment):
+        return {client_id: {"appointments_count": 1}}
+
+    if isinstance(instance, Receipt):
+        return {client_id: {
+            "receipts_count": 1,
+            "receipts_total": Decimal(instance.amount or 0),
+        }}
+
+    return {}
+
+
+def diff(before, after):
+    """after - before, per client and field, dropping zeros."""
+
+    deltas = {}
+
+    for sign, side in ((-1, before), (1, after)):
+        for client_id, fields in side.items():
+            bucket = deltas.setdefault(client_id, {})
+            for field, value in fields.items():
+                bucket[field] = bucket.get(field, 0) + sign * value
+
+    return {
+        client_id: {field: value for field, value in fields.items() if value}
+        for client_id, fields in deltas.items()
+        if any(fields.values())
+    }
+
+
+# ============================================================
+# APPLY
+# ============================================================
+
+def _compute(client_id=None):
+
+    patients = Patient.objects.all()
+    appointments = Appointment.objects.all()
+    receipts = Receipt.objects.all()
+
+    if client_id is not None:
+        patients = patients.filter(client_id=client_id)
+        appointments = appointments.filter(client_id=client_id)
+        receipts = receipts.filter(client_id=client_id)
+
+    totals = receipts.aggregate(count=Count("id"), total=Sum("amount"))
+
+    return {
+        "patients_count": patients.count(),
+        "appointments_count": appointments.count(),
+        "receipts_count": totals["count"],
+        "receipts_total": totals["total"] or 0,
+    }
+
+
+def rebuild(client_id=None):
+    """Recompute one counter row from the source tables."""
+
+    values = _compute(client_id)
+
+    counter, _ = DashboardCounter.objects.update_or_create(
+        key=DashboardCounter.key_for(client_id),
+        defaults={"client_id": client_id, **values},
+    )
+
+    return counter
+
+
+def rebuild_all():
+    """
+    Recompute every counter row. Totals are grouped per client in
+    memory and written with one bulk insert, so the cost does not
+    grow with one UPDATE per client.
+    """
+
+    values = {
+        client_id: {}
+        for client_id in Client.objects.values_list("id", flat=True).iterator(chunk_size=5000)
+    }
+
+    for model, field in (
+        (Patient, "patients_count"),
+        (Appointment, "appointments_count"),
+    ):
+        grouped = model.objects.values_list("client_id").annotate(n=Count("id")).order_by()
+        for client_id, count in grouped.iterator(chunk_size=5000):
+            values[client_id][field] = count
+
+    grouped = Receipt.objects.values_list("client_id").annotate(n=Count("id"), total=Sum("amount")).order_by()
+    for client_id, count, total in grouped.iterator(chunk_size=5000):
+        values[client_id].update(receipts_count=count, receipts_total=total or 0)
+
+    DashboardCounter.objects.all().delete()
+    DashboardCounter.objects.bulk_create(
+        [
+            DashboardCounter(key=DashboardCounter.key_for(client_id), client_id=client_id, **fields)
+            for client_id, fields in values.items()
+        ],
+        batch_size=1000,
+    )
+
+    rebuild(None)
+
+    return len(values)
+
+
+def _bump(client_id, fields, create_missing):
+
+    key = DashboardCounter.key_for(client_id)
+    updates = {field: F(field) + value for field, value in fields.items()}
+    updates["updated_at"] = timezone.now()
+
+    if DashboardCounter.objects.filter(key=key).update(**updates):
+        return
+
+    if not create_missing:
+        return
+
+    # First write for this scope: the source tables already include
+    # the row being saved, so a rebuild is exact.
+    try:
+        with transaction.atomic():
+            rebuild(client_id)
+    except IntegrityError:
+        DashboardCounter.objects.filter(key=key).update(**updates)
+
+
+def apply(deltas, create_missing=True):
+    """
+    Add per-client deltas to each client row and to the global row.
+    Runs inside the caller's transaction (see AtomicWritesMixin).
+    """
+
+    if not deltas:
+        return
+
+    overall = {}
+
+    for client_id, fields in deltas.items():
+        _bump(client_id, fields, create_missing)
+        for field, value in fields.items():
+            overall[field] = overall.get(field, 0) + value
+
+    overall = {field: value for field, value in overall.items() if value}
+
+    if overall:
+        _bump(None, overall, create_missing)
+
+
+def get_counter(client_id=None):
+
+    counter = DashboardCounter.objects.filter(
+        key=DashboardCounter.key_for(client_id)
+    ).first()
+
+    if counter is None:
+        counter = rebuild(client_id)
+
+    return counter
@@ -0,0 +1,309 @@
+# Vetmanagementsystem/documents.py
+"""
+Content-addressed document files, resumable uploads and ranged
+downloads.
+
+Files are stored once under their SHA-256 (documents/ab/cd/<digest>),
+so the same radiograph uploaded twice takes up one file. Uploads are
+appended chunk by chunk to a part file. The part file's size is the
+resume offset. The finished file is hashed and moved into place.
+"""
+import fcntl
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+
+BLOCK_SIZE = 1024 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class UploadConflict(Exception):
+    """The chunk does not start at the current offset, or another request is writing."""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+# ============================================================
+# PATHS
+# ============================================================
+
+def stored_name(digest):
+    """Storage name of a document file, relative to MEDIA_ROOT."""
+
+    return f"documents/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def part_path(upload_id):
+    return Path(settings.DOCUMENT_UPLOAD_ROOT) / f"{upload_id}.part"
+
+
+def _move_into_place(source, digest):
+    """Rename a finished file to its content address, or drop it if that file exists."""
+
+    target = Path(default_storage.path(stored_name(digest)))
+
+    if target.exists():
+        os.unlink(source)
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(source, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(source, target)
+
+    return stored_name(digest)
+
+
+def _hash_file(path):
+
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(BLOCK_SIZE), b""):
+            digest.update(block)
+
+    return digest
+
+
+# ============================================================
+# STORE
+# ============================================================
+
+def store_upload(upload):
+    """
+    Save an uploaded file (a Django UploadedFile) under its SHA-256,
+    hashing the chunks as they are copied. Returns (name, digest, size).
+    """
+
+    root = Path(settings.DOCUMENT_UPLOAD_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=root, prefix=".tmp-")
+
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            for chunk in upload.chunks(BLOCK_SIZE):
+                digest.update(chunk)
+                handle.write(chunk)
+                size += len(chunk)
+
+        return _move_into_place(tmp, digest.hexdigest()), digest.hexdigest(), size
+    except Exception:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def received(upload_id):
+    """Bytes stored so far for an upload; the offset to resume from."""
+
+    try:
+        return part_path(upload_id).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def append_chunk(upload_id, offset, stream, limit):
+    """
+    Append the request body to the part file, starting at `offset`.
+    At most `limit` bytes are read. Returns (new offset, hash), where
+    hash is the running SHA-256 when the part file was written from
+    byte 0 in this call, else None.
+    """
+
+    path = part_path(upload_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "ab") as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadConflict("Another request is writing this upload.", received(upload_id))
+
+        current = handle.seek(0, os.SEEK_END)
+
+        if current != offset:
+            raise UploadConflict(f"Upload-Offset must be {current}.", current)
+
+        digest = hashlib.sha256() if offset == 0 else None
+
+        while limit > 0:
+            chunk = stream.read(min(BLOCK_SIZE, limit))
+            if not chunk:
+                break
+            if digest is not None:
+                digest.update(chunk)
+            handle.write(chunk)
+            limit -= len(chunk)
+
+        handle.flush()
+
+        return handle.tell(), digest
+
+
+def finish_upload(upload_id, digest=None):
+    """
+    Move a complete part file to its content address. `digest` is the
+    hash from append_chunk when one request sent the whole file; else
+    the part file is read once to hash it. Returns (name, digest).
+    """
+
+    path = part_path(upload_id)
+
+    if digest is None:
+        digest = _hash_file(path)
+
+    return _move_into_place(path, digest.hexdigest()), digest.hexdigest()
+
+
+def discard_upload(upload_id):
+
+    try:
+        os.unlink(part_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+# ============================================================
+# SERVE
+# ============================================================
+
+def _requested_range(request, size, etag, last_modified):
+    """
+    (start, end) inclusive for a single satisfiable byte range, None
+    to send the whole file, or "unsatisfiable".
+    """
+
+    header = request.headers.get("Range", "")
+    match = RANGE_RE.match(header.strip())
+
+    # Several ranges or another unit: sending the whole file is allowed.
+    if not match or match.groups() == ("", ""):
+        return None
+
+    if_range = request.headers.get("If-Range")
+
+    if if_range:
+        if if_range.startswith('"'):
+            if if_range != etag:
+                return None
+        elif parse_http_date_safe(if_range) != int(last_modified):
+            return None
+
+    first, last = match.groups()
+
+    if not first:
+        # bytes=-N: the last N bytes.
+        length = min(int(last), size)
+        if length == 0:
+            return "unsatisfiable"
+        return size - length, size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size or end < start:
+        return "unsatisfiable"
+
+    return start, end
+
+
+def _not_modified(request, etag, last_modified):
+
+    if_none_match = request.headers.get("If-None-Match")
+
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+
+    return since is not None and int(last_modified) <= since
+
+
+def _file_slice(path, start, length):
+
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        while length > 0:
+            block = handle.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def serve(request, document):
+    """
+    Response for a document download: 304 on a matching validator,
+    206 for a byte range, otherwise the whole file. With
+    DOCUMENT_SENDFILE set, the web server sends the bytes (and handles
+    Range itself); Django only sets the headers.
+    """
+
+    path = Path(document.file.path)
+    stat = path.stat()
+    size = stat.st_size
+    last_modified = stat.st_mtime
+
+    # Hashed files never change under their name; older files get a
+    # validator from their size and modification time.
+    etag = f'"{document.content_hash}"' if document.content_hash else f'"{size:x}-{int(last_modified):x}"'
+    filename = document.filename or path.name
+    content_type = (
+        document.content_type
+        or mimetypes.guess_type(filename)[0]
+        or "application/octet-stream"
+    )
+
+    if _not_modified(request, etag, last_modified):
+        response = HttpResponse(status=304)
+    elif settings.DOCUMENT_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+
+        if settings.DOCUMENT_SENDFILE == "x-accel-redirect":
+            relative = path.relative_to(Path(settings.MEDIA_ROOT)).as_posix()
+            response["X-Accel-Redirect"] = settings.DOCUMENT_ACCEL_PREFIX.rstrip("/") + "/" + relative
+        else:
+            response["X-Sendfile"] = str(path)
+    else:
+        requested = _requested_range(request, size, etag, last_modified)
+
+        if requested == "unsatisfiable":
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+        elif requested is None:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+        else:
+            start, end = requested
+            response = StreamingHttpResponse(
+                _file_slice(path, start, end - start + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Length"] = str(end - start + 1)
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+
+    if response.status_code in (200, 206):
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+
+    # Medical records: browsers may keep them, shared caches may not.
+    patch_cache_control(response, private=True, no_cache=True)
+
+    return response
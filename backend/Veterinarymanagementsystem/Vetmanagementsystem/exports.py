@@ -0,0 +1,208 @@
+# Vetmanagementsystem/exports.py
+import csv
+import datetime
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from .models import Medication, Receipt, Visit
+
+
+CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class ExportSpec:
+    """
+    One exportable table: the model, the columns (header -> ORM path)
+    read with values_list, the date column used for ranges, and the
+    path from the row to Client.id used for per-client scoping.
+    """
+
+    def __init__(self, model, columns, date_field, client_path):
+        self.model = model
+        self.columns = columns
+        self.date_field = date_field
+        self.client_path = client_path
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+
+EXPORTS = {
+    "visits": ExportSpec(
+        Visit,
+        [
+            ("id", "id"),
+            ("visit_date", "visit_date"),
+            ("patient", "patient_id"),
+            ("patient_code", "patient__patient_id"),
+            ("patient_name", "patient__name"),
+            ("client", "patient__client_id"),
+            ("veterinarian", "veterinarian__username"),
+            ("visit_status", "visit_status"),
+            ("location_status", "location_status"),
+            ("notes", "notes"),
+        ],
+        date_field="visit_date",
+        client_path="patient__client_id",
+    ),
+    "receipts": ExportSpec(
+        Receipt,
+        [
+            ("id", "id"),
+            ("date", "date"),
+            ("client", "client_id"),
+            ("client_name", "client__full_name"),
+            ("amount", "amount"),
+            ("status", "status"),
+            ("created_at", "created_at"),
+        ],
+        date_field="date",
+        client_path="client_id",
+    ),
+    "medications": ExportSpec(
+        Medication,
+        [
+            ("id", "id"),
+            ("visit", "visit_id"),
+            ("visit_date", "visit__visit_date"),
+            ("patient", "visit__patient_id"),
+            ("patient_name", "visit__patient__name"),
+            ("client", "visit__patient__client_id"),
+            ("name", "name"),
+            ("dosage", "dosage"),
+            ("frequency", "frequency"),
+            ("duration", "duration"),
+            ("notes", "notes"),
+        ],
+        date_field="visit__visit_date",
+        client_path="visit__patient__client_id",
+    ),
+}
+
+
+# ============================================================
+# QUERYSET
+# ============================================================
+
+def _scope_filter(spec, scope):
+    """
+    Translate _client_filter_kwargs() output ({"client_id": n},
+    {"client__id": -1} or {}) onto the spec's path to the client.
+    """
+
+    prefix = spec.client_path[: -len("client_id")]
+
+    return {
+        prefix + key: value
+        for key, value in scope.items()
+    }
+
+
+def _range_bound(spec, day, end=False):
+
+    model = spec.model
+
+    for part in spec.date_field.split("__"):
+        field = model._meta.get_field(part)
+        model = field.related_model
+
+    if end:
+        day = day + datetime.timedelta(days=1)
+
+    if isinstance(field, models.DateTimeField):
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+    return day
+
+
+def export_queryset(spec, scope=None, since=None, until=None):
+    """
+    Rows as tuples in spec.columns order, oldest first.
+    `since`/`until` are inclusive dates.
+    """
+
+    queryset = spec.model.objects.filter(**_scope_filter(spec, scope or {}))
+
+    if since:
+        queryset = queryset.filter(**{f"{spec.date_field}__gte": _range_bound(spec, since)})
+
+    if until:
+        queryset = queryset.filter(**{f"{spec.date_field}__lt": _range_bound(spec, until, end=True)})
+
+    # Local date columns walk their (date, id) index; joined ones use id.
+    ordering = ("id",) if "__" in spec.date_field else (spec.date_field, "id")
+
+    return queryset.order_by(*ordering).values_list(*[path for _, path in spec.columns])
+
+
+# ============================================================
+# ENCODERS
+# ============================================================
+
+def _csv_value(value):
+
+    if value is None:
+        return ""
+
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+
+    return value
+
+
+def iter_csv(spec, rows):
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(spec.headers)
+
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def iter_ndjson(spec, rows):
+
+    headers = spec.headers
+    buffer = io.StringIO()
+
+    for row in rows:
+        buffer.write(json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder))
+        buffer.write("\n")
+
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def stream_export(spec, fmt, scope=None, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """
+    Encoded text chunks for one export. Rows come through
+    .iterator(), which uses a server-side cursor on Postgres, so
+    memory does not grow with the size of the range.
+    """
+
+    rows = export_queryset(spec, scope, since, until).iterator(chunk_size=chunk_size)
+    encoder = iter_csv if fmt == "csv" else iter_ndjson
+
+    return encoder(spec, rows)
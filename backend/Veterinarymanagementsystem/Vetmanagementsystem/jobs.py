@@ -0,0 +1,362 @@
+# Vetmanagementsystem/jobs.py
+"""
+Background jobs stored in the database.
+
+enqueue() inserts a Job row in the caller's transaction, so work
+queued by a request that rolls back never runs. `manage.py run_workers`
+claims due jobs and runs them on a thread pool, in one or more
+processes.
+
+Claiming uses SELECT ... FOR UPDATE SKIP LOCKED where the database
+supports it (Postgres), so workers never wait on each other's rows.
+Elsewhere (SQLite) each candidate is taken with a conditional UPDATE
+that only succeeds while the job is still queued, so two workers
+cannot both take it.
+"""
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import counters, reminders, revenue, search
+from .exports import EXPORTS, stream_export
+from .models import Job
+from .photos import photo_sizes, render_thumbnails
+
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> callable(job) returning a JSON-serializable result.
+TASKS = {}
+
+# Kinds staff may queue directly through POST /api/jobs/.
+API_KINDS = {
+    "maintenance.rebuild_counters",
+    "maintenance.rebuild_revenue",
+    "maintenance.rebuild_search",
+    "reminders.run",
+}
+
+
+def task(kind):
+
+    def register(func):
+        TASKS[kind] = func
+        return func
+
+    return register
+
+
+def enqueue(kind, payload=None, priority=0, delay=None, max_attempts=None, user_id=None):
+    """Queue a job; higher priority runs first. Returns the Job."""
+
+    if kind not in TASKS:
+        raise ValueError(f"Unknown job kind {kind!r}.")
+
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        run_after=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        created_by_id=user_id,
+    )
+
+
+# ============================================================
+# CLAIM AND RUN
+# ============================================================
+
+def _due(kinds=None):
+
+    due = Job.objects.filter(status=Job.QUEUED, run_after__lte=timezone.now())
+
+    if kinds:
+        due = due.filter(kind__in=kinds)
+
+    return due.order_by("-priority", "run_after", "id")
+
+
+def claim(worker, limit=1, kinds=None):
+    """Mark up to `limit` due jobs as running for `worker` and return them."""
+
+    now = timezone.now()
+    taken = {
+        "status": Job.RUNNING,
+        "locked_by": worker,
+        "locked_at": now,
+        "attempts": F("attempts") + 1,
+        "updated_at": now,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(_due(kinds).select_for_update(skip_locked=True).values_list("id", flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**taken)
+    else:
+        ids = []
+        # A few spare candidates in case other workers win some of them.
+        for job_id in _due(kinds).values_list("id", flat=True)[: limit * 4]:
+            if Job.objects.filter(id=job_id, status=Job.QUEUED).update(**taken):
+                ids.append(job_id)
+                if len(ids) == limit:
+                    break
+
+    return list(Job.objects.filter(id__in=ids).order_by("-priority", "run_after", "id"))
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts`: doubling, capped, with jitter."""
+
+    delay = min(settings.JOBS_RETRY_MAX_SECONDS, settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+def execute(job, worker):
+    """Run one claimed job and record the outcome."""
+
+    mine = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=worker)
+
+    try:
+        func = TASKS.get(job.kind)
+        if func is None:
+            raise LookupError(f"No task is registered as {job.kind!r}.")
+        result = func(job)
+    except Exception:
+        error = traceback.format_exc(limit=20)
+        logger.warning("Job %s (%s) failed, attempt %s/%s", job.pk, job.kind, job.attempts, job.max_attempts)
+
+        if job.attempts < job.max_attempts:
+            mine.update(
+                status=Job.QUEUED,
+                run_after=timezone.now() + backoff(job.attempts),
+                locked_by="",
+                locked_at=None,
+                last_error=error,
+                updated_at=timezone.now(),
+            )
+        else:
+            mine.update(status=Job.FAILED, last_error=error, finished_at=timezone.now(), updated_at=timezone.now())
+        return False
+
+    mine.update(status=Job.SUCCEEDED, result=result, finished_at=timezone.now(), updated_at=timezone.now())
+
+    return True
+
+
+def requeue_stale():
+    """
+    Running jobs whose lease was not renewed (a crashed or killed
+    worker) go back to the queue, or fail when out of attempts.
+    """
+
+    expired = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+    )
+
+    failed = expired.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        last_error="Worker lease expired.",
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    requeued = expired.update(
+        status=Job.QUEUED,
+        locked_by="",
+        locked_at=None,
+        last_error="Worker lease expired.",
+        updated_at=timezone.now(),
+    )
+
+    return requeued, failed
+
+
+# ============================================================
+# WORKERS
+# ============================================================
+
+class Worker:
+    """
+    Claims jobs while it has free threads and runs them on a pool.
+    burst=True returns once nothing is due and every job has finished.
+    """
+
+    def __init__(self, threads=1, poll_interval=1.0, kinds=None, name=None):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.kinds = kinds
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        self.completed = 0
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def _run_one(self, job):
+        try:
+            execute(job, self.name)
+        finally:
+            # Each pool thread has its own connection.
+            connections.close_all()
+
+    def run(self, burst=False):
+
+        busy = set()
+        next_sweep = 0.0
+
+        with ThreadPoolExecutor(self.threads, thread_name_prefix="job") as pool:
+            while not self.stopping.is_set():
+                if time.monotonic() >= next_sweep:
+                    # Renew the lease on this worker's jobs, then recover
+                    # jobs of workers that stopped renewing theirs.
+                    Job.objects.filter(status=Job.RUNNING, locked_by=self.name).update(locked_at=timezone.now())
+                    requeue_stale()
+                    next_sweep = time.monotonic() + settings.JOBS_LEASE_SECONDS / 3
+
+                finished = {future for future in busy if future.done()}
+                self.completed += len(finished)
+                busy -= finished
+
+                free = self.threads - len(busy)
+                jobs = claim(self.name, free, self.kinds) if free else []
+
+                for job in jobs:
+                    busy.add(pool.submit(self._run_one, job))
+
+                if jobs:
+                    continue
+
+                if burst and not busy:
+                    break
+
+                if busy:
+                    wait(busy, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                else:
+                    self.stopping.wait(self.poll_interval)
+
+            wait(busy)
+            self.completed += len(busy)
+
+        return self.completed
+
+
+def _child(options, burst):
+
+    worker = Worker(**options)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(burst=burst)
+
+
+def run_processes(processes, burst=False, **options):
+    """
+    Run `processes` forked workers (each with its own thread pool)
+    until they exit; SIGTERM/SIGINT are passed on to them.
+    """
+
+    # Forked children must not share the parent's database socket.
+    connections.close_all()
+
+    context = multiprocessing.get_context("fork")
+    children = [context.Process(target=_child, args=(options, burst), daemon=False) for _ in range(processes)]
+
+    for child in children:
+        child.start()
+
+    def forward(signum, frame):
+        for child in children:
+            if child.is_alive():
+                os.kill(child.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    for child in children:
+        child.join()
+
+    return [child.exitcode for child in children]
+
+
+# ============================================================
+# TASKS
+# ============================================================
+
+def output_path(job, suffix):
+    return Path(settings.JOBS_OUTPUT_ROOT) / f"job-{job.pk}.{suffix}"
+
+
+@task("photos.render_thumbnails")
+def _render_thumbnails(job):
+    render_thumbnails(job.payload["digest"])
+    return {"sizes": list(photo_sizes())}
+
+
+@task("exports.write")
+def _write_export(job):
+
+    payload = job.payload
+    path = output_path(job, payload["fmt"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    chunks = stream_export(
+        EXPORTS[payload["dataset"]],
+        payload["fmt"],
+        payload.get("scope") or {},
+        since=parse_date(payload["since"]) if payload.get("since") else None,
+        until=parse_date(payload["until"]) if payload.get("until") else None,
+    )
+
+    # Written beside the target and renamed, so a retry never serves
+    # half a file.
+    partial = path.with_suffix(path.suffix + ".tmp")
+
+    with open(partial, "w", newline="", encoding="utf-8") as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+
+    os.replace(partial, path)
+
+    return {
+        "file": path.name,
+        "filename": f"{payload['dataset']}.{payload['fmt']}",
+        "bytes": path.stat().st_size,
+    }
+
+
+@task("maintenance.rebuild_counters")
+def _rebuild_counters(job):
+    with transaction.atomic():
+        return {"clients": counters.rebuild_all()}
+
+
+@task("maintenance.rebuild_revenue")
+def _rebuild_revenue(job):
+    with transaction.atomic():
+        return {"rows": revenue.rebuild_all()}
+
+
+@task("maintenance.rebuild_search")
+def _rebuild_search(job):
+    with transaction.atomic():
+        return search.rebuild()
+
+
+@task("reminders.run")
+def _run_reminders(job):
+    return reminders.run(batch_size=job.payload.get("batch_size"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from Vetmanagementsystem import summaries
+
+
+class Command(BaseCommand):
+    help = "Compare PatientSummary rows with Visit, Medication, AllergyAlert and TreatmentPlan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rewrite the rows that differ.")
+        parser.add_argument("--rebuild", action="store_true", help="Recompute every row instead of checking.")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            with transaction.atomic():
+                count = summaries.rebuild_all()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt summaries for {count} patients."))
+            return
+
+        report = summaries.check(fix=options["fix"])
+        problems = {name: report[name] for name in ("missing", "stale") if report[name]}
+
+        if not problems:
+            self.stdout.write(self.style.SUCCESS(f"All {report['checked']} patient summaries are consistent."))
+            return
+
+        for name, patient_ids in problems.items():
+            shown = ", ".join(str(patient_id) for patient_id in patient_ids[:20])
+            more = f" and {len(patient_ids) - 20} more" if len(patient_ids) > 20 else ""
+            self.stdout.write(f"{len(patient_ids)} {name}: patients {shown}{more}")
+
+        if options["fix"]:
+            self.stdout.write(self.style.SUCCESS("Fixed."))
+            return
+
+        raise CommandError("Patient summaries are inconsistent; run with --fix to repair them.")
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from Vetmanagementsystem.exports import CHUNK_SIZE, EXPORTS, FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream visits, receipts or medications as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(EXPORTS))
+        parser.add_argument("--format", dest="fmt", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--client", type=int, help="Only rows belonging to this client.")
+        parser.add_argument("--since", help="First date to include (YYYY-MM-DD).")
+        parser.add_argument("--until", help="Last date to include (YYYY-MM-DD).")
+        parser.add_argument("--output", "-o", help="Write to this file instead of stdout.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def _date(self, options, name):
+        raw = options.get(name)
+
+        if not raw:
+            return None
+
+        try:
+            value = parse_date(raw)
+        except ValueError:  # well formed but not a day, e.g. 2024-02-30
+            value = None
+
+        if value is None:
+            raise CommandError(f"--{name} must be a date (YYYY-MM-DD).")
+
+        return value
+
+    def handle(self, *args, **options):
+        scope = {}
+
+        if options.get("client") is not None:
+            scope = {"client_id": options["client"]}
+
+        chunks = stream_export(
+            EXPORTS[options["dataset"]],
+            options["fmt"],
+            scope,
+            since=self._date(options, "since"),
+            until=self._date(options, "until"),
+            chunk_size=options["chunk_size"],
+        )
+
+        if not options.get("output"):
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", newline="", encoding="utf-8") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}."))
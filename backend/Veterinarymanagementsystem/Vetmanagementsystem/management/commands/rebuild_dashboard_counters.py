@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Vetmanagementsystem import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute DashboardCounter rows from Patient, Appointment and Receipt."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--client",
+            type=int,
+            help="Rebuild only this client's row (and the global row).",
+        )
+
+    def handle(self, *args, **options):
+        client_id = options.get("client")
+
+        with transaction.atomic():
+            if client_id is not None:
+                counters.rebuild(client_id)
+                counters.rebuild(None)
+                self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for client {client_id}."))
+                return
+
+            count = counters.rebuild_all()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {count} clients."))
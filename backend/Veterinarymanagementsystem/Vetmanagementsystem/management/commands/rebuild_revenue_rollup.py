@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Vetmanagementsystem import revenue
+
+
+class Command(BaseCommand):
+    help = "Recompute RevenueRollup rows (receipts per month and status) from Receipt."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--client",
+            type=int,
+            help="Rebuild only this client's rows (and the clinic-wide rows they touch).",
+        )
+
+    def handle(self, *args, **options):
+        client_id = options.get("client")
+
+        with transaction.atomic():
+            if client_id is not None:
+                count = revenue.rebuild(client_id)
+                self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} revenue rows for client {client_id}."))
+                return
+
+            count = revenue.rebuild_all()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} revenue rows."))
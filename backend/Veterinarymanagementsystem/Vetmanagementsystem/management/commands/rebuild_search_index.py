@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Vetmanagementsystem import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild SearchEntry rows (and the full-text index) from clients, patients and clinical notes."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = search.rebuild()
+
+        summary = ", ".join(f"{count} {kind}" for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {summary}."))
@@ -0,0 +1,43 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Vetmanagementsystem import jobs
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the Job table until stopped (SIGTERM/SIGINT finish running jobs first)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=settings.JOBS_WORKER_THREADS, help="Jobs run at once per process.")
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes (forked).")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls when idle.")
+        parser.add_argument("--kind", action="append", dest="kinds", help="Only run jobs of this kind (repeatable).")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due.")
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1 or options["processes"] < 1:
+            raise CommandError("--threads and --processes must be at least 1.")
+
+        unknown = set(options["kinds"] or ()) - set(jobs.TASKS)
+        if unknown:
+            raise CommandError(f"Unknown job kinds: {', '.join(sorted(unknown))}.")
+
+        worker_options = {
+            "threads": options["threads"],
+            "poll_interval": options["poll_interval"],
+            "kinds": options["kinds"],
+        }
+
+        if options["processes"] > 1:
+            jobs.run_processes(options["processes"], burst=options["burst"], **worker_options)
+            return
+
+        worker = jobs.Worker(**worker_options)
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+
+        self.stdout.write(f"Worker {worker.name} running {options['threads']} threads.")
+        completed = worker.run(burst=options["burst"])
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker.name} stopped after {completed} jobs."))
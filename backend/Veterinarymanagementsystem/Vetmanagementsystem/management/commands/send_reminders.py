@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from Vetmanagementsystem import reminders
+
+
+class Command(BaseCommand):
+    help = "Create reminders for due follow-ups and upcoming appointments, then send the pending ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--generate-only", action="store_true", help="Create reminders without sending.")
+        parser.add_argument("--dispatch-only", action="store_true", help="Send pending reminders without creating new ones.")
+        parser.add_argument("--batch-size", type=int, default=settings.REMINDER_BATCH_SIZE, help="Rows per insert and per send.")
+        parser.add_argument("--sender", help="Dotted path of the sender class (default: REMINDER_SENDER).")
+        parser.add_argument("--now", help="Schedule as of this ISO datetime instead of the current time.")
+
+    def handle(self, *args, **options):
+        if options["generate_only"] and options["dispatch_only"]:
+            raise CommandError("--generate-only and --dispatch-only cannot be combined.")
+
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        now = None
+        if options["now"]:
+            now = parse_datetime(options["now"])
+            if now is None or now.tzinfo is None:
+                raise CommandError("--now must be an ISO datetime with a UTC offset.")
+
+        if not options["dispatch_only"]:
+            counts = reminders.generate(now, options["batch_size"])
+            self.stdout.write(f"Created {counts['created']} of {counts['considered']} reminders due.")
+
+        if not options["generate_only"]:
+            counts = reminders.dispatch(reminders.get_sender(options["sender"]), options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Sent {counts['sent']} reminders ({counts['retrying']} to retry, {counts['failed']} failed)."
+            ))
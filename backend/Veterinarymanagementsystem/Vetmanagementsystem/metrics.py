@@ -0,0 +1,227 @@
+# Vetmanagementsystem/metrics.py
+"""
+Per-request timings: wall time, database queries and time, response
+serialization time and response size, recorded per resolved view and
+method into Prometheus histograms.
+
+With PROMETHEUS_MULTIPROC_DIR set (gunicorn.conf.py sets it), every
+worker writes its samples to files in that directory and /metrics
+merges them, so one scrape covers all workers.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+LABELS = ("view", "method")
+
+REQUEST_SECONDS = Histogram(
+    "vetms_request_duration_seconds", "Wall time of the request.", LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Histogram(
+    "vetms_request_db_queries", "Database queries run by the request.", LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250),
+)
+DB_SECONDS = Histogram(
+    "vetms_request_db_duration_seconds", "Time spent in database queries.", LABELS,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+SERIALIZE_SECONDS = Histogram(
+    "vetms_request_serialize_duration_seconds", "Time spent rendering the response body.", LABELS,
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+RESPONSE_BYTES = Histogram(
+    "vetms_response_size_bytes", "Size of the response body.", LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+RESPONSES = Counter(
+    "vetms_responses_total", "Responses by status code.", LABELS + ("status",),
+)
+
+
+# ============================================================
+# PER-REQUEST TIMINGS
+# ============================================================
+
+class RequestTimings:
+    """
+    Totals for the request in flight. Shared by every thread working
+    for the request (sync_to_async, fan-out reads), hence the lock.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, field, seconds, queries=0):
+
+        with self._lock:
+            setattr(self, field, getattr(self, field) + seconds)
+            self.queries += queries
+
+
+_current = contextvars.ContextVar("vetms_request_timings", default=None)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def timed(field):
+    """Add the time spent in the block to the current request's `field`."""
+
+    timings = _current.get()
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.add(field, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper, installed on every new connection."""
+
+    timings = _current.get()
+
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add("db", time.perf_counter() - started, queries=1)
+
+
+def install(connection, **kwargs):
+
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# ============================================================
+# MIDDLEWARE
+# ============================================================
+
+def _view_label(request):
+
+    match = getattr(request, "resolver_match", None)
+
+    if match is None:
+        return "<unresolved>"
+
+    return match.view_name or match.route or "<unnamed>"
+
+
+def _response_bytes(response):
+
+    if response.streaming:
+        return None
+
+    return len(response.content)
+
+
+class MetricsMiddleware:
+    """Times every request and adds a Server-Timing header."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = _current.set(RequestTimings())
+
+        try:
+            response = self.get_response(request)
+            self._finish(request, response)
+            return response
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+
+        token = _current.set(RequestTimings())
+
+        try:
+            response = await self.get_response(request)
+            self._finish(request, response)
+            return response
+        finally:
+            _current.reset(token)
+
+    def _finish(self, request, response):
+
+        timings = _current.get()
+        total = time.perf_counter() - timings.started
+        labels = (_view_label(request), request.method)
+        size = _response_bytes(response)
+
+        REQUEST_SECONDS.labels(*labels).observe(total)
+        DB_QUERIES.labels(*labels).observe(timings.queries)
+        DB_SECONDS.labels(*labels).observe(timings.db)
+        SERIALIZE_SECONDS.labels(*labels).observe(timings.serialize)
+        RESPONSES.labels(*labels, str(response.status_code)).inc()
+
+        if size is not None:
+            RESPONSE_BYTES.labels(*labels).observe(size)
+
+        # Streamed bodies are still being produced; their header only
+        # covers the work done before the first chunk.
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"',
+            f"serialize;dur={timings.serialize * 1000:.2f}",
+            f"app;dur={max(total - timings.db - timings.serialize, 0) * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ])
+
+
+# ============================================================
+# EXPOSITION
+# ============================================================
+
+def exposition():
+    """(body, content type) in the Prometheus text format."""
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,55 @@
+import base64
+
+from django.db import migrations, models
+
+
+def move_photo_data_to_store(apps, schema_editor):
+    from Vetmanagementsystem.photos import decode_data_url, store_photo
+
+    Patient = apps.get_model("Vetmanagementsystem", "Patient")
+
+    patients = Patient.objects.exclude(photo_data__isnull=True).exclude(photo_data="")
+
+    for patient in patients.only("id", "photo_data").iterator(chunk_size=200):
+        raw = decode_data_url(patient.photo_data)
+        if not raw:
+            continue
+        try:
+            digest = store_photo(raw)
+        except ValueError:
+            continue
+        Patient.objects.filter(pk=patient.pk).update(photo_hash=digest)
+
+
+def restore_photo_data(apps, schema_editor):
+    from Vetmanagementsystem.photos import content_type_for, photo_path
+
+    Patient = apps.get_model("Vetmanagementsystem", "Patient")
+
+    for patient in Patient.objects.exclude(photo_hash__isnull=True).iterator(chunk_size=200):
+        path = photo_path(patient.photo_hash)
+        if not path.exists():
+            continue
+        encoded = base64.b64encode(path.read_bytes()).decode("ascii")
+        data_url = f"data:{content_type_for(path)};base64,{encoded}"
+        Patient.objects.filter(pk=patient.pk).update(photo_data=data_url)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Vetmanagementsystem", "0004_merge_0002_patient_photo_data_0003_alter_vitalsigns_visit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="photo_hash",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(move_photo_data_to_store, restore_photo_data),
+        migrations.RemoveField(
+            model_name="patient",
+            name="photo_data",
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Vetmanagementsystem', '0006_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('key', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('patients_count', models.IntegerField(default=0)),
+                ('appointments_count', models.IntegerField(default=0)),
+                ('receipts_count', models.IntegerField(default=0)),
+                ('receipts_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_counter', to='Vetmanagementsystem.client')),
+            ],
+        ),
+    ]
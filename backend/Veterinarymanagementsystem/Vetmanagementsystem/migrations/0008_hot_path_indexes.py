@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Vetmanagementsystem', '0007_dashboardcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='allergyalert',
+            index=models.Index(fields=['created_at', 'id'], name='allergy_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['client', 'date'], name='appointment_client_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['date', 'id'], name='appointment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientcommunicationnote',
+            index=models.Index(fields=['date', 'id'], name='communication_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientnote',
+            index=models.Index(fields=['created_at', 'id'], name='clientnote_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['issued_date', 'id'], name='document_issued_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['client', 'created_at'], name='patient_client_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_at', 'id'], name='patient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['client', 'status', 'date'], name='receipt_client_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['date', 'id'], name='receipt_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(condition=models.Q(('follow_up_date__isnull', False)), fields=['follow_up_date'], name='treatment_follow_up_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['patient', 'visit_date'], name='visit_patient_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['visit_date', 'id'], name='visit_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vitalsigns',
+            index=models.Index(fields=['visit', 'recorded_at'], name='vitals_visit_recorded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vitalsigns',
+            index=models.Index(fields=['recorded_at', 'id'], name='vitals_recorded_idx'),
+        ),
+    ]
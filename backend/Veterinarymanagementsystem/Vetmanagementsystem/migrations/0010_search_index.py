@@ -0,0 +1,112 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+TABLE = "Vetmanagementsystem_searchentry"
+FTS = f"{TABLE}_fts"
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    ALTER TABLE "{TABLE}" ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    f'CREATE INDEX search_entry_vector_idx ON "{TABLE}" USING GIN (search_vector)',
+    f'CREATE INDEX search_entry_name_trgm_idx ON "{TABLE}" USING GIN (name gin_trgm_ops)',
+    f'CREATE INDEX search_entry_client_kind_idx ON "{TABLE}" (client_id, kind)',
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS search_entry_client_kind_idx",
+    "DROP INDEX IF EXISTS search_entry_name_trgm_idx",
+    "DROP INDEX IF EXISTS search_entry_vector_idx",
+    f'ALTER TABLE "{TABLE}" DROP COLUMN IF EXISTS search_vector',
+]
+
+# External-content FTS5 table kept in step with the entry table by triggers.
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE "{FTS}" USING fts5(
+        name, body,
+        content='{TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER "{FTS}_ai" AFTER INSERT ON "{TABLE}" BEGIN
+        INSERT INTO "{FTS}"(rowid, name, body) VALUES (new.id, new.name, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER "{FTS}_ad" AFTER DELETE ON "{TABLE}" BEGIN
+        INSERT INTO "{FTS}"("{FTS}", rowid, name, body) VALUES ('delete', old.id, old.name, old.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER "{FTS}_au" AFTER UPDATE ON "{TABLE}" BEGIN
+        INSERT INTO "{FTS}"("{FTS}", rowid, name, body) VALUES ('delete', old.id, old.name, old.body);
+        INSERT INTO "{FTS}"(rowid, name, body) VALUES (new.id, new.name, new.body);
+    END
+    """,
+    f'CREATE INDEX search_entry_client_kind_idx ON "{TABLE}" (client_id, kind)',
+]
+
+SQLITE_REVERSE = [
+    "DROP INDEX IF EXISTS search_entry_client_kind_idx",
+    f'DROP TRIGGER IF EXISTS "{FTS}_au"',
+    f'DROP TRIGGER IF EXISTS "{FTS}_ad"',
+    f'DROP TRIGGER IF EXISTS "{FTS}_ai"',
+    f'DROP TABLE IF EXISTS "{FTS}"',
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def create_text_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD})
+
+
+def drop_text_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_REVERSE, "sqlite": SQLITE_REVERSE})
+
+
+def backfill(apps, schema_editor):
+    from Vetmanagementsystem.search import rebuild
+
+    rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Vetmanagementsystem', '0009_updated_at_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('client', 'Client'), ('patient', 'Patient'), ('note', 'Medical note'), ('visit', 'Visit'), ('treatment', 'Treatment plan')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('patient_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='Vetmanagementsystem.client')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_entry_object_uniq')],
+            },
+        ),
+        migrations.RunPython(create_text_index, drop_text_index),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-17 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Vetmanagementsystem', '0011_appointment_scheduling'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=32)),
+                ('month', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('receipts_count', models.IntegerField(default=0)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='revenue_rollups', to='Vetmanagementsystem.client')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'client'], name='revenue_rollup_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'month', 'status'), name='revenue_rollup_cell_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-17 14:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Vetmanagementsystem', '0014_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dedupe_key', models.CharField(max_length=100, unique=True)),
+                ('kind', models.CharField(choices=[('follow_up', 'Follow-up'), ('appointment', 'Appointment')], max_length=16)),
+                ('source_id', models.BigIntegerField()),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS')], max_length=8)),
+                ('recipient', models.CharField(max_length=254)),
+                ('due_at', models.DateTimeField()),
+                ('subject', models.CharField(max_length=200)),
+                ('body', models.TextField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=8)),
+                ('claim', models.CharField(blank=True, default='', max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='Vetmanagementsystem.client')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='Vetmanagementsystem.patient')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='reminder_status_idx'), models.Index(fields=['due_at', 'id'], name='reminder_due_idx'), models.Index(condition=models.Q(('claim', ''), _negated=True), fields=['claim'], name='reminder_claim_idx')],
+            },
+        ),
+    ]
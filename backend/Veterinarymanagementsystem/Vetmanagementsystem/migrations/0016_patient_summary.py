@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-17 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from Vetmanagementsystem.summaries import rebuild_all
+
+    rebuild_all()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Vetmanagementsystem', '0015_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientSummary',
+            fields=[
+                ('patient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='Vetmanagementsystem.patient')),
+                ('last_visit_date', models.DateTimeField(blank=True, null=True)),
+                ('current_status', models.CharField(blank=True, default='', max_length=50)),
+                ('active_medications', models.JSONField(blank=True, default=list)),
+                ('allergy_count', models.IntegerField(default=0)),
+                ('follow_up_dates', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_visit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Vetmanagementsystem.visit')),
+            ],
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
 # Vetmanagementsystem/models.py
+import uuid
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
@@ -24,6 +27,28 @@ class CustomUser(AbstractUser):
 
 
 
+class RevokedToken(models.Model):
+    """
+    Deny-list entry: a single token (jti) or, with jti empty,
+    every token issued to `user` before `revoked_at`.
+    """
+
+    jti = models.CharField(max_length=255, unique=True, blank=True, null=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="revoked_tokens",
+    )
+    revoked_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return self.jti or f"All tokens for user {self.user_id}"
+
+
+
 class DoctorProfile(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="doctor_profile"
@@ -48,6 +73,12 @@ class Client(models.Model):
     )
     full_name = models.CharField(max_length=255)
     phone = models.CharField(max_length=20, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["updated_at"], name="client_updated_idx"),
+        ]
 
     def __str__(self):
         return self.full_name 
@@ -65,10 +96,17 @@ class Patient(models.Model):
     date_of_birth = models.DateField(blank=True, null=True)
     weight_kg = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True)
     photo = models.ImageField(upload_to="patients/photos/", blank=True, null=True)
-    photo_data = models.TextField(blank=True, null=True)
+    photo_hash = models.CharField(max_length=64, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["client", "created_at"], name="patient_client_created_idx"),
+            models.Index(fields=["created_at", "id"], name="patient_created_idx"),
+            models.Index(fields=["updated_at"], name="patient_updated_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.patient_id})"
 
@@ -79,6 +117,11 @@ class AllergyAlert(models.Model):
     severity_level = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="allergy_created_idx"),
+        ]
+
     def __str__(self):
         return f"Allergy for {self.patient.name}"
 
@@ -100,6 +143,14 @@ class Visit(models.Model):
     age_months = models.IntegerField(blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["patient", "visit_date"], name="visit_patient_date_idx"),
+            models.Index(fields=["visit_date", "id"], name="visit_date_idx"),
+            models.Index(fields=["updated_at"], name="visit_updated_idx"),
+        ]
 
     def __str__(self):
         return f"Visit - {self.patient.name} ({self.visit_date.date()})"
@@ -120,6 +171,12 @@ class VitalSigns(models.Model):
     heart_rate = models.IntegerField(blank=True, null=True)
     recorded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["visit", "recorded_at"], name="vitals_visit_recorded_idx"),
+            models.Index(fields=["recorded_at", "id"], name="vitals_recorded_idx"),
+        ]
+
     def __str__(self):
         return f"Vitals for {self.visit.patient.name if self.visit else 'Unknown'}"
 
@@ -132,6 +189,11 @@ class ClientCommunicationNote(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["date", "id"], name="communication_date_idx"),
+        ]
+
     def __str__(self):
         return f"Note for {self.client.full_name}"
 
@@ -141,6 +203,11 @@ class ClientNote(models.Model):
     note = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="clientnote_created_idx"),
+        ]
+
     def __str__(self):
         return f"Medical Note - {self.visit.patient.name}"
 
@@ -152,6 +219,12 @@ class Medication(models.Model):
     frequency = models.CharField(max_length=50)
     duration = models.CharField(max_length=50, blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["visit", "updated_at"], name="medication_visit_updated_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -170,15 +243,65 @@ class Document(models.Model):
     file = models.FileField(upload_to="documents/")
     issued_date = models.DateField()
 
+    # Set for files stored by content (see documents.py); older rows keep
+    # their original upload path and leave these empty.
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    size = models.BigIntegerField(blank=True, null=True)
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    filename = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["issued_date", "id"], name="document_issued_idx"),
+        ]
+
     def __str__(self):
         return f"{self.document_type} - {self.patient.name}"
 
 
+class DocumentUpload(models.Model):
+    """
+    A resumable document upload in progress. The bytes received so far
+    live in a part file named after the id (see documents.py); the
+    Document is created when the last byte arrives.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="document_uploads")
+    document_type = models.CharField(max_length=50, choices=Document.DOCUMENT_TYPES)
+    issued_date = models.DateField()
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    size = models.BigIntegerField()
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="document_uploads",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Upload {self.id} - {self.filename}"
+
+
 class TreatmentPlan(models.Model):
     visit = models.ForeignKey(Visit, on_delete=models.CASCADE, related_name="treatment_plans")
     diagnosis = models.TextField()
     treatment_description = models.TextField()
     follow_up_date = models.DateField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["follow_up_date"],
+                name="treatment_follow_up_idx",
+                condition=models.Q(follow_up_date__isnull=False),
+            ),
+            models.Index(fields=["visit", "updated_at"], name="treatment_visit_updated_idx"),
+        ]
 
     def __str__(self):
         return f"Treatment Plan - {self.visit.patient.name}"
@@ -187,10 +310,25 @@ class TreatmentPlan(models.Model):
 class Appointment(models.Model):
     patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="appointments")
     client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="appointments")
+    veterinarian = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="appointments"
+    )
     date = models.DateTimeField()
+    duration_minutes = models.PositiveSmallIntegerField(default=30)
     reason = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["client", "date"], name="appointment_client_date_idx"),
+            models.Index(fields=["date", "id"], name="appointment_date_idx"),
+            models.Index(fields=["veterinarian", "date"], name="appointment_vet_date_idx"),
+        ]
+
+    @property
+    def ends_at(self):
+        return self.date + timedelta(minutes=self.duration_minutes or 0) if self.date else None
+
     def __str__(self):
         return f"Appointment: {self.patient.name} on {self.date}"
 
@@ -206,9 +344,263 @@ class Receipt(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["client", "status", "date"], name="receipt_client_status_idx"),
+            models.Index(fields=["date", "id"], name="receipt_date_idx"),
+        ]
+
     def __str__(self):
         return f"Receipt {self.id} - {self.client.full_name}"
 
 
+class DashboardCounter(models.Model):
+    """
+    Running totals behind /api/dashboard/. One row per client plus a
+    global row, keyed so the dashboard is a single primary-key lookup.
+    Maintained by signals; rebuild with `manage.py rebuild_dashboard_counters`.
+    """
+
+    GLOBAL_KEY = "all"
+
+    key = models.CharField(max_length=32, primary_key=True)
+    client = models.OneToOneField(
+        Client,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="dashboard_counter",
+    )
+    patients_count = models.IntegerField(default=0)
+    appointments_count = models.IntegerField(default=0)
+    receipts_count = models.IntegerField(default=0)
+    receipts_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def key_for(cls, client_id=None):
+        return cls.GLOBAL_KEY if client_id is None else f"client-{client_id}"
+
+    def __str__(self):
+        return self.key
+
+
+class PatientSummary(models.Model):
+    """
+    What patient lists show about each patient, kept on one row so a
+    list needs a single join. Active medications are the ones prescribed
+    at the last visit; follow_up_dates holds the follow-ups that were
+    still ahead when the row was last written. Maintained by signals in
+    the same transaction as the write; check with
+    `manage.py check_patient_summaries`.
+    """
+
+    patient = models.OneToOneField(Patient, on_delete=models.CASCADE, primary_key=True, related_name="summary")
+    last_visit = models.ForeignKey(Visit, on_delete=models.SET_NULL, blank=True, null=True, related_name="+")
+    last_visit_date = models.DateTimeField(blank=True, null=True)
+    current_status = models.CharField(max_length=50, blank=True, default="")
+    active_medications = models.JSONField(default=list, blank=True)
+    allergy_count = models.IntegerField(default=0)
+    follow_up_dates = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def next_follow_up(self):
+        today = timezone.localdate().isoformat()
+        return next((day for day in self.follow_up_dates if day >= today), None)
+
+    def __str__(self):
+        return f"Summary of patient {self.patient_id}"
+
+
+class RevenueRollup(models.Model):
+    """
+    Receipt count and amount per month and status, for one client or
+    for the whole clinic (client empty, scope "all"), so revenue
+    reports read a few rows per month instead of scanning Receipt.
+    Maintained by signals; rebuild with `manage.py rebuild_revenue_rollup`.
+    """
+
+    GLOBAL_SCOPE = "all"
+
+    scope = models.CharField(max_length=32)
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="revenue_rollups",
+    )
+    month = models.DateField()
+    status = models.CharField(max_length=20)
+    receipts_count = models.IntegerField(default=0)
+    amount_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "month", "status"], name="revenue_rollup_cell_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["month", "client"], name="revenue_rollup_month_idx"),
+        ]
+
+    @classmethod
+    def scope_for(cls, client_id=None):
+        return cls.GLOBAL_SCOPE if client_id is None else f"client-{client_id}"
+
+    def __str__(self):
+        return f"{self.scope} {self.month:%Y-%m} {self.status}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work, run by `manage.py run_workers`. Workers
+    claim the highest-priority due job; failures are retried with
+    exponential backoff until max_attempts (see jobs.py).
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.IntegerField(default=0)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default="")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # The claim query: due queued jobs, best priority first.
+            models.Index(fields=["status", "-priority", "run_after", "id"], name="job_claim_idx"),
+            models.Index(fields=["created_by", "-created_at"], name="job_owner_idx"),
+        ]
 
-  
+    def __str__(self):
+        return f"Job {self.id} {self.kind} ({self.status})"
+
+
+class Reminder(models.Model):
+    """
+    One message about a due follow-up or an upcoming appointment, on
+    one channel. dedupe_key is unique, so scheduling the same source
+    twice never creates a second reminder (see reminders.py).
+    """
+
+    FOLLOW_UP = "follow_up"
+    APPOINTMENT = "appointment"
+
+    KIND_CHOICES = [
+        (FOLLOW_UP, "Follow-up"),
+        (APPOINTMENT, "Appointment"),
+    ]
+
+    CHANNEL_CHOICES = [
+        ("email", "Email"),
+        ("sms", "SMS"),
+    ]
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    dedupe_key = models.CharField(max_length=100, unique=True)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    source_id = models.BigIntegerField()
+    channel = models.CharField(max_length=8, choices=CHANNEL_CHOICES)
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="reminders")
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="reminders")
+    recipient = models.CharField(max_length=254)
+    due_at = models.DateTimeField()
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=PENDING)
+    claim = models.CharField(max_length=32, blank=True, default="")
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="reminder_status_idx"),
+            models.Index(fields=["due_at", "id"], name="reminder_due_idx"),
+            models.Index(fields=["claim"], name="reminder_claim_idx", condition=~models.Q(claim="")),
+        ]
+
+    def __str__(self):
+        return self.dedupe_key
+
+
+class SearchEntry(models.Model):
+    """
+    One searchable document per client, patient, medical note, visit
+    or treatment plan. The full-text index lives beside it: a tsvector
+    column with GIN indexes on Postgres, an FTS5 table on SQLite (see
+    migration 0010). Maintained by signals; rebuild with
+    `manage.py rebuild_search_index`.
+    """
+
+    KIND_CHOICES = [
+        ("client", "Client"),
+        ("patient", "Patient"),
+        ("note", "Medical note"),
+        ("visit", "Visit"),
+        ("treatment", "Treatment plan"),
+    ]
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="search_entries",
+    )
+    patient_id = models.BigIntegerField(blank=True, null=True, db_index=True)
+    name = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="search_entry_object_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
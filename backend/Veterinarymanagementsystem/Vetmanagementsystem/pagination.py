@@ -0,0 +1,228 @@
+# Vetmanagementsystem/pagination.py
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# ============================================================
+# CURSOR HELPERS
+# ============================================================
+
+def _encode_value(value):
+    # Keep full microsecond precision; DjangoJSONEncoder truncates it.
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _field_name(field):
+    return field.lstrip("-")
+
+
+def _keyset_filter(ordering, values, reverse):
+    """
+    Rows strictly after `values` in `ordering`:
+    (a > x) OR (a = x AND b > y) OR ...
+    The leading range on the first column keeps the index usable.
+    """
+
+    first = ordering[0]
+    first_op = "lte" if first.startswith("-") != reverse else "gte"
+    leading = Q(**{f"{_field_name(first)}__{first_op}": values[0]})
+
+    clauses = Q()
+
+    for index, field in enumerate(ordering):
+        op = "lt" if field.startswith("-") != reverse else "gt"
+        clause = Q(**{f"{_field_name(field)}__{op}": values[index]})
+
+        for prev_field, prev_value in zip(ordering[:index], values[:index]):
+            clause &= Q(**{_field_name(prev_field): prev_value})
+
+        clauses |= clause
+
+    return leading & clauses
+
+
+def _invert(ordering):
+    return tuple(
+        field[1:] if field.startswith("-") else f"-{field}"
+        for field in ordering
+    )
+
+
+# ============================================================
+# KEYSET PAGINATION
+# ============================================================
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination over indexed columns.
+
+    Views declare `ordering`, e.g. ("-visit_date", "-id"); the primary
+    key is appended when missing so every position is unique. Each page
+    is a single range query, so page N costs the same as page 1.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    ordering = ("-id",)
+
+    def get_ordering(self, view):
+
+        ordering = tuple(getattr(view, "ordering", None) or self.ordering)
+
+        if not any(_field_name(field) in ("id", "pk") for field in ordering):
+            direction = "-" if ordering[0].startswith("-") else ""
+            ordering += (f"{direction}id",)
+
+        return ordering
+
+    def get_page_size(self, request):
+
+        value = request.query_params.get(self.page_size_query_param)
+
+        if value is None:
+            return self.page_size
+
+        try:
+            size = int(value)
+        except (TypeError, ValueError):
+            return self.page_size
+
+        if size <= 0:
+            return self.page_size
+
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            values = payload["p"]
+            reverse = bool(payload.get("r"))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound("Invalid cursor")
+
+        if not isinstance(values, list) or len(values) != len(self.ordering_fields):
+            raise NotFound("Invalid cursor")
+
+        return values, reverse
+
+    def encode_cursor(self, instance, reverse):
+
+        values = [
+            _encode_value(getattr(instance, _field_name(field)))
+            for field in self.ordering_fields
+        ]
+        payload = {"p": values}
+
+        if reverse:
+            payload["r"] = 1
+
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def paginate_queryset(self, queryset, request, view=None):
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering_fields = self.get_ordering(view)
+        self.page_size_value = self.get_page_size(request)
+
+        values, reverse = self.decode_cursor(request)
+
+        ordering = _invert(self.ordering_fields) if reverse else self.ordering_fields
+        queryset = queryset.order_by(*ordering)
+
+        if values is not None:
+            queryset = queryset.filter(_keyset_filter(self.ordering_fields, values, reverse))
+
+        rows = list(queryset[: self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[: self.page_size_value]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = bool(rows)
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None and bool(rows)
+
+        self.page = rows
+
+        return rows
+
+    def get_next_link(self):
+
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque pagination cursor.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
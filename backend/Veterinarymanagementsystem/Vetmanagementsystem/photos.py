@@ -0,0 +1,154 @@
+# Vetmanagementsystem/photos.py
+import base64
+import binascii
+import hashlib
+import io
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image, UnidentifiedImageError
+
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+DATA_URL_RE = re.compile(r"^data:(?P<type>[\w/+.-]*)?(;[\w=-]+)*;base64,(?P<data>.*)$", re.S)
+
+
+# ============================================================
+# PATHS
+# ============================================================
+
+def photo_root():
+    return Path(settings.PATIENT_PHOTO_ROOT)
+
+
+def photo_sizes():
+    return tuple(settings.PATIENT_PHOTO_SIZES)
+
+
+def photo_path(digest, size=None):
+    """
+    photos/ab/cd/<digest> for the original,
+    photos/ab/cd/<digest>-<size>.jpg for thumbnails.
+    """
+
+    if not DIGEST_RE.match(digest or ""):
+        raise ValueError("Invalid photo digest")
+
+    folder = photo_root() / digest[:2] / digest[2:4]
+
+    if size is None:
+        return folder / digest
+
+    return folder / f"{digest}-{int(size)}.jpg"
+
+
+def _write_atomic(path, data):
+
+    if path.exists():
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# ============================================================
+# STORE
+# ============================================================
+
+def decode_data_url(value):
+    """Return the raw bytes of a base64 data URL, or None."""
+
+    match = DATA_URL_RE.match((value or "").strip())
+
+    if not match:
+        return None
+
+    try:
+        return base64.b64decode(match.group("data"), validate=False)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def read_upload(upload):
+
+    upload.seek(0)
+    chunks = [chunk for chunk in upload.chunks()]
+    upload.seek(0)
+
+    return b"".join(chunks)
+
+
+def store_photo(raw, thumbnails=True):
+    """
+    Save an image once under its SHA-256 and, unless `thumbnails` is
+    False, pre-render every configured thumbnail size. Returns the
+    hex digest.
+    """
+
+    try:
+        image = Image.open(io.BytesIO(raw))
+        image.load()
+    except (UnidentifiedImageError, OSError) as exc:
+        raise ValueError("Upload a valid image.") from exc
+
+    digest = hashlib.sha256(raw).hexdigest()
+
+    _write_atomic(photo_path(digest), raw)
+
+    if thumbnails:
+        render_thumbnails(digest, image)
+
+    return digest
+
+
+def render_thumbnails(digest, image=None, sizes=None):
+    """Write the missing thumbnails of a stored photo."""
+
+    for size in sizes or photo_sizes():
+        target = photo_path(digest, size)
+
+        if target.exists():
+            continue
+
+        if image is None:
+            image = Image.open(photo_path(digest))
+            image.load()
+
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        thumb = image.copy()
+        thumb.thumbnail((size, size))
+
+        buffer = io.BytesIO()
+        thumb.save(buffer, format="JPEG", quality=85, optimize=True)
+        _write_atomic(target, buffer.getvalue())
+
+
+def content_type_for(path):
+
+    try:
+        with Image.open(path) as image:
+            return Image.MIME.get(image.format, "application/octet-stream")
+    except (UnidentifiedImageError, OSError):
+        return "application/octet-stream"
+
+
+def photo_etag(digest, size=None):
+
+    if size is None:
+        return f'"{digest}"'
+
+    return f'"{digest}-{int(size)}"'
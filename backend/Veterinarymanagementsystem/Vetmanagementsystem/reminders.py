@@ -0,0 +1,341 @@
+# Vetmanagementsystem/reminders.py
+"""
+Reminders for due follow-ups (TreatmentPlan.follow_up_date) and
+upcoming appointments.
+
+generate() range-scans both sources on their date indexes and inserts
+one Reminder per source, date and channel in batches. dedupe_key is
+unique, so running it again (or twice at once) adds nothing new; a
+rescheduled appointment or moved follow-up gets a fresh reminder.
+
+dispatch() claims pending reminders a batch at a time, hands each batch
+to the configured sender and records the outcome. A reminder is marked
+"sending" before the sender sees it, so delivery is at most once: one
+left in that state by a crash is marked failed rather than sent again.
+Only messages the sender reports as not delivered are retried.
+
+A sender is any class with send(reminders) -> {reminder id: error} for
+the messages it could not deliver. It should raise only when nothing
+in the batch went out.
+"""
+import datetime
+import json
+import sys
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Appointment, Reminder, TreatmentPlan
+
+
+# ============================================================
+# SENDERS
+# ============================================================
+
+class FileSender:
+    """Appends each message as a JSON line to <outbox>/<channel>.ndjson."""
+
+    def __init__(self, outbox=None):
+        self.outbox = Path(outbox or settings.REMINDER_OUTBOX)
+
+    def send(self, reminders):
+
+        self.outbox.mkdir(parents=True, exist_ok=True)
+        by_channel = {}
+
+        for reminder in reminders:
+            by_channel.setdefault(reminder.channel, []).append(reminder)
+
+        for channel, batch in by_channel.items():
+            with open(self.outbox / f"{channel}.ndjson", "a", encoding="utf-8") as handle:
+                handle.writelines(
+                    json.dumps({
+                        # Lets a real gateway drop a message it has seen.
+                        "idempotency_key": reminder.dedupe_key,
+                        "to": reminder.recipient,
+                        "subject": reminder.subject,
+                        "body": reminder.body,
+                    }) + "\n"
+                    for reminder in batch
+                )
+
+        return {}
+
+
+class ConsoleSender:
+    """Writes one line per message to stdout."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, reminders):
+
+        for reminder in reminders:
+            self.stream.write(f"[{reminder.channel}] {reminder.recipient}: {reminder.subject}\n")
+
+        return {}
+
+
+def get_sender(path=None):
+    return import_string(path or settings.REMINDER_SENDER)()
+
+
+# ============================================================
+# GENERATE
+# ============================================================
+
+def _channels(email, *phones):
+
+    if email:
+        yield "email", email
+
+    phone = next((phone for phone in phones if phone), None)
+
+    if phone:
+        yield "sms", phone
+
+
+def _follow_ups(today):
+
+    until = today + datetime.timedelta(days=settings.REMINDER_FOLLOW_UP_LEAD_DAYS)
+
+    rows = (
+        TreatmentPlan.objects.filter(follow_up_date__gte=today, follow_up_date__lte=until)
+        .order_by("follow_up_date", "id")
+        .values_list(
+            "id",
+            "follow_up_date",
+            "visit__patient_id",
+            "visit__patient__name",
+            "visit__patient__client_id",
+            "visit__patient__client__full_name",
+            "visit__patient__client__user__email",
+            "visit__patient__client__phone",
+            "visit__patient__client__user__phone",
+        )
+    )
+
+    for plan_id, date, patient_id, patient, client_id, client, email, *phones in rows.iterator(chunk_size=2000):
+        due_at = timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+        for channel, recipient in _channels(email, *phones):
+            yield Reminder(
+                dedupe_key=f"{Reminder.FOLLOW_UP}:{plan_id}:{date:%Y%m%d}:{channel}",
+                kind=Reminder.FOLLOW_UP,
+                source_id=plan_id,
+                channel=channel,
+                client_id=client_id,
+                patient_id=patient_id,
+                recipient=recipient,
+                due_at=due_at,
+                subject=f"Follow-up due for {patient}",
+                body=(
+                    f"Hello {client}, {patient} is due for a follow-up visit on "
+                    f"{date:%d %b %Y}. Please contact the clinic to book a time."
+                ),
+            )
+
+
+def _appointments(now):
+
+    until = now + datetime.timedelta(hours=settings.REMINDER_APPOINTMENT_LEAD_HOURS)
+
+    rows = (
+        Appointment.objects.filter(date__gte=now, date__lt=until)
+        .order_by("date", "id")
+        .values_list(
+            "id",
+            "date",
+            "patient_id",
+            "patient__name",
+            "client_id",
+            "client__full_name",
+            "client__user__email",
+            "client__phone",
+            "client__user__phone",
+        )
+    )
+
+    for appointment_id, date, patient_id, patient, client_id, client, email, *phones in rows.iterator(chunk_size=2000):
+        # The time is part of the key, so a rescheduled visit is announced again.
+        stamp = date.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M")
+        local = timezone.localtime(date)
+
+        for channel, recipient in _channels(email, *phones):
+            yield Reminder(
+                dedupe_key=f"{Reminder.APPOINTMENT}:{appointment_id}:{stamp}:{channel}",
+                kind=Reminder.APPOINTMENT,
+                source_id=appointment_id,
+                channel=channel,
+                client_id=client_id,
+                patient_id=patient_id,
+                recipient=recipient,
+                due_at=date,
+                subject=f"Appointment reminder for {patient}",
+                body=(
+                    f"Hello {client}, this is a reminder that {patient} has an "
+                    f"appointment on {local:%d %b %Y at %H:%M}."
+                ),
+            )
+
+
+def _insert(batch):
+    """Insert the reminders not already stored; returns how many were new."""
+
+    existing = set(
+        Reminder.objects.filter(dedupe_key__in=[reminder.dedupe_key for reminder in batch])
+        .values_list("dedupe_key", flat=True)
+    )
+    new = [reminder for reminder in batch if reminder.dedupe_key not in existing]
+
+    # ignore_conflicts covers a concurrent run inserting the same keys.
+    Reminder.objects.bulk_create(new, ignore_conflicts=True)
+
+    return len(new)
+
+
+def generate(now=None, batch_size=None):
+    """
+    Create reminders for follow-ups due within
+    REMINDER_FOLLOW_UP_LEAD_DAYS and appointments within
+    REMINDER_APPOINTMENT_LEAD_HOURS. Returns counts of messages
+    considered and created.
+    """
+
+    now = now or timezone.now()
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    counts = {"considered": 0, "created": 0}
+    batch = []
+
+    for sources in (_follow_ups(timezone.localdate(now)), _appointments(now)):
+        for reminder in sources:
+            batch.append(reminder)
+
+            if len(batch) >= batch_size:
+                counts["considered"] += len(batch)
+                counts["created"] += _insert(batch)
+                batch = []
+
+    if batch:
+        counts["considered"] += len(batch)
+        counts["created"] += _insert(batch)
+
+    return counts
+
+
+# ============================================================
+# DISPATCH
+# ============================================================
+
+def expire(now=None):
+    """
+    Fail reminders that can no longer be useful: pending ones for an
+    appointment that has started or a follow-up day that has ended, and
+    ones left "sending" by a run that died mid-batch (the sender may
+    already have delivered them, so they are not sent again).
+    """
+
+    now = now or timezone.now()
+
+    late = Reminder.objects.filter(status=Reminder.PENDING).filter(
+        Q(kind=Reminder.APPOINTMENT, due_at__lt=now)
+        | Q(kind=Reminder.FOLLOW_UP, due_at__lt=now - datetime.timedelta(days=1))
+    ).update(status=Reminder.FAILED, last_error="Expired before it was sent.")
+
+    interrupted = Reminder.objects.filter(
+        status=Reminder.SENDING,
+        claimed_at__lt=now - datetime.timedelta(seconds=settings.REMINDER_SENDING_TIMEOUT_SECONDS),
+    ).update(
+        status=Reminder.FAILED,
+        claim="",
+        last_error="Interrupted while sending; not retried in case it was delivered.",
+    )
+
+    return late, interrupted
+
+
+def _claim(limit, started):
+    """
+    Move up to `limit` pending reminders to "sending" under a new token.
+    Ones already tried since `started` are left for the next run.
+    """
+
+    token = uuid.uuid4().hex
+    ids = list(
+        Reminder.objects.filter(status=Reminder.PENDING)
+        .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=started))
+        .order_by("id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+    if not ids:
+        return None, []
+
+    # Rows another dispatcher took in the meantime are no longer pending.
+    Reminder.objects.filter(id__in=ids, status=Reminder.PENDING).update(
+        status=Reminder.SENDING,
+        claim=token,
+        claimed_at=timezone.now(),
+        attempts=F("attempts") + 1,
+    )
+
+    return token, list(Reminder.objects.filter(claim=token).order_by("id"))
+
+
+def dispatch(sender=None, batch_size=None):
+    """Send every pending reminder; returns counts of sent, retried and failed."""
+
+    sender = sender or get_sender()
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    counts = {"sent": 0, "retrying": 0, "failed": 0}
+    started = timezone.now()
+
+    expire(started)
+
+    while True:
+        token, batch = _claim(batch_size, started)
+
+        if token is None:
+            break
+
+        if not batch:
+            continue
+
+        try:
+            errors = sender.send(batch) or {}
+        except Exception as exc:
+            errors = {reminder.id: repr(exc) for reminder in batch}
+
+        claimed = Reminder.objects.filter(claim=token)
+        counts["sent"] += claimed.exclude(id__in=list(errors)).update(
+            status=Reminder.SENT,
+            claim="",
+            last_error="",
+            sent_at=timezone.now(),
+        )
+
+        for reminder in batch:
+            if reminder.id not in errors:
+                continue
+
+            if reminder.attempts < settings.REMINDER_MAX_ATTEMPTS:
+                status = Reminder.PENDING
+                counts["retrying"] += 1
+            else:
+                status = Reminder.FAILED
+                counts["failed"] += 1
+
+            claimed.filter(id=reminder.id).update(status=status, claim="", last_error=str(errors[reminder.id]))
+
+    return counts
+
+
+def run(now=None, sender=None, batch_size=None):
+    return {
+        "generated": generate(now, batch_size),
+        "dispatched": dispatch(sender, batch_size),
+    }
@@ -0,0 +1,13 @@
+# Vetmanagementsystem/renderers.py
+from rest_framework.renderers import JSONRenderer
+
+from . import metrics
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that reports its time as the request's serialization time."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+
+        with metrics.timed("serialize"):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,222 @@
+# Vetmanagementsystem/response_cache.py
+"""
+Rendered GET responses, cached per endpoint, per scope (one client, or
+staff) and per query string.
+
+Invalidation is generational: every (model, scope) pair has a token
+that is part of the cache key. A write to a row owned by client N
+replaces the tokens for (model, client N) and (model, staff), so only
+those entries become unreachable; they then age out. Rows whose
+client cannot be resolved replace the (model, "*") token that every
+key also includes.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import (
+    AllergyAlert,
+    Appointment,
+    Client,
+    ClientCommunicationNote,
+    ClientNote,
+    Document,
+    Medication,
+    Patient,
+    PatientSummary,
+    Receipt,
+    TreatmentPlan,
+    Visit,
+    VitalSigns,
+)
+
+
+STAFF_SCOPE = "staff"
+ANY_SCOPE = "*"
+
+# Path from each cached model to the owning Client's id.
+CLIENT_PATHS = {
+    Client: "id",
+    Patient: "client_id",
+    Appointment: "client_id",
+    Receipt: "client_id",
+    ClientCommunicationNote: "client_id",
+    Visit: "patient__client_id",
+    PatientSummary: "patient__client_id",
+    AllergyAlert: "patient__client_id",
+    Document: "patient__client_id",
+    VitalSigns: "visit__patient__client_id",
+    ClientNote: "visit__patient__client_id",
+    Medication: "visit__patient__client_id",
+    TreatmentPlan: "visit__patient__client_id",
+}
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _generation_key(model, scope):
+    return f"rc:gen:{model._meta.label_lower}:{scope}"
+
+
+# ============================================================
+# LOOKUP
+# ============================================================
+
+def generations(models, scope):
+    """
+    Current tokens for every (model, scope) and (model, "*") pair.
+    Missing tokens are created, never defaulted: a constant default
+    would make entries from before an eviction reachable again.
+    """
+
+    cache = _cache()
+    keys = [
+        _generation_key(model, part)
+        for model in models
+        for part in (scope, ANY_SCOPE)
+    ]
+    found = cache.get_many(keys)
+
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            found[key] = cache.get(key)
+
+    return [found[key] for key in keys]
+
+
+def entry_key(endpoint, scope, request_key, tokens):
+    digest = hashlib.sha256(repr((request_key, tokens)).encode("utf-8")).hexdigest()
+    return f"rc:entry:{endpoint}:{scope}:{digest}"
+
+
+def load(key):
+    return _cache().get(key)
+
+
+def store(key, value):
+    _cache().set(key, value, settings.RESPONSE_CACHE_SECONDS)
+
+
+# ============================================================
+# INVALIDATION
+# ============================================================
+
+def _bump(model, scopes):
+
+    cache = _cache()
+    cache.set_many(
+        {_generation_key(model, scope): uuid.uuid4().hex for scope in scopes},
+        timeout=None,
+    )
+
+
+def invalidate(model, client_ids):
+    """
+    Retire cached responses that read `model` for these clients (and
+    for staff). None in `client_ids` means "owner unknown".
+    Deferred until commit so readers cannot re-cache old rows.
+    """
+
+    client_ids = set(client_ids)
+
+    if not client_ids:
+        return
+
+    scopes = {STAFF_SCOPE}
+
+    for client_id in client_ids:
+        scopes.add(ANY_SCOPE if client_id is None else str(client_id))
+
+    transaction.on_commit(lambda: _bump(model, scopes))
+
+
+def client_ids_for(model, instances):
+    """Owning client ids of `instances`, resolved with at most one query."""
+
+    path = CLIENT_PATHS.get(model)
+
+    if path is None:
+        return {None}
+
+    if path == "id":
+        return {instance.pk for instance in instances}
+
+    first, _, rest = path.partition("__")
+
+    if not rest:
+        return {getattr(instance, first) for instance in instances}
+
+    fk_ids = {getattr(instance, f"{first}_id") for instance in instances}
+    related = model._meta.get_field(first).related_model
+    owners = set(
+        related.objects.filter(pk__in=fk_ids - {None})
+        .values_list(rest, flat=True)
+        .distinct()
+    )
+
+    if None in fk_ids:
+        owners.add(None)
+
+    return owners
+
+
+def stored_client_id(model, pk):
+    """Owner of the row as currently stored (before an update)."""
+
+    path = CLIENT_PATHS.get(model)
+
+    if path is None or path == "id":
+        return pk
+
+    return model.objects.filter(pk=pk).values_list(path, flat=True).first()
+
+
+# ============================================================
+# STATS
+# ============================================================
+
+def record(endpoint, outcome):
+
+    cache = _cache()
+    key = f"rc:stats:{outcome}:{endpoint}"
+
+    cache.add(key, 0, timeout=None)
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def stats(endpoints):
+
+    cache = _cache()
+    keys = [
+        f"rc:stats:{outcome}:{endpoint}"
+        for endpoint in endpoints
+        for outcome in ("hit", "miss")
+    ]
+    values = cache.get_many(keys)
+
+    per_endpoint = {
+        endpoint: {
+            "hits": values.get(f"rc:stats:hit:{endpoint}", 0),
+            "misses": values.get(f"rc:stats:miss:{endpoint}", 0),
+        }
+        for endpoint in endpoints
+    }
+    hits = sum(row["hits"] for row in per_endpoint.values())
+    misses = sum(row["misses"] for row in per_endpoint.values())
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+        "endpoints": per_endpoint,
+    }
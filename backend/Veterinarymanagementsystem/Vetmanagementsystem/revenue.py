@@ -0,0 +1,292 @@
+# Vetmanagementsystem/revenue.py
+import datetime
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Receipt, RevenueRollup
+
+
+# Columns a rollup contribution depends on.
+TRACKED_FIELDS = ("client_id", "amount", "date", "status")
+
+STATUSES = [value for value, _ in Receipt._meta.get_field("status").choices]
+
+
+def month_of(value):
+
+    if isinstance(value, str):
+        value = parse_date(value)
+
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+
+    return value.replace(day=1)
+
+
+def add_months(month, count):
+
+    index = month.year * 12 + month.month - 1 + count
+
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+# ============================================================
+# CONTRIBUTIONS
+# ============================================================
+
+def contribution(instance):
+    """
+    What one receipt adds to the rollup:
+    {(client_id, month, status): {field: delta}}.
+    """
+
+    if instance.client_id is None or not instance.date:
+        return {}
+
+    return {(instance.client_id, month_of(instance.date), instance.status): {
+        "receipts_count": 1,
+        "amount_total": Decimal(instance.amount or 0),
+    }}
+
+
+# ============================================================
+# APPLY
+# ============================================================
+
+def _compute(client_id, month, status):
+
+    receipts = Receipt.objects.filter(date__gte=month, date__lt=add_months(month, 1), status=status)
+
+    if client_id is not None:
+        receipts = receipts.filter(client_id=client_id)
+
+    totals = receipts.aggregate(count=Count("id"), total=Sum("amount"))
+
+    return {"receipts_count": totals["count"], "amount_total": totals["total"] or 0}
+
+
+def rebuild_cell(client_id, month, status):
+    """Recompute one rollup row from Receipt."""
+
+    cell, _ = RevenueRollup.objects.update_or_create(
+        scope=RevenueRollup.scope_for(client_id),
+        month=month,
+        status=status,
+        defaults={"client_id": client_id, **_compute(client_id, month, status)},
+    )
+
+    return cell
+
+
+def _grouped(receipts):
+    """(client_id, month, status, count, total) per rollup cell."""
+
+    return (
+        receipts.annotate(month=TruncMonth("date"))
+        .values_list("client_id", "month", "status")
+        .annotate(n=Count("id"), total=Sum("amount"))
+        .order_by()
+        .iterator(chunk_size=5000)
+    )
+
+
+def _rows(client_id, cells):
+    return [
+        RevenueRollup(
+            scope=RevenueRollup.scope_for(client_id),
+            client_id=client_id,
+            month=month,
+            status=status,
+            receipts_count=count,
+            amount_total=total or 0,
+        )
+        for (month, status), (count, total) in cells.items()
+    ]
+
+
+def rebuild(client_id):
+    """Recompute one client's rows and the clinic-wide rows."""
+
+    cells = {}
+
+    for _, month, status, count, total in _grouped(Receipt.objects.filter(client_id=client_id)):
+        cells[month, status] = (count, total)
+
+    stored = RevenueRollup.objects.filter(scope=RevenueRollup.scope_for(client_id))
+    touched = set(cells) | set(stored.values_list("month", "status"))
+
+    stored.delete()
+    RevenueRollup.objects.bulk_create(_rows(client_id, cells), batch_size=1000)
+
+    for month, status in touched:
+        rebuild_cell(None, month, status)
+
+    return len(cells)
+
+
+def rebuild_all():
+    """
+    Recompute every rollup row with one grouped scan of Receipt; the
+    clinic-wide rows are summed in memory from the per-client cells.
+    """
+
+    per_client = {}
+    overall = {}
+
+    for client_id, month, status, count, total in _grouped(Receipt.objects.all()):
+        per_client.setdefault(client_id, {})[month, status] = (count, total)
+
+        seen_count, seen_total = overall.get((month, status), (0, 0))
+        overall[month, status] = (seen_count + count, seen_total + (total or 0))
+
+    rows = _rows(None, overall)
+
+    for client_id, cells in per_client.items():
+        rows.extend(_rows(client_id, cells))
+
+    RevenueRollup.objects.all().delete()
+    RevenueRollup.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
+
+
+def _bump(client_id, month, status, fields, create_missing):
+
+    cell = RevenueRollup.objects.filter(scope=RevenueRollup.scope_for(client_id), month=month, status=status)
+    updates = {field: F(field) + value for field, value in fields.items()}
+    updates["updated_at"] = timezone.now()
+
+    if cell.update(**updates):
+        return
+
+    if not create_missing:
+        return
+
+    # First receipt in this cell: Receipt already holds the row being
+    # saved, so a rebuild is exact.
+    try:
+        with transaction.atomic():
+            rebuild_cell(client_id, month, status)
+    except IntegrityError:
+        cell.update(**updates)
+
+
+def apply(deltas, create_missing=True):
+    """
+    Add per-cell deltas to each client row and to the clinic-wide row.
+    Runs inside the caller's transaction (see AtomicWritesMixin).
+    """
+
+    if not deltas:
+        return
+
+    overall = {}
+
+    for (client_id, month, status), fields in deltas.items():
+        _bump(client_id, month, status, fields, create_missing)
+        bucket = overall.setdefault((month, status), {})
+        for field, value in fields.items():
+            bucket[field] = bucket.get(field, 0) + value
+
+    for (month, status), fields in overall.items():
+        fields = {field: value for field, value in fields.items() if value}
+        if fields:
+            _bump(None, month, status, fields, create_missing)
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def _empty():
+    return {
+        "count": 0,
+        "total": Decimal("0.00"),
+        "statuses": {status: {"count": 0, "total": Decimal("0.00")} for status in STATUSES},
+    }
+
+
+def _add(bucket, status, count, total):
+
+    bucket["count"] += count
+    bucket["total"] += total
+    bucket["statuses"].setdefault(status, {"count": 0, "total": Decimal("0.00")})
+    bucket["statuses"][status]["count"] += count
+    bucket["statuses"][status]["total"] += total
+
+
+def report(since, until, client_id=None, by_client=False, limit=50):
+    """
+    Revenue per month and status between two months (inclusive), with
+    the same month a year earlier for comparison. Reads only rollup rows.
+    """
+
+    months = {}
+    month = since
+
+    while month <= until:
+        months[month] = _empty()
+        month = add_months(month, 1)
+
+    previous = {}
+    totals = _empty()
+    totals["previous_year_total"] = Decimal("0.00")
+
+    cells = RevenueRollup.objects.filter(
+        scope=RevenueRollup.scope_for(client_id),
+        month__gte=add_months(since, -12),
+        month__lte=until,
+    ).values_list("month", "status", "receipts_count", "amount_total")
+
+    for month, status, count, total in cells:
+        if month in months:
+            _add(months[month], status, count, total)
+            _add(totals, status, count, total)
+
+        compared = add_months(month, 12)
+
+        if compared in months:
+            previous[compared] = previous.get(compared, Decimal("0.00")) + total
+            totals["previous_year_total"] += total
+
+    body = {
+        "client": client_id,
+        "since": since.strftime("%Y-%m"),
+        "until": until.strftime("%Y-%m"),
+        "months": [
+            {"month": month.strftime("%Y-%m"), **bucket, "previous_year_total": previous.get(month, Decimal("0.00"))}
+            for month, bucket in months.items()
+        ],
+        "totals": totals,
+    }
+
+    if by_client:
+        ranked = (
+            RevenueRollup.objects.filter(month__gte=since, month__lte=until, client__isnull=False)
+            .values("client_id")
+            .annotate(
+                full_name=F("client__full_name"),
+                count=Sum("receipts_count"),
+                total=Sum("amount_total"),
+                **{status: Sum("amount_total", filter=Q(status=status)) for status in STATUSES},
+            )
+            .order_by("-total", "client_id")[:limit]
+        )
+
+        body["clients"] = [
+            {
+                "client": row["client_id"],
+                "full_name": row["full_name"],
+                "count": row["count"],
+                "total": row["total"],
+                "statuses": {status: row[status] or Decimal("0.00") for status in STATUSES},
+            }
+            for row in ranked
+        ]
+
+    return body
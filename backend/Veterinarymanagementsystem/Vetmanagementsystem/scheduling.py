@@ -0,0 +1,209 @@
+# Vetmanagementsystem/scheduling.py
+import datetime
+from bisect import bisect_left
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Appointment, CustomUser
+
+
+# ============================================================
+# VETERINARIANS
+# ============================================================
+
+def veterinarians():
+    """Staff users that can be booked (inactive doctor profiles excluded)."""
+
+    return (
+        CustomUser.objects.filter(is_staff=True, is_active=True)
+        .exclude(doctor_profile__is_active=False)
+        .order_by("id")
+    )
+
+
+def display_name(user):
+    return user.full_name or user.get_full_name() or user.username
+
+
+# ============================================================
+# BUSY INTERVALS
+# ============================================================
+
+class BusySchedule:
+    """
+    Per-vet sorted, merged busy intervals, built from one range query.
+    `is_free` is a binary search, so checking a slot costs O(log n).
+    """
+
+    def __init__(self, intervals_by_vet):
+
+        self._starts = {}
+        self._ends = {}
+
+        for vet_id, intervals in intervals_by_vet.items():
+            merged = []
+            for start, end in sorted(intervals):
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            self._starts[vet_id] = [start for start, _ in merged]
+            self._ends[vet_id] = [end for _, end in merged]
+
+    @classmethod
+    def load(cls, vet_ids, start, end, exclude_pk=None):
+        """Appointments of `vet_ids` overlapping [start, end)."""
+
+        longest = datetime.timedelta(minutes=settings.APPOINTMENT_MAX_MINUTES)
+        rows = Appointment.objects.filter(
+            veterinarian_id__in=list(vet_ids),
+            date__lt=end,
+            date__gt=start - longest,
+        )
+
+        if exclude_pk is not None:
+            rows = rows.exclude(pk=exclude_pk)
+
+        intervals = {vet_id: [] for vet_id in vet_ids}
+
+        for vet_id, begins, minutes in rows.values_list("veterinarian_id", "date", "duration_minutes"):
+            finishes = begins + datetime.timedelta(minutes=minutes)
+            if finishes > start:
+                intervals[vet_id].append((begins, finishes))
+
+        return cls(intervals)
+
+    def conflict(self, vet_id, start, end):
+        """The busy interval overlapping [start, end), or None."""
+
+        starts = self._starts.get(vet_id, [])
+        index = bisect_left(starts, end)
+
+        # Only the last interval starting before `end` can overlap,
+        # because merged intervals do not overlap each other.
+        if index and self._ends[vet_id][index - 1] > start:
+            return starts[index - 1], self._ends[vet_id][index - 1]
+
+        return None
+
+    def is_free(self, vet_id, start, end):
+        return self.conflict(vet_id, start, end) is None
+
+
+# ============================================================
+# AVAILABILITY
+# ============================================================
+
+def _opening_windows(first_day, last_day):
+
+    tz = timezone.get_current_timezone()
+    opens = datetime.time.fromisoformat(settings.CLINIC_HOURS["open"])
+    closes = datetime.time.fromisoformat(settings.CLINIC_HOURS["close"])
+    day = first_day
+
+    while day <= last_day:
+        if day.weekday() in settings.CLINIC_HOURS["days"]:
+            yield (
+                timezone.make_aware(datetime.datetime.combine(day, opens), tz),
+                timezone.make_aware(datetime.datetime.combine(day, closes), tz),
+            )
+        day += datetime.timedelta(days=1)
+
+
+def free_slots(first_day, last_day, duration, vet_ids=None):
+    """
+    Start times in opening hours, every APPOINTMENT_SLOT_MINUTES, at
+    which at least one vet is free for `duration` minutes:
+    [(start, end, [vet ids])].
+    """
+
+    vets = list(veterinarians())
+
+    if vet_ids is not None:
+        vets = [vet for vet in vets if vet.id in vet_ids]
+
+    windows = list(_opening_windows(first_day, last_day))
+
+    if not vets or not windows:
+        return vets, []
+
+    schedule = BusySchedule.load([vet.id for vet in vets], windows[0][0], windows[-1][1])
+    length = datetime.timedelta(minutes=duration)
+    step = datetime.timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    now = timezone.now()
+    slots = []
+
+    for opens, closes in windows:
+        start = opens
+        while start + length <= closes:
+            if start >= now:
+                end = start + length
+                free = [vet.id for vet in vets if schedule.is_free(vet.id, start, end)]
+                if free:
+                    slots.append((start, end, free))
+            start += step
+
+    return vets, slots
+
+
+# ============================================================
+# BOOKING
+# ============================================================
+
+def _lock_veterinarians(vet_ids):
+    # Serializes bookings per vet on Postgres. SQLite runs writes with
+    # transaction_mode IMMEDIATE (see settings), which serializes them
+    # for the whole database.
+    list(CustomUser.objects.select_for_update().filter(id__in=vet_ids).values_list("id", flat=True))
+
+
+def assign_and_check(validated, instance=None):
+    """
+    Inside the write transaction: lock the vet(s), then make sure the
+    appointment does not overlap another one. Without a vet, the first
+    free one is assigned. Raises ValidationError on a conflict.
+    """
+
+    start = validated.get("date", instance.date if instance else None)
+    minutes = validated.get(
+        "duration_minutes",
+        instance.duration_minutes if instance else Appointment._meta.get_field("duration_minutes").default,
+    )
+    vet = validated.get("veterinarian", instance.veterinarian if instance else None)
+
+    if start is None:
+        return validated
+
+    end = start + datetime.timedelta(minutes=minutes)
+    exclude_pk = instance.pk if instance else None
+
+    if vet is not None:
+        _lock_veterinarians([vet.id])
+        conflict = BusySchedule.load([vet.id], start, end, exclude_pk).conflict(vet.id, start, end)
+
+        if conflict:
+            raise ValidationError({
+                "date": [
+                    f"{display_name(vet)} is booked from {conflict[0].isoformat()} "
+                    f"to {conflict[1].isoformat()}."
+                ]
+            })
+
+        return validated
+
+    candidates = list(veterinarians())
+
+    if not candidates:
+        return validated
+
+    _lock_veterinarians([candidate.id for candidate in candidates])
+    schedule = BusySchedule.load([candidate.id for candidate in candidates], start, end, exclude_pk)
+
+    for candidate in candidates:
+        if schedule.is_free(candidate.id, start, end):
+            validated["veterinarian"] = candidate
+            return validated
+
+    raise ValidationError({"date": ["No veterinarian is free at that time."]})
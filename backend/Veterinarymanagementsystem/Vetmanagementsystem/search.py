@@ -0,0 +1,251 @@
+# Vetmanagementsystem/search.py
+import re
+
+from django.db import connection
+
+from .models import Client, ClientNote, Patient, SearchEntry, TreatmentPlan, Visit
+
+
+FTS_TABLE = f"{SearchEntry._meta.db_table}_fts"
+MAX_LIMIT = 50
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _join(*parts):
+    return " ".join(str(part) for part in parts if part)
+
+
+# ============================================================
+# DOCUMENTS
+# ============================================================
+# Each builder turns a queryset of source rows into SearchEntry
+# objects with one values_list() query.
+
+def _client_entries(queryset):
+    for pk, full_name, phone in queryset.values_list("id", "full_name", "phone").iterator(chunk_size=2000):
+        yield SearchEntry(
+            kind="client", object_id=pk, client_id=pk,
+            name=full_name or "", body=_join(full_name, phone),
+        )
+
+
+def _patient_entries(queryset):
+    rows = queryset.values_list("id", "client_id", "name", "patient_id", "breed", "species")
+    for pk, client_id, name, code, breed, species in rows.iterator(chunk_size=2000):
+        yield SearchEntry(
+            kind="patient", object_id=pk, client_id=client_id, patient_id=pk,
+            name=name or "", body=_join(name, code, breed, species),
+        )
+
+
+def _note_entries(queryset):
+    rows = queryset.values_list("id", "visit__patient__client_id", "visit__patient_id", "note")
+    for pk, client_id, patient_id, note in rows.iterator(chunk_size=2000):
+        yield SearchEntry(
+            kind="note", object_id=pk, client_id=client_id, patient_id=patient_id,
+            body=note or "",
+        )
+
+
+def _visit_entries(queryset):
+    rows = queryset.values_list("id", "patient__client_id", "patient_id", "notes")
+    for pk, client_id, patient_id, notes in rows.iterator(chunk_size=2000):
+        yield SearchEntry(
+            kind="visit", object_id=pk, client_id=client_id, patient_id=patient_id,
+            body=notes or "",
+        )
+
+
+def _treatment_entries(queryset):
+    rows = queryset.values_list(
+        "id", "visit__patient__client_id", "visit__patient_id", "diagnosis", "treatment_description"
+    )
+    for pk, client_id, patient_id, diagnosis, description in rows.iterator(chunk_size=2000):
+        yield SearchEntry(
+            kind="treatment", object_id=pk, client_id=client_id, patient_id=patient_id,
+            name=(diagnosis or "")[:255], body=_join(diagnosis, description),
+        )
+
+
+SOURCES = {
+    Client: ("client", _client_entries),
+    Patient: ("patient", _patient_entries),
+    ClientNote: ("note", _note_entries),
+    Visit: ("visit", _visit_entries),
+    TreatmentPlan: ("treatment", _treatment_entries),
+}
+
+
+# ============================================================
+# INDEXING
+# ============================================================
+
+def index_queryset(model, queryset, batch_size=1000):
+    """Upsert the entries for every row of `queryset`."""
+
+    kind, build = SOURCES[model]
+    batch = []
+    written = 0
+
+    for entry in build(queryset):
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            written += _upsert(batch)
+            batch = []
+
+    if batch:
+        written += _upsert(batch)
+
+    return written
+
+
+def _upsert(entries):
+
+    SearchEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["kind", "object_id"],
+        update_fields=["client", "patient_id", "name", "body", "updated_at"],
+    )
+
+    return len(entries)
+
+
+def index_instances(model, instances):
+
+    if model not in SOURCES:
+        return 0
+
+    pks = [instance.pk for instance in instances if instance.pk is not None]
+
+    if not pks:
+        return 0
+
+    return index_queryset(model, model.objects.filter(pk__in=pks))
+
+
+def unindex(model, pks):
+
+    if model not in SOURCES:
+        return
+
+    SearchEntry.objects.filter(kind=SOURCES[model][0], object_id__in=list(pks)).delete()
+
+
+def move_patient(patient_id, client_id):
+    """Re-scope a patient's notes, visits and treatments after a client change."""
+
+    SearchEntry.objects.filter(patient_id=patient_id).exclude(
+        client_id=client_id
+    ).update(client_id=client_id)
+
+
+def rebuild():
+
+    SearchEntry.objects.all().delete()
+
+    return {
+        kind: index_queryset(model, model.objects.order_by("pk"))
+        for model, (kind, _) in SOURCES.items()
+    }
+
+
+# ============================================================
+# QUERY
+# ============================================================
+
+def _sqlite_match(text):
+    # Quote every token and allow prefixes: "bel"* matches "Bella".
+    return " ".join(f'"{token}"*' for token in TOKEN_RE.findall(text))
+
+
+def _filters(alias, client_id, kinds):
+
+    sql = []
+    params = []
+
+    if client_id is not None:
+        sql.append(f"{alias}.client_id = %s")
+        params.append(client_id)
+
+    if kinds:
+        sql.append(f"{alias}.kind IN ({', '.join(['%s'] * len(kinds))})")
+        params.extend(kinds)
+
+    return "".join(f" AND {clause}" for clause in sql), params
+
+
+def _search_sqlite(text, client_id, kinds, limit):
+
+    match = _sqlite_match(text)
+
+    if not match:
+        return []
+
+    extra, params = _filters("e", client_id, kinds)
+    sql = f"""
+        SELECT e.kind, e.object_id, e.client_id, e.patient_id, e.name,
+               snippet({FTS_TABLE}, 1, '[', ']', '…', 12),
+               -bm25({FTS_TABLE}, 4.0, 1.0) AS score
+        FROM {FTS_TABLE}
+        JOIN {SearchEntry._meta.db_table} e ON e.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s{extra}
+        ORDER BY score DESC
+        LIMIT %s
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, *params, limit])
+        return cursor.fetchall()
+
+
+def _search_postgres(text, client_id, kinds, limit):
+
+    extra, params = _filters("e", client_id, kinds)
+    sql = f"""
+        SELECT kind, object_id, client_id, patient_id, name,
+               ts_headline('english', body, query, 'MaxFragments=1, MinWords=5, MaxWords=20'),
+               score
+        FROM (
+            SELECT e.*, q.query,
+                   ts_rank(e.search_vector, q.query) + similarity(e.name, %s) AS score
+            FROM {SearchEntry._meta.db_table} e,
+                 (SELECT websearch_to_tsquery('english', %s)
+                         || websearch_to_tsquery('simple', %s) AS query) q
+            WHERE (e.search_vector @@ q.query OR e.name %% %s){extra}
+            ORDER BY score DESC
+            LIMIT %s
+        ) hits
+        ORDER BY score DESC
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [text, text, text, text, *params, limit])
+        return cursor.fetchall()
+
+
+def search(text, client_id=None, kinds=None, limit=20):
+    """
+    Ranked matches as dicts. `client_id` scopes to one client's rows;
+    None searches everything (staff).
+    """
+
+    limit = max(1, min(int(limit), MAX_LIMIT))
+
+    if connection.vendor == "postgresql":
+        rows = _search_postgres(text, client_id, kinds, limit)
+    else:
+        rows = _search_sqlite(text, client_id, kinds, limit)
+
+    return [
+        {
+            "kind": kind,
+            "id": object_id,
+            "client": entry_client,
+            "patient": patient_id,
+            "name": name,
+            "snippet": snippet,
+            "score": round(float(score), 4),
+        }
+        for kind, object_id, entry_client, patient_id, name, snippet, score in rows
+    ]
@@ -0,0 +1,354 @@
+# Vetmanagementsystem/seeding.py
+"""
+Synthetic clinic history for load and scaling tests.
+
+Everything is drawn from one random.Random(seed), in a fixed order,
+so the same seed, size and end date always give the same rows. Rows
+are written per batch of clients with bulk_create, so counters, the
+revenue rollup and the search index have to be rebuilt afterwards
+(the command does it).
+"""
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    AllergyAlert,
+    Appointment,
+    Client,
+    ClientCommunicationNote,
+    ClientNote,
+    CustomUser,
+    DoctorProfile,
+    Document,
+    Medication,
+    Patient,
+    Receipt,
+    TreatmentPlan,
+    Visit,
+    VitalSigns,
+)
+
+
+# (species, weight, breeds, kg range, temperature °C, heart rate, respiration)
+SPECIES = (
+    ("Dog", 55, ("Labrador", "German Shepherd", "Beagle", "Poodle", "Mixed"), (4, 45), (38.3, 39.2), (70, 120), (10, 30)),
+    ("Cat", 35, ("Domestic Shorthair", "Siamese", "Maine Coon", "Persian"), (2.5, 7), (38.1, 39.2), (140, 220), (20, 30)),
+    ("Rabbit", 4, ("Lop", "Rex", "Dutch"), (1, 5), (38.5, 40.0), (130, 325), (30, 60)),
+    ("Bird", 3, ("Budgerigar", "Cockatiel", "African Grey"), (0.03, 0.6), (40.0, 42.0), (250, 600), (20, 50)),
+    ("Reptile", 2, ("Bearded Dragon", "Leopard Gecko", "Corn Snake"), (0.05, 2), (25.0, 35.0), (20, 80), (6, 20)),
+    ("Other", 1, ("Ferret", "Guinea Pig", "Hamster"), (0.05, 2), (37.5, 39.5), (150, 300), (20, 60)),
+)
+
+# Patients per client: most households have one animal.
+PATIENTS_PER_CLIENT = ((1, 55), (2, 25), (3, 12), (4, 5), (5, 2), (6, 1))
+
+# Visits per patient per year: a long tail of frequent visitors.
+VISIT_RATES = ((0.5, 30), (1, 30), (2, 22), (4, 12), (8, 5), (16, 1))
+
+PET_NAMES = (
+    "Bella", "Max", "Luna", "Charlie", "Lucy", "Cooper", "Daisy", "Milo",
+    "Bailey", "Coco", "Rocky", "Nala", "Simba", "Oliver", "Lola", "Leo",
+    "Zoe", "Toby", "Ruby", "Oscar", "Rosie", "Jack", "Molly", "Loki",
+)
+FIRST_NAMES = (
+    "Amina", "Omar", "Sara", "John", "Maria", "Ahmed", "Fatima", "David",
+    "Hodan", "Liam", "Noor", "Emma", "Yusuf", "Grace", "Abdi", "Leila",
+)
+LAST_NAMES = (
+    "Hassan", "Smith", "Ali", "Johnson", "Mohamed", "Garcia", "Warsame",
+    "Brown", "Osman", "Jones", "Farah", "Miller", "Ibrahim", "Davis",
+)
+COLORS = ("Black", "White", "Brown", "Golden", "Grey", "Tabby", "Spotted", "Cream")
+GENDERS = ("Male", "Female")
+DIAGNOSES = (
+    ("Otitis externa", "Ear cleaning and topical drops for 10 days."),
+    ("Dental disease", "Scale and polish under anaesthesia; soft food for 3 days."),
+    ("Gastroenteritis", "Bland diet, fluids and anti-emetic."),
+    ("Dermatitis", "Medicated shampoo twice weekly; recheck skin in 2 weeks."),
+    ("Lameness, left forelimb", "Rest, NSAIDs and recheck."),
+    ("Annual vaccination", "Core vaccines administered."),
+    ("Obesity", "Weight-loss diet and monthly weigh-ins."),
+    ("Urinary tract infection", "Antibiotics and increased water intake."),
+)
+MEDICATIONS = (
+    ("Amoxicillin", "50mg", "BID", "10 days"),
+    ("Meloxicam", "0.1mg/kg", "SID", "5 days"),
+    ("Maropitant", "1mg/kg", "SID", "3 days"),
+    ("Prednisolone", "5mg", "SID", "7 days"),
+    ("Metronidazole", "25mg", "BID", "7 days"),
+    ("Fenbendazole", "50mg/kg", "SID", "3 days"),
+)
+NOTES = (
+    "Eating and drinking normally.",
+    "Owner reports mild lethargy since yesterday.",
+    "Calm during examination.",
+    "Recheck recommended if symptoms persist.",
+    "Weight stable compared to last visit.",
+)
+ALLERGIES = (("Penicillin", "High"), ("Chicken protein", "Medium"), ("Flea saliva", "Low"), ("NSAIDs", "High"))
+DOCUMENT_TYPES = ("Rabies Certificate", "Spay/Neuter Certificate", "Referral", "Other")
+VISIT_STATUSES = ("Discharged", "Discharged", "Discharged", "Ready for discharge", "Checked-in")
+
+OPENING_SLOTS = 32  # 15-minute slots from 09:00
+
+
+def _choose(rng, table):
+    """Weighted pick from ((value, weight), ...)."""
+
+    total = sum(weight for _, weight in table)
+    point = rng.random() * total
+
+    for value, weight in table:
+        point -= weight
+        if point < 0:
+            return value
+
+    return table[-1][0]
+
+
+class ClinicGenerator:
+    """Writes clients and their clinical history, batch by batch."""
+
+    def __init__(self, seed=0, years=3, end_date=None, password="clinic-pass-123", prefix=None):
+
+        self.rng = random.Random(seed)
+        self.years = years
+        self.end_date = end_date or timezone.localdate()
+        self.start_date = self.end_date - datetime.timedelta(days=round(365.25 * years))
+        self.prefix = prefix if prefix is not None else f"s{seed}-"
+        self.password = make_password(password)
+        self.tz = timezone.get_current_timezone()
+        self.vet_ids = []
+        self.next_client = 0
+        self.next_patient = 0
+        self.species_table = tuple((row, row[1]) for row in SPECIES)
+
+    # ------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------
+
+    def _person(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _phone(self):
+        return f"555-{self.rng.randrange(10000):04d}"
+
+    def _slot(self, day):
+        """A random 15-minute slot in opening hours on `day`."""
+
+        minutes = 9 * 60 + 15 * self.rng.randrange(OPENING_SLOTS)
+        return datetime.datetime(day.year, day.month, day.day, minutes // 60, minutes % 60, tzinfo=self.tz)
+
+    def _user(self, kind, index, full_name, staff=False):
+        username = f"{self.prefix}{kind}{index:07d}"
+        first, _, last = full_name.partition(" ")
+        return CustomUser(
+            username=username,
+            email=f"{username}@seed.clinic.test",
+            password=self.password,
+            full_name=full_name,
+            first_name=first,
+            last_name=last,
+            phone=self._phone(),
+            is_staff=staff,
+        )
+
+    # ------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------
+
+    def create_veterinarians(self, count):
+
+        users = CustomUser.objects.bulk_create([
+            self._user("vet", index, f"Dr {self._person()}", staff=True)
+            for index in range(count)
+        ])
+        DoctorProfile.objects.bulk_create([
+            DoctorProfile(user=user, specialization=self.rng.choice(("General", "Surgery", "Dentistry", "Exotics")))
+            for user in users
+        ])
+        self.vet_ids = [user.id for user in users]
+
+        return len(users)
+
+    def _patients(self, clients):
+
+        patients = []
+
+        for client in clients:
+            for _ in range(_choose(self.rng, PATIENTS_PER_CLIENT)):
+                species = _choose(self.rng, self.species_table)
+                name, _, breeds, (low, high), *_ = species
+                born = self.start_date - datetime.timedelta(days=self.rng.randrange(60, 365 * 12))
+                self.next_patient += 1
+                patient = Patient(
+                    patient_id=f"{self.prefix}{self.next_patient:09d}",
+                    client=client,
+                    name=self.rng.choice(PET_NAMES),
+                    species=name,
+                    breed=self.rng.choice(breeds),
+                    gender=self.rng.choice(GENDERS),
+                    color=self.rng.choice(COLORS),
+                    date_of_birth=born,
+                    weight_kg=Decimal(f"{self.rng.uniform(low, high):.2f}"),
+                )
+                patient.species_profile = species
+                patients.append(patient)
+
+        return patients
+
+    def _visit_days(self):
+        """Visit dates as a Poisson process over the history window."""
+
+        mean_gap = 365.25 / _choose(self.rng, VISIT_RATES)
+        span = (self.end_date - self.start_date).days
+        offset = self.rng.expovariate(1 / mean_gap)
+        days = []
+
+        while offset < span:
+            days.append(self.start_date + datetime.timedelta(days=int(offset)))
+            offset += self.rng.expovariate(1 / mean_gap)
+
+        return days
+
+    def _visit_children(self, visit, patient, rows):
+
+        rng = self.rng
+        _, _, _, _, (t_low, t_high), (h_low, h_high), (r_low, r_high) = patient.species_profile
+        day = visit.visit_date.date()
+
+        if rng.random() < 0.9:
+            pounds = float(patient.weight_kg) * 2.20462 * rng.uniform(0.95, 1.05)
+            rows["vitals"].append(VitalSigns(
+                visit=visit,
+                weight_lbs=Decimal(f"{int(pounds)}"),
+                weight_oz=Decimal(f"{(pounds % 1) * 16:.2f}"),
+                temperature=Decimal(f"{rng.uniform(t_low, t_high + 0.6):.1f}"),
+                heart_rate=rng.randint(h_low, h_high),
+                respiration=rng.randint(r_low, r_high),
+            ))
+
+        if rng.random() < 0.4:
+            for name, dosage, frequency, duration in rng.sample(MEDICATIONS, rng.randint(1, 2)):
+                rows["medications"].append(Medication(
+                    visit=visit, name=name, dosage=dosage, frequency=frequency, duration=duration,
+                ))
+
+        if rng.random() < 0.3:
+            diagnosis, description = rng.choice(DIAGNOSES)
+            follow_up = day + datetime.timedelta(days=rng.choice((7, 14, 30))) if rng.random() < 0.6 else None
+            rows["treatments"].append(TreatmentPlan(
+                visit=visit, diagnosis=diagnosis, treatment_description=description, follow_up_date=follow_up,
+            ))
+
+        if rng.random() < 0.25:
+            rows["notes"].append(ClientNote(visit=visit, note=rng.choice(NOTES)))
+
+        if rng.random() < 0.85:
+            age = (self.end_date - day).days
+            if age > 30:
+                status = _choose(rng, (("Paid", 92), ("Cancelled", 3), ("Pending", 5)))
+            else:
+                status = _choose(rng, (("Paid", 55), ("Pending", 40), ("Cancelled", 5)))
+            rows["receipts"].append(Receipt(
+                client_id=patient.client_id,
+                amount=Decimal(f"{min(rng.lognormvariate(4.4, 0.6), 5000):.2f}"),
+                date=day,
+                status=status,
+            ))
+
+    def write_batch(self, count, batch_size=2000):
+        """Create `count` clients with their history; returns rows per model."""
+
+        rng = self.rng
+        users = []
+
+        for _ in range(count):
+            self.next_client += 1
+            users.append(self._user("client", self.next_client, self._person()))
+
+        with transaction.atomic():
+            CustomUser.objects.bulk_create(users, batch_size=batch_size)
+            clients = Client.objects.bulk_create(
+                [Client(user=user, full_name=user.full_name, phone=user.phone) for user in users],
+                batch_size=batch_size,
+            )
+            patients = Patient.objects.bulk_create(self._patients(clients), batch_size=batch_size)
+
+            visits = []
+            rows = {key: [] for key in ("vitals", "medications", "treatments", "notes", "receipts")}
+            extras = {key: [] for key in ("allergies", "documents", "appointments", "communications")}
+
+            for patient in patients:
+                for day in self._visit_days():
+                    age_days = (day - patient.date_of_birth).days
+                    visits.append(Visit(
+                        patient=patient,
+                        veterinarian_id=rng.choice(self.vet_ids) if self.vet_ids else None,
+                        visit_date=self._slot(day),
+                        visit_status=rng.choice(VISIT_STATUSES) if (self.end_date - day).days < 2 else "Discharged",
+                        age_months=age_days // 30,
+                        notes=rng.choice(NOTES),
+                    ))
+
+                if rng.random() < 0.08:
+                    description, severity = rng.choice(ALLERGIES)
+                    extras["allergies"].append(AllergyAlert(
+                        patient=patient, description=description, severity_level=severity,
+                    ))
+
+                if rng.random() < 0.1:
+                    extras["documents"].append(Document(
+                        patient=patient,
+                        document_type=rng.choice(DOCUMENT_TYPES),
+                        file="documents/seed/placeholder.pdf",
+                        issued_date=self.start_date + datetime.timedelta(
+                            days=rng.randrange((self.end_date - self.start_date).days + 1)
+                        ),
+                    ))
+
+                if rng.random() < 0.2:
+                    extras["appointments"].append(Appointment(
+                        patient=patient,
+                        client_id=patient.client_id,
+                        veterinarian_id=rng.choice(self.vet_ids) if self.vet_ids else None,
+                        date=self._slot(self.end_date + datetime.timedelta(days=rng.randint(1, 60))),
+                        duration_minutes=rng.choice((15, 30, 30, 45, 60)),
+                        reason="Follow-up",
+                    ))
+
+            for client in clients:
+                for _ in range(int(rng.expovariate(1.25))):
+                    extras["communications"].append(ClientCommunicationNote(
+                        client=client,
+                        message=rng.choice(("Reminder sent", "Called about results", "Invoice emailed")),
+                        saved_by_id=rng.choice(self.vet_ids) if self.vet_ids else None,
+                    ))
+
+            Visit.objects.bulk_create(visits, batch_size=batch_size)
+
+            for visit in visits:
+                self._visit_children(visit, visit.patient, rows)
+
+            VitalSigns.objects.bulk_create(rows["vitals"], batch_size=batch_size)
+            Medication.objects.bulk_create(rows["medications"], batch_size=batch_size)
+            TreatmentPlan.objects.bulk_create(rows["treatments"], batch_size=batch_size)
+            ClientNote.objects.bulk_create(rows["notes"], batch_size=batch_size)
+            Receipt.objects.bulk_create(rows["receipts"], batch_size=batch_size)
+            AllergyAlert.objects.bulk_create(extras["allergies"], batch_size=batch_size)
+            Document.objects.bulk_create(extras["documents"], batch_size=batch_size)
+            Appointment.objects.bulk_create(extras["appointments"], batch_size=batch_size)
+            ClientCommunicationNote.objects.bulk_create(extras["communications"], batch_size=batch_size)
+
+        return {
+            "clients": len(clients),
+            "patients": len(patients),
+            "visits": len(visits),
+            **{key: len(value) for key, value in rows.items()},
+            **{key: len(value) for key, value in extras.items()},
+        }
@@ -1,13 +1,70 @@
 # Vetmanagementsystem/serializers.py
+import datetime
+
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.urls import reverse
 from django.utils import timezone
-import base64
+from django.utils.dateparse import parse_date
 from .models import (
     Client, Patient, Appointment, Receipt, Visit, AllergyAlert, VitalSigns,
     ClientCommunicationNote, ClientNote, Medication, Document, TreatmentPlan,CustomUser,
+    DocumentUpload, Job, Reminder, PatientSummary,
 )
+from .authentication import add_identity_claims, is_revoked
+from .scheduling import display_name, veterinarians
+from . import jobs
+from .documents import received, store_upload
+from .photos import decode_data_url, photo_etag, photo_sizes, read_upload, store_photo
+from .revenue import add_months
+
+# Meta.related_fields maps read fields that reach across relations
+# (usually SerializerMethodFields) to the ORM paths they touch.
+# RelatedFieldsMixin in views.py turns them into select_related /
+# prefetch_related so list responses stay O(1) in queries.
+
+# -------------------------
+# Bulk writes
+# -------------------------
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves pks from context["related_cache"][field_name] when a bulk
+    request has pre-loaded them, instead of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        cache = self.context.get("related_cache", {}).get(self.field_name)
+        if cache is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            obj = cache.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """many=True create with a single bulk INSERT (no per-row save())."""
+
+    batch_size = 500
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data],
+            batch_size=self.batch_size,
+        )
+
 
 # -------------------------
 # Client
@@ -25,47 +82,110 @@ class ClientRegistrationSerializer(serializers.ModelSerializer):
         fields = ["full_name", "username", "email", "password", "phone"]
 
 
+# -------------------------
+# Auth tokens
+# -------------------------
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_identity_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        if is_revoked(RefreshToken(attrs["refresh"])):
+            raise InvalidToken("Token has been revoked")
+        return super().validate(attrs)
+
+
 # -------------------------
 # Patient
 # -------------------------
+class PatientSummarySerializer(serializers.ModelSerializer):
+    has_allergies = serializers.SerializerMethodField(read_only=True)
+    next_follow_up = serializers.DateField(read_only=True)
+
+    def get_has_allergies(self, obj):
+        return obj.allergy_count > 0
+
+    class Meta:
+        model = PatientSummary
+        fields = [
+            "last_visit",
+            "last_visit_date",
+            "current_status",
+            "active_medications",
+            "allergy_count",
+            "has_allergies",
+            "next_follow_up",
+        ]
+        read_only_fields = fields
+
+
 class PatientSerializer(serializers.ModelSerializer):
-    photo_data = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    summary = PatientSummarySerializer(read_only=True)
+    photo = serializers.ImageField(write_only=True, required=False, allow_null=True)
+    photo_data = serializers.CharField(
+        write_only=True, required=False, allow_blank=True, allow_null=True
+    )
+    photo_url = serializers.SerializerMethodField(read_only=True)
+    photo_thumbnail_url = serializers.SerializerMethodField(read_only=True)
+    photo_etag = serializers.SerializerMethodField(read_only=True)
+
+    def _photo_link(self, obj, size=None):
+        if not obj.photo_hash:
+            return None
+        args = [obj.photo_hash] if size is None else [obj.photo_hash, size]
+        url = reverse("patient-photo", args=args)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def get_photo_url(self, obj):
+        return self._photo_link(obj)
+
+    def get_photo_thumbnail_url(self, obj):
+        return self._photo_link(obj, photo_sizes()[0])
 
-    def _extract_photo_data(self, validated_data):
+    def get_photo_etag(self, obj):
+        return photo_etag(obj.photo_hash) if obj.photo_hash else None
+
+    def _extract_photo_hash(self, validated_data):
         photo_data = validated_data.pop("photo_data", None)
-        if photo_data:
-            return photo_data
+        photo_file = validated_data.pop("photo", None)
 
-        photo_file = validated_data.get("photo")
-        if not photo_file:
+        raw = decode_data_url(photo_data) if photo_data else None
+        if not raw and photo_file:
+            raw = read_upload(photo_file)
+        if not raw:
             return None
 
+        background = settings.PATIENT_PHOTO_THUMBNAILS_IN_BACKGROUND
+
         try:
-            photo_file.seek(0)
-            raw = photo_file.read()
-            if not raw:
-                return None
-            encoded = base64.b64encode(raw).decode("ascii")
-            content_type = getattr(photo_file, "content_type", "") or "image/jpeg"
-            return f"data:{content_type};base64,{encoded}"
-        except Exception:
-            return None
+            digest = store_photo(raw, thumbnails=not background)
+        except ValueError as exc:
+            raise ValidationError({"photo": [str(exc)]})
+
+        if background:
+            jobs.enqueue("photos.render_thumbnails", {"digest": digest}, priority=10)
+
+        return digest
 
     def create(self, validated_data):
-        photo_data = self._extract_photo_data(validated_data)
-        instance = super().create(validated_data)
-        if photo_data:
-            instance.photo_data = photo_data
-            instance.save(update_fields=["photo_data"])
-        return instance
+        photo_hash = self._extract_photo_hash(validated_data)
+        if photo_hash:
+            validated_data["photo_hash"] = photo_hash
+        return super().create(validated_data)
 
     def update(self, instance, validated_data):
-        photo_data = self._extract_photo_data(validated_data)
-        instance = super().update(instance, validated_data)
-        if photo_data is not None:
-            instance.photo_data = photo_data
-            instance.save(update_fields=["photo_data"])
-        return instance
+        # An explicit null or empty photo/photo_data removes the photo.
+        sent = [validated_data[key] for key in ("photo", "photo_data") if key in validated_data]
+        photo_hash = self._extract_photo_hash(validated_data)
+        if photo_hash:
+            validated_data["photo_hash"] = photo_hash
+        elif sent and not any(sent):
+            validated_data["photo_hash"] = ""
+        return super().update(instance, validated_data)
 
     class Meta:
         model = Patient
@@ -80,8 +200,12 @@ class PatientSerializer(serializers.ModelSerializer):
             "weight_kg",
             "photo",
             "photo_data",
+            "photo_url",
+            "photo_thumbnail_url",
+            "photo_etag",
             "client",
             "patient_id",
+            "summary",
         ]
         extra_kwargs = {
             "client": {"required": False},
@@ -96,10 +220,28 @@ class AppointmentSerializer(serializers.ModelSerializer):
     appointment_date = serializers.DateTimeField(write_only=True, required=False, allow_null=True)
     status = serializers.CharField(write_only=True, required=False, allow_blank=True)
     patient_name = serializers.SerializerMethodField(read_only=True)
+    # The vets availability offers; a deactivated doctor cannot be booked.
+    veterinarian = serializers.PrimaryKeyRelatedField(
+        queryset=veterinarians(),
+        required=False,
+        allow_null=True,
+    )
+    veterinarian_name = serializers.SerializerMethodField(read_only=True)
+    duration_minutes = serializers.IntegerField(required=False, min_value=5)
+    ends_at = serializers.DateTimeField(read_only=True)
 
     def get_patient_name(self, obj):
         return obj.patient.name if obj.patient_id else ""
 
+    def get_veterinarian_name(self, obj):
+        return display_name(obj.veterinarian) if obj.veterinarian_id else ""
+
+    def validate_duration_minutes(self, value):
+        longest = settings.APPOINTMENT_MAX_MINUTES
+        if value > longest:
+            raise ValidationError(f"Appointments can last at most {longest} minutes.")
+        return value
+
     def validate(self, attrs):
         appointment_date = attrs.pop("appointment_date", None)
         attrs.pop("status", None)
@@ -120,13 +262,18 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "patient",
             "patient_name",
             "client",
+            "veterinarian",
+            "veterinarian_name",
             "date",
+            "duration_minutes",
+            "ends_at",
             "appointment_date",
             "reason",
             "status",
             "created_at",
         ]
-        read_only_fields = ["id", "patient_name", "created_at"]
+        read_only_fields = ["id", "patient_name", "veterinarian_name", "ends_at", "created_at"]
+        related_fields = {"patient_name": ["patient"], "veterinarian_name": ["veterinarian"]}
 
 
 # -------------------------
@@ -154,6 +301,7 @@ class ReceiptSerializer(serializers.ModelSerializer):
         model = Receipt
         fields = ["id", "client", "client_name", "amount", "status", "date", "issued_date", "created_at"]
         read_only_fields = ["id", "client_name", "created_at"]
+        related_fields = {"client_name": ["client"]}
 
 
 # -------------------------
@@ -189,12 +337,13 @@ class AllergyAlertSerializer(serializers.ModelSerializer):
 # Vital Signs
 # -------------------------
 class VitalSignsSerializer(serializers.ModelSerializer):
-    visit = serializers.PrimaryKeyRelatedField(
+    visit = CachedPrimaryKeyRelatedField(
         queryset=Visit.objects.all(), required=False, allow_null=True
     )
     class Meta:
         model = VitalSigns
         fields = ["id", "visit", "temperature", "heart_rate", "respiration", "weight_lbs", "weight_oz"]
+        list_serializer_class = BulkCreateListSerializer
 
 
 # -------------------------
@@ -203,22 +352,27 @@ class VitalSignsSerializer(serializers.ModelSerializer):
 class CommunicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ClientCommunicationNote
-        fields = ["id", "patient", "note", "created_at"]
+        fields = ["id", "client", "message", "date", "saved_by"]
+        read_only_fields = ["id", "date"]
 
 
 # -------------------------
 # Medical Notes
 # -------------------------
 class ClientNoteSerializer(serializers.ModelSerializer):
+    visit = CachedPrimaryKeyRelatedField(queryset=Visit.objects.all())
+
     class Meta:
         model = ClientNote
         fields = ["id", "note", "created_at", "visit"]
+        list_serializer_class = BulkCreateListSerializer
 
 
 # -------------------------
 # Medication
 # -------------------------
 class MedicationSerializer(serializers.ModelSerializer):
+    visit = CachedPrimaryKeyRelatedField(queryset=Visit.objects.all())
     patient = serializers.SerializerMethodField(read_only=True)
     patient_name = serializers.SerializerMethodField(read_only=True)
 
@@ -243,6 +397,11 @@ class MedicationSerializer(serializers.ModelSerializer):
             "duration",
             "notes",
         ]
+        list_serializer_class = BulkCreateListSerializer
+        related_fields = {
+            "patient": ["visit"],
+            "patient_name": ["visit__patient"],
+        }
 
 
 # -------------------------
@@ -257,6 +416,7 @@ class DocumentSerializer(serializers.ModelSerializer):
     issued_date = serializers.DateField(required=False, allow_null=True)
     title = serializers.CharField(required=False, allow_blank=True, write_only=True)
     description = serializers.CharField(required=False, allow_blank=True, write_only=True)
+    download_url = serializers.SerializerMethodField(read_only=True)
 
     def get_patient_name(self, obj):
         return obj.patient.name if obj.patient_id else ""
@@ -281,6 +441,34 @@ class DocumentSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def get_download_url(self, obj):
+        url = reverse("documents-download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def _store_file(self, validated_data):
+        upload = validated_data.get("file")
+        if upload is None:
+            return
+
+        # Stored once per content; the row points at the shared file.
+        name, digest, size = store_upload(upload)
+        validated_data.update(
+            file=name,
+            content_hash=digest,
+            size=size,
+            content_type=getattr(upload, "content_type", "") or "",
+            filename=upload.name,
+        )
+
+    def create(self, validated_data):
+        self._store_file(validated_data)
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        self._store_file(validated_data)
+        return super().update(instance, validated_data)
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
         data["title"] = instance.document_type
@@ -294,13 +482,60 @@ class DocumentSerializer(serializers.ModelSerializer):
             "patient",
             "patient_name",
             "file",
+            "download_url",
+            "filename",
+            "content_type",
+            "size",
+            "content_hash",
             "document_type",
             "issued_date",
             "title",
             "description",
             "created_at",
         ]
-        read_only_fields = ["id", "patient_name", "created_at"]
+        read_only_fields = ["id", "patient_name", "created_at", "filename", "content_type", "size", "content_hash"]
+        related_fields = {"patient_name": ["patient"]}
+
+
+# -------------------------
+# Resumable document upload
+# -------------------------
+class DocumentUploadSerializer(serializers.ModelSerializer):
+    offset = serializers.SerializerMethodField(read_only=True)
+    upload_url = serializers.SerializerMethodField(read_only=True)
+    document_type = serializers.ChoiceField(choices=Document.DOCUMENT_TYPES, required=False, default="Other")
+    issued_date = serializers.DateField(required=False, default=timezone.localdate)
+
+    def get_offset(self, obj):
+        return received(obj.pk)
+
+    def get_upload_url(self, obj):
+        url = reverse("document-upload-detail", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def validate_size(self, value):
+        if value < 1:
+            raise ValidationError("size must be at least 1 byte.")
+        if value > settings.DOCUMENT_MAX_BYTES:
+            raise ValidationError(f"size can be at most {settings.DOCUMENT_MAX_BYTES} bytes.")
+        return value
+
+    class Meta:
+        model = DocumentUpload
+        fields = [
+            "id",
+            "patient",
+            "document_type",
+            "issued_date",
+            "filename",
+            "content_type",
+            "size",
+            "offset",
+            "upload_url",
+            "created_at",
+        ]
+        read_only_fields = ["id", "created_at"]
 
 
 # -------------------------
@@ -342,7 +577,12 @@ class TreatmentSerializer(serializers.ModelSerializer):
 
         visit = attrs.get("visit")
         if not visit and patient_id:
-            visit = Visit.objects.filter(patient_id=patient_id).order_by("-visit_date").first()
+            summary = PatientSummary.objects.select_related("last_visit").filter(pk=patient_id).first()
+            if summary is not None:
+                visit = summary.last_visit
+            else:
+                # Rows written without signals (see check_patient_summaries).
+                visit = Visit.objects.filter(patient_id=patient_id).order_by("-visit_date", "-id").first()
             if visit:
                 attrs["visit"] = visit
 
@@ -386,6 +626,208 @@ class TreatmentSerializer(serializers.ModelSerializer):
             "created_at",
         ]
         read_only_fields = ["id", "patient_name", "veterinarian", "created_at"]
+        # validate() takes the patient's last visit when only `patient` is sent.
+        extra_kwargs = {"visit": {"required": False}}
+        related_fields = {
+            "patient_name": ["visit__patient"],
+            "veterinarian": ["visit__veterinarian"],
+        }
+
+
+# -------------------------
+# Patient overview (nested)
+# -------------------------
+class PatientOverviewSerializer(PatientSerializer):
+    """
+    Patient with its whole clinical graph. Expects the prefetches
+    set up by OverviewCustomerAPIView; reads never hit the database.
+    """
+
+    allergies = AllergyAlertSerializer(many=True, read_only=True)
+    visits = VisitSerializer(many=True, read_only=True)
+    vitals = serializers.SerializerMethodField(read_only=True)
+    medical_notes = serializers.SerializerMethodField(read_only=True)
+    medications = serializers.SerializerMethodField(read_only=True)
+    documents = DocumentSerializer(many=True, read_only=True)
+    treatments = serializers.SerializerMethodField(read_only=True)
+
+    def _from_visits(self, obj, related_name, serializer_class):
+        rows = [
+            row
+            for visit in obj.visits.all()
+            for row in getattr(visit, related_name).all()
+        ]
+        return serializer_class(rows, many=True, context=self.context).data
+
+    def get_vitals(self, obj):
+        return self._from_visits(obj, "vitals", VitalSignsSerializer)
+
+    def get_medical_notes(self, obj):
+        return self._from_visits(obj, "medical_notes", ClientNoteSerializer)
+
+    def get_medications(self, obj):
+        return self._from_visits(obj, "medications", MedicationSerializer)
+
+    def get_treatments(self, obj):
+        return self._from_visits(obj, "treatment_plans", TreatmentSerializer)
+
+    class Meta(PatientSerializer.Meta):
+        fields = PatientSerializer.Meta.fields + [
+            "allergies",
+            "visits",
+            "vitals",
+            "medical_notes",
+            "medications",
+            "documents",
+            "treatments",
+        ]
+
+
+# -------------------------
+# Appointment availability
+# -------------------------
+class AvailabilityQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField(required=False)
+    duration = serializers.IntegerField(required=False, min_value=5, default=30)
+    veterinarian = serializers.CharField(required=False)
+
+    def validate_duration(self, value):
+        longest = settings.APPOINTMENT_MAX_MINUTES
+        if value > longest:
+            raise ValidationError(f"duration can be at most {longest} minutes.")
+        return value
+
+    def validate_veterinarian(self, value):
+        try:
+            return {int(part) for part in value.split(",") if part}
+        except ValueError:
+            raise ValidationError("Use comma-separated veterinarian ids.")
+
+    def validate(self, attrs):
+        attrs.setdefault("end", attrs["start"])
+        span = (attrs["end"] - attrs["start"]).days
+        if span < 0:
+            raise ValidationError({"end": "end must not be before start."})
+        if span > settings.APPOINTMENT_AVAILABILITY_MAX_DAYS:
+            raise ValidationError({"end": f"At most {settings.APPOINTMENT_AVAILABILITY_MAX_DAYS} days per request."})
+        return attrs
+
+
+# -------------------------
+# Vitals time series
+# -------------------------
+class VitalsSeriesQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False, input_formats=["iso-8601", "%Y-%m-%d"])
+    until = serializers.DateTimeField(required=False, input_formats=["iso-8601", "%Y-%m-%d"])
+    points = serializers.IntegerField(required=False, min_value=3, default=200)
+    window = serializers.IntegerField(required=False, min_value=1, max_value=100, default=5)
+
+    def validate_points(self, value):
+        most = settings.VITALS_SERIES_MAX_POINTS
+        if value > most:
+            raise ValidationError(f"points can be at most {most}.")
+        return value
+
+    def validate_until(self, value):
+        # A bare date means the end of that day, not its first instant.
+        if parse_date(str(self.initial_data.get("until", "")).strip()):
+            return datetime.datetime.combine(value.date(), datetime.time.max, tzinfo=value.tzinfo)
+        return value
+
+    def validate(self, attrs):
+        if "since" in attrs and "until" in attrs and attrs["until"] < attrs["since"]:
+            raise ValidationError({"until": "until must not be before since."})
+        return attrs
+
+
+# -------------------------
+# Revenue report
+# -------------------------
+class RevenueReportQuerySerializer(serializers.Serializer):
+    since = serializers.DateField(required=False, input_formats=["%Y-%m", "iso-8601"])
+    until = serializers.DateField(required=False, input_formats=["%Y-%m", "iso-8601"])
+    client = serializers.IntegerField(required=False, min_value=1)
+    by = serializers.ChoiceField(required=False, choices=["month", "client"], default="month")
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=500, default=50)
+
+    def validate(self, attrs):
+        attrs["until"] = (attrs.get("until") or timezone.localdate()).replace(day=1)
+        # Default: the twelve months ending with `until`.
+        attrs["since"] = (attrs.get("since") or add_months(attrs["until"], -11)).replace(day=1)
+
+        span = (attrs["until"].year - attrs["since"].year) * 12 + attrs["until"].month - attrs["since"].month
+        if span < 0:
+            raise ValidationError({"until": "until must not be before since."})
+        if span >= settings.REVENUE_REPORT_MAX_MONTHS:
+            raise ValidationError({"since": f"At most {settings.REVENUE_REPORT_MAX_MONTHS} months per request."})
+        return attrs
+
+
+# -------------------------
+# Background jobs
+# -------------------------
+class JobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField(read_only=True)
+
+    def get_download_url(self, obj):
+        if obj.status != Job.SUCCEEDED or not isinstance(obj.result, dict) or not obj.result.get("file"):
+            return None
+        url = reverse("jobs-download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def validate_kind(self, value):
+        if value not in jobs.API_KINDS:
+            raise ValidationError(f"kind must be one of: {', '.join(sorted(jobs.API_KINDS))}.")
+        return value
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "priority",
+            "attempts",
+            "max_attempts",
+            "run_after",
+            "result",
+            "last_error",
+            "download_url",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = [
+            "id", "status", "attempts", "max_attempts", "run_after",
+            "result", "last_error", "created_at", "finished_at",
+        ]
 
 
+# -------------------------
+# Reminders
+# -------------------------
+class ReminderSerializer(serializers.ModelSerializer):
+    patient_name = serializers.CharField(source="patient.name", read_only=True)
 
+    class Meta:
+        model = Reminder
+        fields = [
+            "id",
+            "kind",
+            "source_id",
+            "channel",
+            "client",
+            "patient",
+            "patient_name",
+            "recipient",
+            "due_at",
+            "subject",
+            "body",
+            "status",
+            "attempts",
+            "last_error",
+            "created_at",
+            "sent_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,253 @@
+# Vetmanagementsystem/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters, response_cache, revenue, search, summaries
+from .authentication import revoke_user
+from .models import Appointment, Client, CustomUser, Patient, PatientSummary, Receipt
+
+
+# ============================================================
+# AUTH
+# ============================================================
+
+@receiver(post_save, sender=CustomUser)
+def revoke_tokens_for_inactive_user(sender, instance, created, **kwargs):
+    # Claims-based auth never reloads the user, so deactivation
+    # has to reach live tokens through the deny-list.
+    if not created and not instance.is_active:
+        revoke_user(instance.pk)
+
+
+# ============================================================
+# DASHBOARD COUNTERS
+# ============================================================
+
+def _remember_counted_state(sender, instance, raw=False, update_fields=None, **kwargs):
+
+    instance._counter_before = {}
+
+    if raw or instance._state.adding or instance.pk is None:
+        return
+
+    tracked = counters.TRACKED_FIELDS[sender]
+
+    if update_fields is not None and not {
+        field.removesuffix("_id") for field in tracked
+    } & {field.removesuffix("_id") for field in update_fields}:
+        instance._counter_before = None
+        return
+
+    previous = sender.objects.only(*tracked).filter(pk=instance.pk).first()
+
+    if previous is not None:
+        instance._counter_before = counters.contribution(previous)
+
+
+def _apply_counted_save(sender, instance, raw=False, **kwargs):
+
+    before = getattr(instance, "_counter_before", {})
+
+    if raw or before is None:
+        return
+
+    counters.apply(counters.diff(before, counters.contribution(instance)))
+
+
+def _apply_counted_delete(sender, instance, **kwargs):
+
+    # Never recreate rows here: a cascading Client delete removes them.
+    counters.apply(
+        counters.diff(counters.contribution(instance), {}),
+        create_missing=False,
+    )
+
+
+for _model in (Patient, Appointment, Receipt):
+    pre_save.connect(_remember_counted_state, sender=_model, dispatch_uid=f"counters-pre-{_model.__name__}")
+    post_save.connect(_apply_counted_save, sender=_model, dispatch_uid=f"counters-post-{_model.__name__}")
+    post_delete.connect(_apply_counted_delete, sender=_model, dispatch_uid=f"counters-del-{_model.__name__}")
+
+
+# ============================================================
+# REVENUE ROLLUP
+# ============================================================
+
+@receiver(pre_save, sender=Receipt, dispatch_uid="revenue-pre-Receipt")
+def _remember_receipt_cell(sender, instance, raw=False, update_fields=None, **kwargs):
+
+    instance._revenue_before = {}
+
+    if raw or instance._state.adding or instance.pk is None:
+        return
+
+    if update_fields is not None and not {
+        field.removesuffix("_id") for field in revenue.TRACKED_FIELDS
+    } & {field.removesuffix("_id") for field in update_fields}:
+        instance._revenue_before = None
+        return
+
+    previous = sender.objects.only(*revenue.TRACKED_FIELDS).filter(pk=instance.pk).first()
+
+    if previous is not None:
+        instance._revenue_before = revenue.contribution(previous)
+
+
+@receiver(post_save, sender=Receipt, dispatch_uid="revenue-post-Receipt")
+def _apply_receipt_save(sender, instance, raw=False, **kwargs):
+
+    before = getattr(instance, "_revenue_before", {})
+
+    if raw or before is None:
+        return
+
+    revenue.apply(counters.diff(before, revenue.contribution(instance)))
+
+
+@receiver(post_delete, sender=Receipt, dispatch_uid="revenue-del-Receipt")
+def _apply_receipt_delete(sender, instance, **kwargs):
+
+    # Never recreate rows here: a cascading Client delete removes them.
+    revenue.apply(
+        counters.diff(revenue.contribution(instance), {}),
+        create_missing=False,
+    )
+
+
+# ============================================================
+# PATIENT SUMMARIES
+# ============================================================
+
+@receiver(post_save, sender=Patient, dispatch_uid="summary-post-Patient")
+def _create_patient_summary(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        PatientSummary.objects.create(patient_id=instance.pk)
+
+
+def _remember_summary_patient(sender, instance, raw=False, update_fields=None, **kwargs):
+
+    instance._summary_patient_before = None
+
+    if raw or instance._state.adding or instance.pk is None:
+        return
+
+    link = summaries.LINK_FIELDS[sender]
+
+    if update_fields is not None and link.removesuffix("_id") not in {
+        field.removesuffix("_id") for field in update_fields
+    }:
+        return
+
+    previous = sender.objects.only(link).filter(pk=instance.pk).first()
+
+    # Moved to another patient: the old one's row changes too.
+    if previous is not None and getattr(previous, link) != getattr(instance, link):
+        instance._summary_patient_before = summaries.patient_of(sender, previous)
+
+
+def _refresh_summary_save(sender, instance, raw=False, **kwargs):
+
+    if raw:
+        return
+
+    sections = summaries.SECTIONS[sender]
+    patient_id = summaries.patient_of(sender, instance)
+    before = getattr(instance, "_summary_patient_before", None)
+
+    summaries.refresh(patient_id, sections)
+
+    if before is not None and before != patient_id:
+        summaries.refresh(before, sections, create_missing=False)
+
+
+def _refresh_summary_delete(sender, instance, **kwargs):
+
+    # Never recreate rows here: a cascading Patient delete removes them.
+    summaries.refresh(summaries.patient_of(sender, instance), summaries.SECTIONS[sender], create_missing=False)
+
+
+for _model in summaries.SECTIONS:
+    pre_save.connect(_remember_summary_patient, sender=_model, dispatch_uid=f"summary-pre-{_model.__name__}")
+    post_save.connect(_refresh_summary_save, sender=_model, dispatch_uid=f"summary-post-{_model.__name__}")
+    post_delete.connect(_refresh_summary_delete, sender=_model, dispatch_uid=f"summary-del-{_model.__name__}")
+
+
+# ============================================================
+# RESPONSE CACHE
+# ============================================================
+
+def _remember_cached_owner(sender, instance, raw=False, update_fields=None, **kwargs):
+
+    instance._cache_owner_before = set()
+
+    if raw or instance._state.adding or instance.pk is None:
+        return
+
+    first_hop = response_cache.CLIENT_PATHS[sender].split("__")[0].removesuffix("_id")
+
+    if update_fields is not None and first_hop not in {
+        field.removesuffix("_id") for field in update_fields
+    }:
+        return
+
+    # An update may move the row to another client; both must drop it.
+    instance._cache_owner_before = {response_cache.stored_client_id(sender, instance.pk)}
+
+
+def _invalidate_cached_save(sender, instance, raw=False, **kwargs):
+
+    if raw:
+        return
+
+    owners = getattr(instance, "_cache_owner_before", set())
+    response_cache.invalidate(sender, owners | response_cache.client_ids_for(sender, [instance]))
+
+
+def _invalidate_cached_delete(sender, instance, **kwargs):
+    response_cache.invalidate(sender, response_cache.client_ids_for(sender, [instance]))
+
+
+for _model in response_cache.CLIENT_PATHS:
+    if _model is not Client:
+        pre_save.connect(_remember_cached_owner, sender=_model, dispatch_uid=f"cache-pre-{_model.__name__}")
+    post_save.connect(_invalidate_cached_save, sender=_model, dispatch_uid=f"cache-post-{_model.__name__}")
+    post_delete.connect(_invalidate_cached_delete, sender=_model, dispatch_uid=f"cache-del-{_model.__name__}")
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid="cache-post-CustomUser")
+def _invalidate_cached_user_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Serializers show user names (e.g. a treatment's veterinarian);
+    # the owner is not a single client, so every scope is retired.
+    if raw or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+
+    response_cache.invalidate(CustomUser, {None})
+
+
+@receiver(post_delete, sender=CustomUser, dispatch_uid="cache-del-CustomUser")
+def _invalidate_cached_user_delete(sender, instance, **kwargs):
+    response_cache.invalidate(CustomUser, {None})
+
+
+# ============================================================
+# SEARCH INDEX
+# ============================================================
+
+def _index_saved(sender, instance, raw=False, **kwargs):
+
+    if raw:
+        return
+
+    search.index_instances(sender, [instance])
+
+    if sender is Patient:
+        search.move_patient(instance.pk, instance.client_id)
+
+
+def _unindex_deleted(sender, instance, **kwargs):
+    search.unindex(sender, [instance.pk])
+
+
+for _model in search.SOURCES:
+    post_save.connect(_index_saved, sender=_model, dispatch_uid=f"search-post-{_model.__name__}")
+    post_delete.connect(_unindex_deleted, sender=_model, dispatch_uid=f"search-del-{_model.__name__}")
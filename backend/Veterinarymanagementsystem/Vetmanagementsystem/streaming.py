@@ -0,0 +1,88 @@
+# Vetmanagementsystem/streaming.py
+"""
+Streamed bodies under ASGI.
+
+Django's ASGI handler serves a StreamingHttpResponse (or FileResponse)
+that holds a sync iterator by collecting it with sync_to_async(list):
+the whole export or radiograph is loaded into memory before the first
+byte goes out. AsyncStreamingMiddleware swaps such bodies for an async
+iterator that pulls one chunk at a time from a worker thread. Under
+WSGI it changes nothing.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+
+# Read size for file bodies; FileResponse's own 4 KiB blocks would
+# cost one thread hop each.
+FILE_BLOCK_SIZE = 1024 * 1024
+
+_DONE = object()
+
+
+def _file_blocks(handle):
+    return iter(lambda: handle.read(FILE_BLOCK_SIZE), b"")
+
+
+async def iterate_async(chunks):
+    """
+    Async iterator over a sync one. Each chunk is produced on the
+    request's sync thread, so database cursors behind it stay on the
+    connection that opened them.
+    """
+
+    iterator = iter(chunks)
+    pull = sync_to_async(next)
+
+    try:
+        while True:
+            chunk = await pull(iterator, _DONE)
+            if chunk is _DONE:
+                break
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def make_async(response):
+    """Give a streaming response an async body; others are returned as they are."""
+
+    if not response.streaming or response.is_async:
+        return response
+
+    handle = getattr(response, "file_to_stream", None)
+
+    # FileResponse keeps closing the file when the response is closed.
+    chunks = _file_blocks(handle) if handle is not None else response.streaming_content
+    response.streaming_content = iterate_async(chunks)
+
+    return response
+
+
+class AsyncStreamingMiddleware:
+    """Serve streamed responses of ASGI requests from async iterators."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # A sync chain can still run under ASGI (a sync-only middleware).
+        response = self.get_response(request)
+
+        return make_async(response) if isinstance(request, ASGIRequest) else response
+
+    async def __acall__(self, request):
+        return make_async(await self.get_response(request))
@@ -0,0 +1,308 @@
+# Vetmanagementsystem/summaries.py
+"""
+PatientSummary rows: last visit, current status, active medications,
+allergy count and upcoming follow-ups per patient.
+
+A write to a Visit, Medication, AllergyAlert or TreatmentPlan
+recomputes only the parts of its patient's row that the model feeds
+(SECTIONS), with indexed per-patient queries, inside the caller's
+transaction. rebuild_all() and check() recompute every row from grouped
+scans instead.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import response_cache
+from .models import AllergyAlert, Medication, Patient, PatientSummary, TreatmentPlan, Visit
+
+
+MEDICATION_FIELDS = ("id", "name", "dosage", "frequency", "duration")
+
+SECTIONS_ALL = ("visit", "allergies", "follow_ups")
+
+# Summary sections each model feeds. "visit" covers the last visit and
+# its medications.
+SECTIONS = {
+    Visit: ("visit",),
+    Medication: ("visit",),
+    AllergyAlert: ("allergies",),
+    TreatmentPlan: ("follow_ups",),
+}
+
+# Columns that can move a row to another patient.
+LINK_FIELDS = {
+    Visit: "patient_id",
+    Medication: "visit_id",
+    AllergyAlert: "patient_id",
+    TreatmentPlan: "visit_id",
+}
+
+
+def empty():
+    return {
+        "last_visit_id": None,
+        "last_visit_date": None,
+        "current_status": "",
+        "active_medications": [],
+        "allergy_count": 0,
+        "follow_up_dates": [],
+    }
+
+
+def patient_of(sender, instance):
+    """The patient a Visit, Medication, AllergyAlert or TreatmentPlan belongs to."""
+
+    if sender in (Visit, AllergyAlert):
+        return instance.patient_id
+
+    if instance.visit_id is None:
+        return None
+
+    return Visit.objects.filter(pk=instance.visit_id).values_list("patient_id", flat=True).first()
+
+
+def patients_of(sender, instances):
+    """Patients of several rows of one model, with at most one query."""
+
+    if sender in (Visit, AllergyAlert):
+        return {instance.patient_id for instance in instances} - {None}
+
+    visit_ids = {instance.visit_id for instance in instances} - {None}
+
+    return set(Visit.objects.filter(pk__in=visit_ids).values_list("patient_id", flat=True))
+
+
+# ============================================================
+# PER PATIENT
+# ============================================================
+
+def _visit(patient_id):
+
+    last = (
+        Visit.objects.filter(patient_id=patient_id)
+        .order_by("-visit_date", "-id")
+        .values_list("id", "visit_date", "visit_status")
+        .first()
+    )
+
+    if last is None:
+        return {"last_visit_id": None, "last_visit_date": None, "current_status": "", "active_medications": []}
+
+    visit_id, visit_date, status = last
+
+    return {
+        "last_visit_id": visit_id,
+        "last_visit_date": visit_date,
+        "current_status": status or "",
+        "active_medications": list(
+            Medication.objects.filter(visit_id=visit_id).order_by("id").values(*MEDICATION_FIELDS)
+        ),
+    }
+
+
+def _allergies(patient_id):
+    return {"allergy_count": AllergyAlert.objects.filter(patient_id=patient_id).count()}
+
+
+def _follow_ups(patient_id):
+
+    dates = (
+        TreatmentPlan.objects.filter(visit__patient_id=patient_id, follow_up_date__gte=timezone.localdate())
+        .order_by("follow_up_date")
+        .values_list("follow_up_date", flat=True)
+        .distinct()
+    )
+
+    return {"follow_up_dates": [day.isoformat() for day in dates]}
+
+
+COMPUTE = {
+    "visit": _visit,
+    "allergies": _allergies,
+    "follow_ups": _follow_ups,
+}
+
+
+def compute(patient_id, sections=SECTIONS_ALL):
+
+    values = {}
+
+    for section in sections:
+        values.update(COMPUTE[section](patient_id))
+
+    return values
+
+
+def refresh(patient_id, sections=SECTIONS_ALL, create_missing=True):
+    """
+    Recompute `sections` of one patient's row. Runs inside the caller's
+    transaction (see AtomicWritesMixin).
+    """
+
+    if patient_id is None:
+        return
+
+    values = compute(patient_id, sections)
+    values["updated_at"] = timezone.now()
+
+    row = PatientSummary.objects.filter(patient_id=patient_id)
+
+    # update() sends no signals: retire cached patient reads here.
+    _invalidate_cached({patient_id})
+
+    if row.update(**values) or not create_missing:
+        return
+
+    # No row yet (a patient from before the table existed): write it whole.
+    try:
+        with transaction.atomic():
+            PatientSummary.objects.create(patient_id=patient_id, **compute(patient_id))
+    except IntegrityError:
+        row.update(**values)
+
+
+def refresh_instances(sender, instances):
+    """Refresh the patients of rows written without signals (bulk_create)."""
+
+    sections = SECTIONS.get(sender)
+
+    if sections is None:
+        return
+
+    for patient_id in sorted(patients_of(sender, instances)):
+        refresh(patient_id, sections)
+
+
+def _invalidate_cached(patient_ids):
+
+    if patient_ids is None:
+        response_cache.invalidate(PatientSummary, {None})
+        return
+
+    owners = response_cache.client_ids_for(
+        PatientSummary, [PatientSummary(patient_id=patient_id) for patient_id in patient_ids]
+    )
+    response_cache.invalidate(PatientSummary, owners)
+
+
+# ============================================================
+# ALL PATIENTS
+# ============================================================
+
+def compute_all():
+    """{patient_id: values} for every patient, from one grouped scan per source."""
+
+    rows = {
+        patient_id: empty()
+        for patient_id in Patient.objects.values_list("id", flat=True).iterator(chunk_size=5000)
+    }
+
+    last_visits = {}
+    visits = (
+        Visit.objects.order_by("patient_id", "-visit_date", "-id")
+        .values_list("patient_id", "id", "visit_date", "visit_status")
+        .iterator(chunk_size=5000)
+    )
+
+    for patient_id, visit_id, visit_date, status in visits:
+        if patient_id in last_visits or patient_id not in rows:
+            continue
+        last_visits[patient_id] = visit_id
+        rows[patient_id].update(last_visit_id=visit_id, last_visit_date=visit_date, current_status=status or "")
+
+    patient_for_visit = {visit_id: patient_id for patient_id, visit_id in last_visits.items()}
+    medications = (
+        Medication.objects.order_by("visit_id", "id")
+        .values("visit_id", *MEDICATION_FIELDS)
+        .iterator(chunk_size=5000)
+    )
+
+    for medication in medications:
+        patient_id = patient_for_visit.get(medication.pop("visit_id"))
+        if patient_id is not None:
+            rows[patient_id]["active_medications"].append(medication)
+
+    allergies = AllergyAlert.objects.values_list("patient_id").annotate(n=Count("id")).order_by()
+
+    for patient_id, count in allergies:
+        if patient_id in rows:
+            rows[patient_id]["allergy_count"] = count
+
+    follow_ups = (
+        TreatmentPlan.objects.filter(follow_up_date__gte=timezone.localdate())
+        .values_list("visit__patient_id", "follow_up_date")
+        .distinct()
+        .order_by("visit__patient_id", "follow_up_date")
+    )
+
+    for patient_id, day in follow_ups.iterator(chunk_size=5000):
+        if patient_id in rows:
+            rows[patient_id]["follow_up_dates"].append(day.isoformat())
+
+    return rows
+
+
+def rebuild_all():
+    """Recompute every row and write them with one bulk insert."""
+
+    rows = compute_all()
+
+    PatientSummary.objects.all().delete()
+    PatientSummary.objects.bulk_create(
+        (PatientSummary(patient_id=patient_id, **values) for patient_id, values in rows.items()),
+        batch_size=1000,
+    )
+    _invalidate_cached(None)
+
+    return len(rows)
+
+
+def _stored(summary):
+
+    values = {field: getattr(summary, field) for field in empty()}
+
+    # Follow-ups that have since passed are expected; only the ones
+    # still ahead must match.
+    today = timezone.localdate().isoformat()
+    values["follow_up_dates"] = [day for day in summary.follow_up_dates if day >= today]
+
+    return values
+
+
+def check(fix=False):
+    """
+    Compare every stored row with a fresh computation. Returns
+    {"checked", "missing", "stale"}, the last two as lists of patient
+    ids; fix=True rewrites just those rows.
+    """
+
+    expected = compute_all()
+    report = {"checked": len(expected), "missing": [], "stale": []}
+    seen = set()
+
+    for summary in PatientSummary.objects.order_by("patient_id").iterator(chunk_size=2000):
+        seen.add(summary.patient_id)
+        values = expected.get(summary.patient_id)
+
+        if values is not None and _stored(summary) != values:
+            report["stale"].append(summary.patient_id)
+
+    report["missing"] = sorted(set(expected) - seen)
+
+    if fix:
+        with transaction.atomic():
+            for patient_id in report["stale"]:
+                PatientSummary.objects.filter(patient_id=patient_id).update(
+                    **expected[patient_id], updated_at=timezone.now()
+                )
+
+            PatientSummary.objects.bulk_create(
+                [PatientSummary(patient_id=patient_id, **expected[patient_id]) for patient_id in report["missing"]],
+                batch_size=1000,
+            )
+
+            if report["stale"] or report["missing"]:
+                _invalidate_cached(set(report["stale"]) | set(report["missing"]))
+
+    return report
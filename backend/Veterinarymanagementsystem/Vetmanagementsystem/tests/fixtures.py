@@ -0,0 +1,123 @@
+# Vetmanagementsystem/tests/fixtures.py
+import datetime
+from decimal import Decimal
+
+from django.utils import timezone
+
+from Vetmanagementsystem import counters, revenue, summaries
+from Vetmanagementsystem.models import (
+    AllergyAlert,
+    Appointment,
+    Client,
+    ClientCommunicationNote,
+    ClientNote,
+    CustomUser,
+    Document,
+    Medication,
+    Patient,
+    Receipt,
+    TreatmentPlan,
+    Visit,
+    VitalSigns,
+)
+
+
+PASSWORD = "clinic-pass-123"
+
+
+def make_doctor(username="doctor"):
+    return CustomUser.objects.create_user(
+        username=username,
+        email=f"{username}@clinic.test",
+        password=PASSWORD,
+        is_staff=True,
+    )
+
+
+def make_client(username):
+    user = CustomUser.objects.create_user(
+        username=username,
+        email=f"{username}@clinic.test",
+        password=PASSWORD,
+    )
+    client = Client.objects.create(user=user, full_name=username.title(), phone="555-0100")
+    return user, client
+
+
+def seed_clinic(doctor, clients, patients_per_client=2, visits_per_patient=2):
+    """
+    Give every client the same shape of clinical history, written
+    with bulk_create. Counters are rebuilt afterwards because
+    bulk_create skips the signals that maintain them.
+    """
+
+    now = timezone.now()
+    today = timezone.localdate()
+
+    patients = Patient.objects.bulk_create([
+        Patient(
+            patient_id=f"P{client.id:05d}-{index:04d}",
+            client=client,
+            name=f"Pet {client.id}-{index}",
+            species="Dog" if index % 3 else "Cat",
+            gender="Male" if index % 2 else "Female",
+        )
+        for client in clients
+        for index in range(patients_per_client)
+    ])
+
+    visits = Visit.objects.bulk_create([
+        Visit(
+            patient=patient,
+            veterinarian=doctor,
+            visit_date=now - datetime.timedelta(days=index * 7),
+            notes="Routine check",
+        )
+        for patient in patients
+        for index in range(visits_per_patient)
+    ])
+
+    VitalSigns.objects.bulk_create([
+        VitalSigns(visit=visit, temperature=Decimal("38.5"), heart_rate=90, respiration=24)
+        for visit in visits
+    ])
+    ClientNote.objects.bulk_create([ClientNote(visit=visit, note="Eating well") for visit in visits])
+    Medication.objects.bulk_create([
+        Medication(visit=visit, name="Amoxicillin", dosage="50mg", frequency="BID")
+        for visit in visits
+    ])
+    TreatmentPlan.objects.bulk_create([
+        TreatmentPlan(
+            visit=visit,
+            diagnosis="Otitis",
+            treatment_description="Ear drops",
+            follow_up_date=today + datetime.timedelta(days=14),
+        )
+        for visit in visits
+    ])
+    AllergyAlert.objects.bulk_create([
+        AllergyAlert(patient=patient, description="Penicillin", severity_level="High")
+        for patient in patients
+    ])
+    Document.objects.bulk_create([
+        Document(patient=patient, document_type="Other", file="documents/seed.pdf", issued_date=today)
+        for patient in patients
+    ])
+    Appointment.objects.bulk_create([
+        Appointment(patient=patient, client_id=patient.client_id, date=now + datetime.timedelta(days=3))
+        for patient in patients
+    ])
+    Receipt.objects.bulk_create([
+        Receipt(client_id=patient.client_id, amount=Decimal("45.00"), date=today)
+        for patient in patients
+    ])
+    ClientCommunicationNote.objects.bulk_create([
+        ClientCommunicationNote(client=client, message="Reminder sent", saved_by=doctor)
+        for client in clients
+    ])
+
+    counters.rebuild_all()
+    revenue.rebuild_all()
+    summaries.rebuild_all()
+
+    return patients
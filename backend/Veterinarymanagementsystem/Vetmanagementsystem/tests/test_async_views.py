@@ -0,0 +1,140 @@
+# Vetmanagementsystem/tests/test_async_views.py
+"""
+The ASGI profile must answer like the WSGI one: the async overview
+stitches the same graph as the DRF overview, and streamed bodies are
+served from async iterators instead of being collected in memory, and
+unauthenticated requests are refused with the same status, body and
+headers.
+"""
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from Vetmanagementsystem.async_views import (
+    AsyncDashboardView,
+    AsyncOverviewCustomerView,
+    _overview_querysets,
+    _stitch,
+)
+from Vetmanagementsystem.models import Document
+from Vetmanagementsystem.serializers import ClaimsTokenObtainPairSerializer, PatientOverviewSerializer
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+def _bearer(user):
+    token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+    return {"Authorization": f"Bearer {token}"}
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class AsyncOverviewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        _, cls.owner = make_client("owner")
+        _, other = make_client("other")
+        seed_clinic(cls.doctor, [cls.owner, other], patients_per_client=3, visits_per_patient=3)
+
+    def test_stitched_overview_matches_drf(self):
+        api = APIClient()
+        api.force_authenticate(self.doctor)
+        expected = api.get(f"/api/overview_customer/?client={self.owner.pk}").json()
+
+        querysets = _overview_querysets({"client_id": self.owner.pk})
+        patients = _stitch({path: list(queryset) for path, queryset in querysets.items()})
+        request = RequestFactory().get("/api/overview_customer/")
+
+        with self.assertNumQueries(0):
+            data = PatientOverviewSerializer(patients, many=True, context={"request": request}).data
+
+        self.assertEqual(json.loads(JSONRenderer().render(data)), expected["patients"])
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class AsyncAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        _, cls.owner = make_client("owner")
+
+    def refusal(self, response):
+        return (
+            response.status_code,
+            json.loads(response.content),
+            response.get("WWW-Authenticate"),
+            response.get("Content-Type"),
+        )
+
+    async def test_refusals_match_drf(self):
+        # urls.py picks one profile at import; call the async views directly.
+        views = {
+            "/api/dashboard/": AsyncDashboardView.as_view(),
+            f"/api/overview_customer/?client={self.owner.pk}": AsyncOverviewCustomerView.as_view(),
+        }
+
+        for headers in ({}, {"Authorization": "Bearer not-a-token"}):
+            for url, view in views.items():
+                expected = await sync_to_async(self.client.get)(url, headers=headers)
+                actual = await view(AsyncRequestFactory().get(url, headers=headers))
+
+                self.assertEqual(expected.status_code, 401, (url, headers))
+                self.assertEqual(self.refusal(actual), self.refusal(expected), (url, headers))
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, DOCUMENT_SENDFILE="")
+class AsyncStreamingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        _, client = make_client("owner")
+        (cls.patient,) = seed_clinic(cls.doctor, [client], patients_per_client=1, visits_per_patient=5)
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+
+        self.body = bytes(range(256)) * 8192
+        Path(media, "documents").mkdir()
+        Path(media, "documents", "scan.bin").write_bytes(self.body)
+        self.document = Document.objects.create(
+            patient=self.patient,
+            document_type="Other",
+            file="documents/scan.bin",
+            issued_date=timezone.localdate(),
+        )
+
+    async def _get(self, url, **headers):
+
+        response = await self.async_client.get(url, headers={**_bearer(self.doctor), **headers})
+
+        self.assertTrue(response.is_async, f"{url} was not streamed asynchronously")
+
+        return response.status_code, b"".join([chunk async for chunk in response.streaming_content])
+
+    def _get_wsgi(self, url):
+        return b"".join(self.client.get(url, headers=_bearer(self.doctor)).streaming_content)
+
+    async def test_export_streams_asynchronously(self):
+        expected = await sync_to_async(self._get_wsgi)("/api/exports/visits/")
+
+        status_code, body = await self._get("/api/exports/visits/")
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(body, expected)
+
+    async def test_download_streams_asynchronously(self):
+        url = f"/api/documents/{self.document.pk}/download/"
+
+        self.assertEqual(await self._get(url), (200, self.body))
+        self.assertEqual(await self._get(url, Range="bytes=10-19"), (206, self.body[10:20]))
@@ -0,0 +1,201 @@
+# Vetmanagementsystem/tests/test_documents.py
+"""
+Ranged and conditional document downloads, and resumable uploads
+stored by content, against a temporary MEDIA_ROOT.
+"""
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from Vetmanagementsystem.models import Document, DocumentUpload
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+BODY = bytes(range(256)) * 40
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, DOCUMENT_SENDFILE="")
+class DocumentTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        _, client = make_client("owner")
+        (cls.patient,) = seed_clinic(cls.doctor, [client], patients_per_client=1, visits_per_patient=1)
+
+    def setUp(self):
+        self.media = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media, DOCUMENT_UPLOAD_ROOT=self.media / "uploads"))
+
+        self.api = APIClient()
+        self.api.force_authenticate(self.doctor)
+
+    def start_upload(self, size=len(BODY)):
+        response = self.api.post(
+            "/api/document-uploads/",
+            {"patient": self.patient.pk, "filename": "scan.bin", "size": size},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return f"/api/document-uploads/{response.json()['id']}/"
+
+    def send(self, url, offset, chunk):
+        return self.api.generic(
+            "PATCH",
+            url,
+            chunk,
+            content_type="application/offset+octet-stream",
+            headers={"Upload-Offset": str(offset)},
+        )
+
+
+class DownloadTests(DocumentTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        url = self.start_upload()
+        self.document = Document.objects.get(pk=self.send(url, 0, BODY).json()["id"])
+        self.url = f"/api/documents/{self.document.pk}/download/"
+
+    def get(self, **headers):
+        response = self.api.get(self.url, headers=headers)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_whole_file(self):
+        response, body = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, BODY)
+        self.assertEqual(response["ETag"], f'"{self.document.content_hash}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_ranges(self):
+        size = len(BODY)
+        cases = {
+            "bytes=10-19": (10, 19),
+            "bytes=-5": (size - 5, size - 1),
+            f"bytes=-{size * 2}": (0, size - 1),
+            "bytes=9000-": (9000, size - 1),
+            f"bytes=100-{size * 2}": (100, size - 1),
+        }
+
+        for header, (start, end) in cases.items():
+            response, body = self.get(Range=header)
+
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(body, BODY[start:end + 1], header)
+            self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}", header)
+            self.assertEqual(response["Content-Length"], str(end - start + 1), header)
+
+    def test_unsatisfiable_ranges(self):
+        for header in (f"bytes={len(BODY)}-", "bytes=-0", "bytes=20-10"):
+            response, _ = self.get(Range=header)
+
+            self.assertEqual(response.status_code, 416, header)
+            self.assertEqual(response["Content-Range"], f"bytes */{len(BODY)}", header)
+
+    def test_unsupported_ranges_send_the_whole_file(self):
+        for header in ("bytes=0-1,5-6", "items=0-1", "bytes=-"):
+            response, body = self.get(Range=header)
+
+            self.assertEqual((response.status_code, body), (200, BODY), header)
+
+    def test_if_range(self):
+        fresh, _ = self.get()
+
+        for validator in (fresh["ETag"], fresh["Last-Modified"]):
+            response, body = self.get(Range="bytes=0-3", **{"If-Range": validator})
+            self.assertEqual((response.status_code, body), (206, BODY[:4]), validator)
+
+        for validator in ('"stale"', http_date(0)):
+            response, body = self.get(Range="bytes=0-3", **{"If-Range": validator})
+            self.assertEqual((response.status_code, body), (200, BODY), validator)
+
+    def test_not_modified(self):
+        fresh, _ = self.get()
+
+        for headers in (
+            {"If-None-Match": fresh["ETag"]},
+            {"If-None-Match": f'"other", W/{fresh["ETag"]}'},
+            {"If-Modified-Since": fresh["Last-Modified"]},
+        ):
+            response, body = self.get(**headers)
+            self.assertEqual((response.status_code, body), (304, b""), headers)
+            self.assertEqual(response["ETag"], fresh["ETag"])
+
+        response, _ = self.get(**{"If-None-Match": '"other"', "If-Modified-Since": fresh["Last-Modified"]})
+        self.assertEqual(response.status_code, 200)
+
+
+class UploadTests(DocumentTestCase):
+
+    def test_resumed_upload(self):
+        url = self.start_upload()
+
+        response = self.send(url, 0, BODY[:1000])
+        self.assertEqual((response.status_code, response["Upload-Offset"]), (204, "1000"))
+        self.assertEqual(self.api.get(url)["Upload-Offset"], "1000")
+
+        response = self.send(url, 1000, BODY[1000:])
+        self.assertEqual(response.status_code, 201, response.content)
+
+        document = Document.objects.get(pk=response.json()["id"])
+        self.assertEqual(Path(document.file.path).read_bytes(), BODY)
+        self.assertFalse(DocumentUpload.objects.exists())
+        self.assertFalse(any((self.media / "uploads").iterdir()))
+
+    def test_offset_mismatch(self):
+        url = self.start_upload()
+        self.send(url, 0, BODY[:1000])
+
+        for offset in (0, 500, 2000):
+            response = self.send(url, offset, BODY[offset:offset + 100])
+
+            self.assertEqual(response.status_code, 409, offset)
+            self.assertEqual(response.json()["offset"], 1000)
+            self.assertEqual(response["Upload-Offset"], "1000")
+
+        self.assertEqual(self.api.get(url)["Upload-Offset"], "1000")
+
+    def test_chunk_without_a_length(self):
+        url = self.start_upload()
+        self.send(url, 0, BODY[:1000])
+
+        response = self.api.generic(
+            "PATCH",
+            url,
+            BODY[1000:2000],
+            content_type="application/offset+octet-stream",
+            headers={"Upload-Offset": "1000", "Transfer-Encoding": "chunked"},
+            CONTENT_LENGTH="",
+        )
+
+        self.assertEqual(response.status_code, 411)
+        self.assertEqual(self.api.get(url)["Upload-Offset"], "1000")
+
+    def test_chunk_past_the_end(self):
+        url = self.start_upload(size=100)
+
+        self.assertEqual(self.send(url, 0, BODY[:101]).status_code, 413)
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.send(self.start_upload(), 0, BODY).json()
+
+        second_url = self.start_upload()
+        self.send(second_url, 0, BODY[:300])
+        second = self.send(second_url, 300, BODY[300:]).json()
+
+        documents = Document.objects.filter(pk__in=[first["id"], second["id"]])
+        self.assertEqual(len({(row.file.name, row.content_hash) for row in documents}), 1)
+
+        stored = [path for path in (self.media / "documents").rglob("*") if path.is_file()]
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(stored[0].read_bytes(), BODY)
@@ -0,0 +1,43 @@
+# Vetmanagementsystem/tests/test_exports.py
+"""
+Export date bounds: anything that is not a real day is the caller's
+mistake, answered with a 400 or a CommandError rather than a crash.
+"""
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ExportDateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        _, client = make_client("owner")
+        seed_clinic(cls.doctor, [client], patients_per_client=1, visits_per_patient=2)
+
+    def test_invalid_dates_are_rejected(self):
+        api = APIClient()
+        api.force_authenticate(self.doctor)
+
+        for value in ("2024-02-30", "2024-13-01", "yesterday"):
+            for name in ("since", "until"):
+                response = api.get(f"/api/exports/visits/?{name}={value}")
+                self.assertEqual(response.status_code, 400, (name, value))
+
+                with self.assertRaises(CommandError):
+                    call_command("export_records", "visits", f"--{name}={value}", stdout=StringIO())
+
+    def test_valid_dates_stream(self):
+        api = APIClient()
+        api.force_authenticate(self.doctor)
+
+        response = api.get("/api/exports/visits/?since=2024-02-29&until=2999-12-31")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 3)
@@ -0,0 +1,129 @@
+# Vetmanagementsystem/tests/test_jobs.py
+"""
+The job queue run by burst-mode workers: priority order, retries with
+backoff, failure after max_attempts and recovery of expired leases.
+
+Workers run jobs on their own threads and connections, so rows must be
+committed: these are TransactionTestCases.
+"""
+import datetime
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from Vetmanagementsystem import jobs
+from Vetmanagementsystem.models import Job
+
+
+@override_settings(JOBS_RETRY_BASE_SECONDS=10, JOBS_RETRY_MAX_SECONDS=3600, JOBS_LEASE_SECONDS=300)
+class JobQueueTests(TransactionTestCase):
+
+    def setUp(self):
+        self.ran = []
+        self.failures = {}
+
+        def record(job):
+            self.ran.append(job.payload["name"])
+            if self.failures.get(job.payload["name"], 0) >= job.attempts:
+                raise RuntimeError("flaky")
+            return {"name": job.payload["name"]}
+
+        self.enterContext(mock.patch.dict(jobs.TASKS, {"tests.record": record}))
+
+    def enqueue(self, name, **options):
+        return jobs.enqueue("tests.record", {"name": name}, **options)
+
+    def run_burst(self, threads=1):
+        return jobs.Worker(threads=threads, poll_interval=0.01, name="test-worker").run(burst=True)
+
+    def make_due(self, job):
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+    def test_priority_order(self):
+        for name, priority in (("low", 0), ("high", 10), ("middle", 5), ("low-later", 0)):
+            self.enqueue(name, priority=priority)
+
+        self.enqueue("delayed", priority=100, delay=datetime.timedelta(hours=1))
+
+        self.assertEqual(self.run_burst(), 4)
+        self.assertEqual(self.ran, ["high", "middle", "low", "low-later"])
+        self.assertEqual(Job.objects.get(payload__name="delayed").status, Job.QUEUED)
+
+    def test_retry_with_backoff(self):
+        self.failures["flaky"] = 2
+        job = self.enqueue("flaky", max_attempts=5)
+
+        for attempt in (1, 2):
+            before = timezone.now()
+            with self.assertLogs("Vetmanagementsystem.jobs", "WARNING"):
+                self.run_burst()
+            job.refresh_from_db()
+
+            self.assertEqual((job.status, job.attempts), (Job.QUEUED, attempt))
+            self.assertIn("flaky", job.last_error)
+            delay = (job.run_after - before).total_seconds()
+            self.assertGreaterEqual(delay, 10 * 2 ** (attempt - 1))
+            self.assertLessEqual(delay, 10 * 2 ** (attempt - 1) * 1.25 + 5)
+            self.make_due(job)
+
+        self.run_burst()
+        job.refresh_from_db()
+
+        self.assertEqual((job.status, job.attempts, job.result), (Job.SUCCEEDED, 3, {"name": "flaky"}))
+        self.assertEqual(self.ran, ["flaky"] * 3)
+
+    def test_backoff_is_capped(self):
+        with override_settings(JOBS_RETRY_BASE_SECONDS=10, JOBS_RETRY_MAX_SECONDS=60):
+            self.assertLessEqual(jobs.backoff(30).total_seconds(), 75)
+            self.assertGreaterEqual(jobs.backoff(30).total_seconds(), 60)
+
+    def test_fails_after_max_attempts(self):
+        self.failures["broken"] = 99
+        job = self.enqueue("broken", max_attempts=2)
+
+        with self.assertLogs("Vetmanagementsystem.jobs", "WARNING") as logs:
+            self.run_burst()
+            self.make_due(job)
+            self.run_burst()
+        job.refresh_from_db()
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+        self.make_due(job)
+        self.run_burst()
+        self.assertEqual(self.ran, ["broken"] * 2)
+
+    def test_expired_lease_is_requeued(self):
+        expired = timezone.now() - datetime.timedelta(seconds=301)
+        lost = self.enqueue("lost", max_attempts=3)
+        spent = self.enqueue("spent", max_attempts=1)
+        alive = self.enqueue("alive", max_attempts=3)
+
+        Job.objects.filter(pk__in=[lost.pk, spent.pk]).update(
+            status=Job.RUNNING, locked_by="gone", locked_at=expired, attempts=1
+        )
+        Job.objects.filter(pk=alive.pk).update(
+            status=Job.RUNNING, locked_by="elsewhere", locked_at=timezone.now(), attempts=1
+        )
+
+        self.run_burst()
+
+        lost.refresh_from_db()
+        spent.refresh_from_db()
+        alive.refresh_from_db()
+
+        self.assertEqual((lost.status, lost.attempts), (Job.SUCCEEDED, 2))
+        self.assertEqual((spent.status, spent.last_error), (Job.FAILED, "Worker lease expired."))
+        self.assertEqual((alive.status, alive.locked_by), (Job.RUNNING, "elsewhere"))
+        self.assertEqual(self.ran, ["lost"])
+
+    def test_jobs_are_claimed_once(self):
+        for index in range(12):
+            self.enqueue(f"job-{index}")
+
+        self.assertEqual(self.run_burst(threads=4), 12)
+        self.assertEqual(sorted(self.ran), sorted(f"job-{index}" for index in range(12)))
+        self.assertEqual(set(Job.objects.values_list("attempts", flat=True)), {1})
@@ -0,0 +1,75 @@
+# Vetmanagementsystem/tests/test_patient_photos.py
+"""
+Patient photos through the API: a new photo replaces the stored one,
+an explicit null or empty value removes it, and updates that do not
+mention the photo leave it alone.
+"""
+import base64
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from Vetmanagementsystem.models import Patient
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+def data_url(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, PATIENT_PHOTO_THUMBNAILS_IN_BACKGROUND=False)
+class PatientPhotoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        doctor = make_doctor()
+        cls.owner, client = make_client("owner")
+        (cls.patient,) = seed_clinic(doctor, [client], patients_per_client=1, visits_per_patient=1)
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.enterContext(override_settings(PATIENT_PHOTO_ROOT=Path(root)))
+
+        self.api = APIClient()
+        self.api.force_authenticate(self.owner)
+        self.url = f"/api/patients/{self.patient.pk}/"
+
+    def patch(self, data, **options):
+        response = self.api.patch(self.url, data, **options)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def stored_hash(self):
+        return Patient.objects.values_list("photo_hash", flat=True).get(pk=self.patient.pk)
+
+    def test_explicit_empty_values_remove_the_photo(self):
+        for cleared in ({"photo_data": ""}, {"photo_data": None}, {"photo": None}):
+            self.assertIsNotNone(self.patch({"photo_data": data_url("red")}, format="json")["photo_url"])
+
+            body = self.patch(cleared, format="json")
+
+            self.assertIsNone(body["photo_url"], cleared)
+            self.assertEqual(self.stored_hash(), "", cleared)
+
+    def test_empty_multipart_photo_removes_the_photo(self):
+        self.patch({"photo_data": data_url("red")}, format="json")
+
+        self.assertIsNone(self.patch({"photo": ""}, format="multipart")["photo_url"])
+        self.assertEqual(self.stored_hash(), "")
+
+    def test_other_updates_keep_the_photo(self):
+        first = self.patch({"photo_data": data_url("red")}, format="json")["photo_etag"]
+
+        self.assertEqual(self.patch({"name": "Renamed"}, format="json")["photo_etag"], first)
+
+        second = self.patch({"photo_data": data_url("blue")}, format="json")["photo_etag"]
+        self.assertNotEqual(second, first)
@@ -0,0 +1,161 @@
+# Vetmanagementsystem/tests/test_patient_summaries.py
+"""
+PatientSummary rows must match their sources after every kind of
+write: single saves, bulk list POSTs and rows moved between patients,
+and cached patient reads must follow them.
+"""
+import datetime
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Vetmanagementsystem import summaries
+from Vetmanagementsystem.models import AllergyAlert, Medication, PatientSummary, TreatmentPlan, Visit
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class PatientSummaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        _, client = make_client("owner")
+        cls.first, cls.second = seed_clinic(cls.doctor, [client], patients_per_client=2, visits_per_patient=2)
+
+    def api(self):
+        api = APIClient()
+        api.force_authenticate(self.doctor)
+        return api
+
+    def summary(self, patient):
+        return PatientSummary.objects.get(pk=patient.pk)
+
+    def assertConsistent(self):
+        report = summaries.check()
+        self.assertEqual((report["missing"], report["stale"]), ([], []))
+
+    def test_seeded_rows_are_consistent(self):
+        self.assertConsistent()
+
+        summary = self.summary(self.first)
+        self.assertEqual(summary.allergy_count, 1)
+        self.assertEqual([row["name"] for row in summary.active_medications], ["Amoxicillin"])
+        self.assertEqual(summary.next_follow_up, (timezone.localdate() + datetime.timedelta(days=14)).isoformat())
+
+    def test_single_writes(self):
+        visit = Visit.objects.create(
+            patient=self.first,
+            visit_date=timezone.now() + datetime.timedelta(hours=1),
+            visit_status="Ready for discharge",
+        )
+        Medication.objects.create(visit=visit, name="Meloxicam", dosage="1mg", frequency="SID")
+        AllergyAlert.objects.create(patient=self.first, description="Chicken")
+        TreatmentPlan.objects.create(
+            visit=visit,
+            diagnosis="Sprain",
+            treatment_description="Rest",
+            follow_up_date=timezone.localdate() + datetime.timedelta(days=2),
+        )
+
+        summary = self.summary(self.first)
+        self.assertEqual(summary.last_visit_id, visit.pk)
+        self.assertEqual(summary.current_status, "Ready for discharge")
+        self.assertEqual([row["name"] for row in summary.active_medications], ["Meloxicam"])
+        self.assertEqual(summary.allergy_count, 2)
+        self.assertEqual(summary.next_follow_up, (timezone.localdate() + datetime.timedelta(days=2)).isoformat())
+        self.assertConsistent()
+
+        visit.delete()
+
+        self.assertEqual([row["name"] for row in self.summary(self.first).active_medications], ["Amoxicillin"])
+        self.assertConsistent()
+
+    def test_bulk_post_refreshes_summary(self):
+        last_visit = self.summary(self.first).last_visit_id
+
+        response = self.api().post("/api/medications/", [
+            {"visit": last_visit, "name": "BulkA", "dosage": "1", "frequency": "SID"},
+            {"visit": last_visit, "name": "BulkB", "dosage": "1", "frequency": "SID"},
+        ], format="json")
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(
+            [row["name"] for row in self.summary(self.first).active_medications],
+            ["Amoxicillin", "BulkA", "BulkB"],
+        )
+        self.assertConsistent()
+
+    def test_moving_a_row_refreshes_both_patients(self):
+        visit = Visit.objects.get(pk=self.summary(self.first).last_visit_id)
+        allergy = AllergyAlert.objects.filter(patient=self.first).get()
+
+        visit.visit_date = timezone.now() + datetime.timedelta(hours=1)
+        visit.patient = self.second
+        visit.save()
+
+        allergy.patient = self.second
+        allergy.save(update_fields=["patient"])
+
+        self.assertEqual(self.summary(self.second).last_visit_id, visit.pk)
+        self.assertNotEqual(self.summary(self.first).last_visit_id, visit.pk)
+        self.assertEqual(self.summary(self.first).allergy_count, 0)
+        self.assertEqual(self.summary(self.second).allergy_count, 2)
+        self.assertConsistent()
+
+    def test_treatment_for_a_patient_uses_the_last_visit(self):
+        PatientSummary.objects.filter(pk=self.first.pk).delete()
+
+        for patient in (self.first, self.second):
+            latest = Visit.objects.filter(patient=patient).order_by("-visit_date", "-id").first()
+            response = self.api().post("/api/treatments/", {"patient": patient.pk, "name": "Otitis"}, format="json")
+
+            self.assertEqual(response.status_code, 201, response.content)
+            self.assertEqual(response.json()["visit"], latest.pk)
+
+    def test_check_command(self):
+        out = StringIO()
+        call_command("check_patient_summaries", stdout=out)
+        self.assertIn("consistent", out.getvalue())
+
+        PatientSummary.objects.filter(pk=self.first.pk).update(allergy_count=7)
+        PatientSummary.objects.filter(pk=self.second.pk).delete()
+
+        with self.assertRaises(CommandError):
+            call_command("check_patient_summaries", stdout=StringIO())
+
+        call_command("check_patient_summaries", "--fix", stdout=StringIO())
+        self.assertConsistent()
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class CachedPatientSummaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        _, client = make_client("owner")
+        (cls.patient,) = seed_clinic(cls.doctor, [client], patients_per_client=1, visits_per_patient=1)
+
+    def setUp(self):
+        caches["responses"].clear()
+        self.api = APIClient()
+        self.api.force_authenticate(self.doctor)
+
+    def test_cached_reads_follow_a_new_visit(self):
+        detail = f"/api/patients/{self.patient.pk}/"
+
+        for url in (detail, "/api/patients/"):
+            self.api.get(url)
+            self.assertEqual(self.api.get(url)["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            visit = Visit.objects.create(patient=self.patient, visit_date=timezone.now() + datetime.timedelta(hours=1))
+
+        self.assertEqual(self.api.get(detail).json()["summary"]["last_visit"], visit.pk)
+        self.assertEqual(self.api.get("/api/patients/").json()["results"][0]["summary"]["last_visit"], visit.pk)
@@ -0,0 +1,273 @@
+# Vetmanagementsystem/tests/test_query_counts.py
+"""
+Query budgets: every route must run the same number of queries
+whether the clinic holds ~10 rows per model or ~1,000.
+
+Each route is called as the doctor and as a client, first on a small
+dataset and again after it has grown. A route whose count changes has
+a per-row query (an N+1); the failure lists the SQL templates that ran
+more often on the larger dataset.
+
+New routes fail test_every_route_is_budgeted until they get an entry
+in ROUTES.
+"""
+import datetime
+import itertools
+from collections import Counter
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Vetmanagementsystem import search
+from Vetmanagementsystem.models import DocumentUpload, Job, Patient, Reminder
+from Vetmanagementsystem.serializers import ClaimsTokenObtainPairSerializer
+from Vetmanagementsystem.urls import router
+
+from .fixtures import PASSWORD, make_client, make_doctor, seed_clinic
+from .test_query_plans import CapturedQueries
+
+
+# Namespaces that are not part of the API.
+SKIPPED_NAMESPACES = {"admin", "rest_framework"}
+
+_unique = itertools.count()
+
+
+def route_names():
+    """URL names of every API route, format-suffix variants folded."""
+
+    names = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace not in SKIPPED_NAMESPACES:
+                    walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                names.add(pattern.name)
+
+    walk(get_resolver().url_patterns)
+
+    return names
+
+
+# ============================================================
+# REQUESTS PER ROUTE
+# ============================================================
+# Each builder takes the case and the acting user and returns
+# (method, url, data). Builders run outside the measured block.
+
+def _first_id(case, user, prefix):
+    page = case.api(user).get(f"/api/{prefix}/?page_size=1").json()
+    return page["results"][0]["id"]
+
+
+def _list(prefix):
+    return lambda case, user: ("get", f"/api/{prefix}/", None)
+
+
+def _detail(prefix):
+    return lambda case, user: ("get", f"/api/{prefix}/{_first_id(case, user, prefix)}/", None)
+
+
+def _client_scope(case, user):
+    # Staff read a client's data by passing ?client=.
+    return f"?client={case.client_of[user.pk]}" if user.is_staff else ""
+
+
+def _refresh(user):
+    return str(ClaimsTokenObtainPairSerializer.get_token(user))
+
+
+def _access(user):
+    return str(ClaimsTokenObtainPairSerializer.get_token(user).access_token)
+
+
+def _new_upload(case, user):
+    patient = Patient.objects.order_by("id").first()
+    return DocumentUpload.objects.create(patient=patient, issued_date=timezone.localdate(), filename="scan.pdf", size=10)
+
+
+def _new_job(case, user):
+    return Job.objects.create(kind="maintenance.rebuild_counters", created_by_id=user.pk)
+
+
+def _new_reminder(case, user):
+    patient = Patient.objects.filter(client_id=case.client_of[user.pk]).order_by("id").first()
+    return Reminder.objects.create(
+        dedupe_key=f"follow_up:{next(_unique)}:20260101:email",
+        kind=Reminder.FOLLOW_UP,
+        source_id=1,
+        channel="email",
+        client_id=patient.client_id,
+        patient=patient,
+        recipient="owner@clinic.test",
+        due_at=timezone.now(),
+        subject="Follow-up due",
+        body="Follow-up due.",
+    )
+
+
+def _new_account():
+    name = f"budget{next(_unique)}"
+    return {"username": name, "email": f"{name}@clinic.test", "password": PASSWORD, "full_name": name.title()}
+
+
+ROUTES = {
+    "api-root": lambda case, user: ("get", "/api/", None),
+    "api-register": lambda case, user: ("post", "/api/register/", _new_account()),
+    "client-register": lambda case, user: ("post", "/api/client/register/", _new_account()),
+    "api-doctor-register": lambda case, user: ("post", "/api/doctor/register/", _new_account()),
+    "api-login": lambda case, user: ("post", "/api/login/", {"username": user.username, "password": PASSWORD}),
+    "api-doctor-login": lambda case, user: ("post", "/api/doctor/login/", {"username": user.username, "password": PASSWORD}),
+    "token_obtain_pair": lambda case, user: ("post", "/api/token/", {"username": user.username, "password": PASSWORD}),
+    "token_refresh": lambda case, user: ("post", "/api/token/refresh/", {"refresh": _refresh(user)}),
+    "api-logout": lambda case, user: ("post", "/api/logout/", {"refresh": _refresh(user)}),
+    "dashboard": lambda case, user: ("get", "/api/dashboard/", None),
+    "overview-customer": lambda case, user: ("get", "/api/overview_customer/" + _client_scope(case, user), None),
+    "appointments-availability": lambda case, user: (
+        "get", f"/api/appointments/availability/?start={case.next_weekday.isoformat()}", None,
+    ),
+    "patient-photo": lambda case, user: ("get", f"/api/photos/{'0' * 64}/", None),
+    "response-cache-stats": lambda case, user: ("get", "/api/cache/stats/", None),
+    "search": lambda case, user: ("get", "/api/search/?q=pet", None),
+    "export": lambda case, user: ("get", "/api/exports/visits/" + _client_scope(case, user), None),
+    "metrics": lambda case, user: ("get", "/metrics", None),
+    "revenue-report": lambda case, user: (
+        "get", "/api/reports/revenue/" + ("?by=client" if user.is_staff else ""), None,
+    ),
+    "documents-download": lambda case, user: (
+        "get", f"/api/documents/{_first_id(case, user, 'documents')}/download/", None,
+    ),
+    "document-upload-list": lambda case, user: (
+        "post", "/api/document-uploads/",
+        {"patient": _first_id(case, user, "patients"), "filename": "scan.pdf", "size": 10},
+    ),
+    "document-upload-detail": lambda case, user: ("get", f"/api/document-uploads/{_new_upload(case, user).pk}/", None),
+    "patients-vitals-series": lambda case, user: (
+        "get", f"/api/patients/{_first_id(case, user, 'patients')}/vitals-series/?points=50", None,
+    ),
+}
+
+for _prefix, _viewset, _basename in router.registry:
+    ROUTES[f"{_basename}-list"] = _list(_prefix)
+    ROUTES[f"{_basename}-detail"] = _detail(_prefix)
+
+# Jobs only exist once queued; each user sees their own.
+ROUTES["jobs-detail"] = lambda case, user: ("get", f"/api/jobs/{_new_job(case, user).pk}/", None)
+ROUTES["jobs-download"] = lambda case, user: ("get", f"/api/jobs/{_new_job(case, user).pk}/download/", None)
+ROUTES["reminders-detail"] = lambda case, user: ("get", f"/api/reminders/{_new_reminder(case, user).pk}/", None)
+
+
+# ============================================================
+# TESTS
+# ============================================================
+
+# Cached responses would hide the queries under test; a fast hasher
+# keeps the login routes cheap.
+@override_settings(
+    RESPONSE_CACHE_ENABLED=False,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class QueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        cls.small_user, small_client = make_client("owner-small")
+        _, other_client = make_client("owner-other")
+
+        # ~10 rows per model.
+        seed_clinic(cls.doctor, [small_client, other_client], patients_per_client=5, visits_per_patient=1)
+
+        cls.client_of = {cls.doctor.pk: small_client.id, cls.small_user.pk: small_client.id}
+
+        day = timezone.localdate() + datetime.timedelta(days=1)
+        while day.weekday() not in (0, 1, 2, 3, 4):
+            day += datetime.timedelta(days=1)
+        cls.next_weekday = day
+
+    def api(self, user):
+        # A real access token, so requests go through ClaimsJWTAuthentication
+        # and see the claims-only user production sees.
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f"Bearer {_access(user)}")
+        return api
+
+    def _grow(self):
+        """Bring visit-level tables to ~1,000 rows, owned mostly by one new client."""
+
+        large_user, large_client = make_client("owner-large")
+        extra = [make_client(f"owner-extra{index}")[1] for index in range(20)]
+
+        seed_clinic(self.doctor, [large_client], patients_per_client=250, visits_per_patient=4)
+        seed_clinic(self.doctor, extra, patients_per_client=2, visits_per_patient=1)
+        search.rebuild()
+
+        self.client_of[self.doctor.pk] = large_client.id
+        self.client_of[large_user.pk] = large_client.id
+
+        return large_user
+
+    def _measure(self, user, name):
+        """(status, [sql]) of one call, after a warm-up call."""
+
+        build = ROUTES[name]
+
+        for attempt in range(2):
+            method, url, data = build(self, user)
+            api = self.api(user)
+            captured = CapturedQueries()
+
+            with connection.execute_wrapper(captured):
+                response = getattr(api, method)(url, data, format="json")
+                if response.streaming:
+                    b"".join(response.streaming_content)
+
+        self.assertLess(response.status_code, 500, f"{name} ({user.username}): {response.status_code}")
+
+        return response.status_code, [sql for sql, _ in captured.queries]
+
+    def _measure_all(self, roles):
+        return {
+            (role, name): self._measure(user, name)
+            for role, user in roles.items()
+            for name in sorted(ROUTES)
+        }
+
+    def test_every_route_is_budgeted(self):
+        missing = route_names() - set(ROUTES)
+
+        self.assertFalse(missing, f"Routes without a query budget entry: {sorted(missing)}")
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        search.rebuild()
+        small = self._measure_all({"doctor": self.doctor, "client": self.small_user})
+
+        large_user = self._grow()
+        large = self._measure_all({"doctor": self.doctor, "client": large_user})
+
+        problems = []
+
+        for key, (status_small, queries_small) in small.items():
+            status_large, queries_large = large[key]
+
+            if status_small != status_large:
+                problems.append(f"{key}: status {status_small} on the small dataset, {status_large} on the large one")
+                continue
+
+            if len(queries_small) == len(queries_large):
+                continue
+
+            grown = Counter(queries_large) - Counter(queries_small)
+            lines = "\n".join(f"    x{count} {sql}" for sql, count in grown.most_common(5))
+            problems.append(
+                f"{key}: {len(queries_small)} queries on the small dataset, "
+                f"{len(queries_large)} on the large one; repeated more:\n{lines}"
+            )
+
+        if problems:
+            self.fail("Query count depends on row count:\n" + "\n".join(problems))
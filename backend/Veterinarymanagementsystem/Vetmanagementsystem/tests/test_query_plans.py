@@ -0,0 +1,205 @@
+# Vetmanagementsystem/tests/test_query_plans.py
+"""
+EXPLAIN every query behind the router's viewsets and fail when a large
+table is read with a sequential scan.
+
+SQLite: without ANALYZE statistics the planner assumes big tables, so
+the seeded rows are enough to exercise index choice. A bare
+"SCAN <table>" is only accepted for an unfiltered, LIMITed walk (a
+first page read in rowid order).
+
+Postgres: plans are taken with enable_seqscan off, so any remaining
+"Seq Scan" means no index can serve the query.
+"""
+import re
+import unittest
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from Vetmanagementsystem.models import (
+    AllergyAlert,
+    Appointment,
+    Client,
+    ClientCommunicationNote,
+    ClientNote,
+    Document,
+    Medication,
+    Patient,
+    Receipt,
+    TreatmentPlan,
+    Visit,
+    VitalSigns,
+)
+from Vetmanagementsystem.urls import router
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+LARGE_TABLES = {
+    model._meta.db_table
+    for model in (
+        AllergyAlert,
+        Appointment,
+        Client,
+        ClientCommunicationNote,
+        ClientNote,
+        Document,
+        Medication,
+        Patient,
+        Receipt,
+        TreatmentPlan,
+        Visit,
+        VitalSigns,
+    )
+}
+
+
+class CapturedQueries:
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def explain(sql, params):
+
+    with connection.cursor() as cursor:
+
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+        if connection.vendor == "postgresql":
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SET LOCAL enable_seqscan = on")
+            return plan
+
+    raise unittest.SkipTest(f"No plan inspection for {connection.vendor}")
+
+
+def sequential_scans(sql, plan):
+
+    tables = []
+
+    for line in plan:
+
+        if connection.vendor == "postgresql":
+            match = re.search(r'Seq Scan on "?(\w+)"?', line)
+            if match and match.group(1) in LARGE_TABLES:
+                tables.append(match.group(1))
+            continue
+
+        match = re.match(r'\s*SCAN "?(\w+)"?(.*)$', line)
+
+        if not match or match.group(1) not in LARGE_TABLES:
+            continue
+
+        if "USING" in match.group(2):
+            continue
+
+        # An unfiltered page walked in index order stops at the LIMIT; a
+        # temp b-tree sort means every row is read and sorted first.
+        bounded_walk = (
+            " WHERE " not in sql
+            and " LIMIT " in sql
+            and not any("USE TEMP B-TREE" in step for step in plan)
+        )
+
+        if not bounded_walk:
+            tables.append(match.group(1))
+
+    return tables
+
+
+# Cached responses would hide the queries under test.
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        cls.users = []
+        clients = []
+
+        for index in range(3):
+            user, client = make_client(f"owner{index}")
+            cls.users.append(user)
+            clients.append(client)
+
+        cls.patients = seed_clinic(cls.doctor, clients, patients_per_client=3, visits_per_patient=2)
+
+    def _api(self, user):
+        api = APIClient()
+        api.force_authenticate(user)
+        return api
+
+    def _assert_indexed(self, user, method, url, data=None):
+
+        api = self._api(user)
+        captured = CapturedQueries()
+
+        with connection.execute_wrapper(captured):
+            response = getattr(api, method)(url, data, format="json")
+
+        self.assertLess(response.status_code, 400, f"{method.upper()} {url}: {response.status_code}")
+
+        problems = []
+
+        for sql, params in captured.queries:
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+
+            plan = explain(sql, params)
+
+            for table in sequential_scans(sql, plan):
+                problems.append(f"{table}\n  sql: {sql}\n  plan: {plan}")
+
+        self.assertFalse(
+            problems,
+            f"Sequential scan behind {method.upper()} {url}:\n" + "\n".join(problems),
+        )
+
+        return response
+
+    def _walk_viewsets(self, user):
+
+        for prefix, viewset, basename in router.registry:
+            with self.subTest(user=user.username, endpoint=prefix):
+                url = f"/api/{prefix}/?page_size=2"
+                page = self._assert_indexed(user, "get", url).json()
+
+                if page.get("next"):
+                    self._assert_indexed(user, "get", page["next"])
+
+                if page["results"]:
+                    pk = page["results"][0]["id"]
+                    self._assert_indexed(user, "get", f"/api/{prefix}/{pk}/")
+
+    def test_doctor_viewsets_use_indexes(self):
+        self._walk_viewsets(self.doctor)
+
+    def test_client_viewsets_use_indexes(self):
+        self._walk_viewsets(self.users[0])
+
+    def test_latest_visit_lookup_uses_index(self):
+        # The lookup TreatmentSerializer.validate makes for a bare patient id.
+        queryset = Visit.objects.filter(patient_id=self.patients[0].id).order_by("-visit_date")[:1]
+        sql, params = queryset.query.sql_with_params()
+
+        plan = explain(sql, params)
+
+        self.assertFalse(sequential_scans(sql, plan), plan)
+        self.assertTrue(any("visit_patient_date_idx" in line for line in plan), plan)
+
+    def test_dashboard_and_overview_use_indexes(self):
+        user = self.users[0]
+        self._assert_indexed(user, "get", "/api/dashboard/")
+        self._assert_indexed(user, "get", "/api/overview_customer/")
+        self._assert_indexed(self.doctor, "get", "/api/dashboard/")
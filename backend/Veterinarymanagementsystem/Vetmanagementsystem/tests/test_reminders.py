@@ -0,0 +1,139 @@
+# Vetmanagementsystem/tests/test_reminders.py
+"""
+Reminder idempotency: generating twice adds nothing, a rescheduled
+appointment is announced again, a reminder left "sending" is never sent
+twice, and undelivered messages are retried up to
+REMINDER_MAX_ATTEMPTS.
+"""
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from Vetmanagementsystem import reminders
+from Vetmanagementsystem.models import Appointment, Reminder, TreatmentPlan, Visit
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+class RecordingSender:
+    """Records what it is given; fails the ids in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def send(self, batch):
+        self.sent.extend(reminder.id for reminder in batch)
+        return {reminder.id: "gateway said no" for reminder in batch if reminder.id in self.failing}
+
+
+class BrokenSender:
+
+    def send(self, batch):
+        raise ConnectionError("gateway down")
+
+
+@override_settings(
+    REMINDER_FOLLOW_UP_LEAD_DAYS=2,
+    REMINDER_APPOINTMENT_LEAD_HOURS=24,
+    REMINDER_MAX_ATTEMPTS=3,
+    REMINDER_SENDING_TIMEOUT_SECONDS=600,
+)
+class ReminderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        doctor = make_doctor()
+        _, client = make_client("owner")
+        (cls.patient,) = seed_clinic(doctor, [client], patients_per_client=1, visits_per_patient=1)
+
+        cls.appointment = Appointment.objects.create(
+            patient=cls.patient,
+            client=client,
+            date=timezone.now() + datetime.timedelta(hours=3),
+        )
+        TreatmentPlan.objects.create(
+            visit=Visit.objects.get(patient=cls.patient),
+            diagnosis="Otitis",
+            treatment_description="Recheck",
+            follow_up_date=timezone.localdate() + datetime.timedelta(days=1),
+        )
+
+    def test_generate_is_idempotent(self):
+        first = reminders.generate()
+
+        # One follow-up and one appointment, each by email and SMS.
+        self.assertEqual(first, {"considered": 4, "created": 4})
+        self.assertEqual(
+            sorted(Reminder.objects.values_list("kind", "channel")),
+            [("appointment", "email"), ("appointment", "sms"), ("follow_up", "email"), ("follow_up", "sms")],
+        )
+
+        self.assertEqual(reminders.generate(), {"considered": 4, "created": 0})
+        self.assertEqual(reminders.generate(batch_size=1), {"considered": 4, "created": 0})
+        self.assertEqual(Reminder.objects.count(), 4)
+
+    def test_rescheduled_appointment_gets_a_new_reminder(self):
+        reminders.generate()
+        reminders.dispatch(RecordingSender())
+
+        self.appointment.date += datetime.timedelta(hours=2)
+        self.appointment.save()
+
+        self.assertEqual(reminders.generate()["created"], 2)
+
+        fresh = Reminder.objects.filter(kind=Reminder.APPOINTMENT, status=Reminder.PENDING)
+        self.assertEqual(fresh.count(), 2)
+        self.assertEqual({reminder.due_at for reminder in fresh}, {self.appointment.date})
+
+    def test_interrupted_send_is_not_repeated(self):
+        reminders.generate()
+        crashed, busy = Reminder.objects.order_by("id")[:2]
+
+        Reminder.objects.filter(pk=crashed.pk).update(
+            status=Reminder.SENDING,
+            claim="dead-run",
+            claimed_at=timezone.now() - datetime.timedelta(seconds=601),
+            attempts=1,
+        )
+        Reminder.objects.filter(pk=busy.pk).update(
+            status=Reminder.SENDING,
+            claim="live-run",
+            claimed_at=timezone.now(),
+            attempts=1,
+        )
+
+        sender = RecordingSender()
+        counts = reminders.dispatch(sender)
+
+        self.assertEqual(counts, {"sent": 2, "retrying": 0, "failed": 0})
+        self.assertNotIn(crashed.pk, sender.sent)
+        self.assertNotIn(busy.pk, sender.sent)
+
+        crashed.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual((crashed.status, crashed.attempts), (Reminder.FAILED, 1))
+        self.assertEqual((busy.status, busy.claim), (Reminder.SENDING, "live-run"))
+
+    def test_sender_errors_are_retried_up_to_max_attempts(self):
+        reminders.generate()
+        flaky = Reminder.objects.order_by("id").first()
+        sender = RecordingSender(failing={flaky.pk})
+
+        self.assertEqual(reminders.dispatch(sender), {"sent": 3, "retrying": 1, "failed": 0})
+        self.assertEqual(reminders.dispatch(sender), {"sent": 0, "retrying": 1, "failed": 0})
+        self.assertEqual(reminders.dispatch(sender), {"sent": 0, "retrying": 0, "failed": 1})
+        self.assertEqual(reminders.dispatch(sender), {"sent": 0, "retrying": 0, "failed": 0})
+
+        flaky.refresh_from_db()
+        self.assertEqual((flaky.status, flaky.attempts, flaky.last_error), (Reminder.FAILED, 3, "gateway said no"))
+        self.assertEqual(sender.sent.count(flaky.pk), 3)
+        self.assertEqual(Reminder.objects.filter(status=Reminder.SENT).count(), 3)
+
+    def test_sender_exception_retries_the_batch(self):
+        reminders.generate()
+
+        self.assertEqual(reminders.dispatch(BrokenSender()), {"sent": 0, "retrying": 4, "failed": 0})
+        self.assertEqual(reminders.dispatch(RecordingSender()), {"sent": 4, "retrying": 0, "failed": 0})
+        self.assertEqual(set(Reminder.objects.values_list("attempts", flat=True)), {2})
@@ -0,0 +1,136 @@
+# Vetmanagementsystem/tests/test_revenue.py
+"""
+RevenueRollup cells kept by the Receipt signals: every change of
+status, date, amount or client moves its delta to the right cells, and
+the incremental state always equals a full rebuild.
+"""
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+
+from Vetmanagementsystem import revenue
+from Vetmanagementsystem.models import Receipt, RevenueRollup
+
+from .fixtures import make_client
+
+
+JAN = datetime.date(2025, 1, 15)
+FEB = datetime.date(2025, 2, 3)
+
+
+def cells():
+    """Non-empty rollup rows as {(client_id, month, status): (count, total)}."""
+
+    return {
+        (client_id, month, status): (count, total)
+        for client_id, month, status, count, total in RevenueRollup.objects.values_list(
+            "client_id", "month", "status", "receipts_count", "amount_total"
+        )
+        if count or total
+    }
+
+
+class RevenueRollupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        _, cls.first = make_client("first")
+        _, cls.second = make_client("second")
+
+    def setUp(self):
+        self.receipt = Receipt.objects.create(client=self.first, amount=Decimal("40.00"), date=JAN)
+
+    def assertCells(self, expected):
+        self.assertEqual(cells(), expected)
+
+        revenue.rebuild_all()
+        self.assertEqual(cells(), expected)
+
+    def test_create(self):
+        Receipt.objects.create(client=self.first, amount=Decimal("2.50"), date=JAN)
+
+        self.assertCells({
+            (self.first.pk, JAN.replace(day=1), "Pending"): (2, Decimal("42.50")),
+            (None, JAN.replace(day=1), "Pending"): (2, Decimal("42.50")),
+        })
+
+    def test_status_change(self):
+        self.receipt.status = "Paid"
+        self.receipt.save(update_fields=["status"])
+
+        self.assertCells({
+            (self.first.pk, JAN.replace(day=1), "Paid"): (1, Decimal("40.00")),
+            (None, JAN.replace(day=1), "Paid"): (1, Decimal("40.00")),
+        })
+
+    def test_date_change(self):
+        self.receipt.date = FEB
+        self.receipt.save()
+
+        self.assertCells({
+            (self.first.pk, FEB.replace(day=1), "Pending"): (1, Decimal("40.00")),
+            (None, FEB.replace(day=1), "Pending"): (1, Decimal("40.00")),
+        })
+
+    def test_amount_change(self):
+        self.receipt.amount = Decimal("55.25")
+        self.receipt.save(update_fields=["amount"])
+
+        self.assertCells({
+            (self.first.pk, JAN.replace(day=1), "Pending"): (1, Decimal("55.25")),
+            (None, JAN.replace(day=1), "Pending"): (1, Decimal("55.25")),
+        })
+
+    def test_client_change(self):
+        Receipt.objects.create(client=self.second, amount=Decimal("10.00"), date=JAN)
+
+        self.receipt.client = self.second
+        self.receipt.save()
+
+        self.assertCells({
+            (self.second.pk, JAN.replace(day=1), "Pending"): (2, Decimal("50.00")),
+            (None, JAN.replace(day=1), "Pending"): (2, Decimal("50.00")),
+        })
+
+    def test_untracked_save_keeps_cells(self):
+        before = cells()
+
+        self.receipt.save(update_fields=["created_at"])
+
+        self.assertCells(before)
+
+    def test_delete(self):
+        Receipt.objects.create(client=self.second, amount=Decimal("10.00"), date=FEB, status="Paid")
+
+        self.receipt.delete()
+
+        self.assertCells({
+            (self.second.pk, FEB.replace(day=1), "Paid"): (1, Decimal("10.00")),
+            (None, FEB.replace(day=1), "Paid"): (1, Decimal("10.00")),
+        })
+
+    def test_mixed_history_matches_rebuild(self):
+        receipts = [
+            Receipt.objects.create(
+                client=(self.first, self.second)[index % 2],
+                amount=Decimal(index) + Decimal("0.99"),
+                date=JAN + datetime.timedelta(days=index * 9),
+                status=revenue.STATUSES[index % len(revenue.STATUSES)],
+            )
+            for index in range(12)
+        ]
+
+        for index, receipt in enumerate(receipts):
+            receipt.status = revenue.STATUSES[(index + 1) % len(revenue.STATUSES)]
+            receipt.date = receipt.date + datetime.timedelta(days=20)
+            receipt.client = (self.second, self.first)[index % 2]
+            receipt.amount += 1
+            receipt.save()
+
+        receipts[0].delete()
+        incremental = cells()
+
+        revenue.rebuild_all()
+
+        self.assertEqual(incremental, cells())
@@ -0,0 +1,127 @@
+# Vetmanagementsystem/tests/test_scheduling.py
+"""
+Appointment overlap checks: merged busy intervals, the binary-search
+conflict lookup, automatic vet assignment and the 400 on a clash.
+"""
+import datetime
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Vetmanagementsystem.models import Appointment, DoctorProfile
+from Vetmanagementsystem.scheduling import BusySchedule
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+def at(hour, minute=0):
+    return datetime.datetime(2030, 1, 7, hour, minute, tzinfo=datetime.timezone.utc)
+
+
+class BusyScheduleTests(SimpleTestCase):
+
+    def test_back_to_back_slots_do_not_conflict(self):
+        schedule = BusySchedule({1: [(at(9), at(10)), (at(11), at(12))]})
+
+        self.assertTrue(schedule.is_free(1, at(10), at(11)))
+        self.assertTrue(schedule.is_free(1, at(8), at(9)))
+        self.assertTrue(schedule.is_free(1, at(12), at(13)))
+
+    def test_overlapping_slots_conflict(self):
+        schedule = BusySchedule({1: [(at(9), at(10)), (at(11), at(12))]})
+
+        self.assertEqual(schedule.conflict(1, at(9, 30), at(10, 30)), (at(9), at(10)))
+        self.assertEqual(schedule.conflict(1, at(10, 30), at(11, 15)), (at(11), at(12)))
+        self.assertEqual(schedule.conflict(1, at(8), at(13)), (at(11), at(12)))
+        self.assertEqual(schedule.conflict(1, at(11, 15), at(11, 30)), (at(11), at(12)))
+
+    def test_intervals_are_merged(self):
+        schedule = BusySchedule({1: [(at(10), at(11)), (at(9), at(10)), (at(9, 30), at(9, 45))]})
+
+        self.assertEqual(schedule.conflict(1, at(10, 45), at(12)), (at(9), at(11)))
+        self.assertTrue(schedule.is_free(1, at(11), at(12)))
+
+    def test_unknown_vet_is_free(self):
+        self.assertTrue(BusySchedule({}).is_free(1, at(9), at(10)))
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class BookingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first_vet = make_doctor("vet-one")
+        cls.second_vet = make_doctor("vet-two")
+        cls.user, cls.owner = make_client("owner")
+        (cls.patient,) = seed_clinic(cls.first_vet, [cls.owner], patients_per_client=1, visits_per_patient=1)
+        cls.start = timezone.now().replace(microsecond=0) + datetime.timedelta(days=10)
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def book(self, offset_minutes=0, minutes=30, vet=None):
+        data = {
+            "patient": self.patient.pk,
+            "client": self.owner.pk,
+            "date": (self.start + datetime.timedelta(minutes=offset_minutes)).isoformat(),
+            "duration_minutes": minutes,
+        }
+        if vet is not None:
+            data["veterinarian"] = vet.pk
+        return self.api.post("/api/appointments/", data, format="json")
+
+    def test_back_to_back_bookings(self):
+        self.assertEqual(self.book(0, vet=self.first_vet).status_code, 201)
+        self.assertEqual(self.book(30, vet=self.first_vet).status_code, 201)
+        self.assertEqual(self.book(-30, vet=self.first_vet).status_code, 201)
+
+    def test_overlap_is_rejected(self):
+        self.assertEqual(self.book(0, minutes=60, vet=self.first_vet).status_code, 201)
+
+        response = self.book(45, vet=self.first_vet)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("date", response.json())
+        self.assertEqual(self.book(45, vet=self.second_vet).status_code, 201)
+
+    def test_update_excludes_itself(self):
+        appointment = self.book(0, minutes=30, vet=self.first_vet).json()
+
+        response = self.api.patch(
+            f"/api/appointments/{appointment['id']}/",
+            {"duration_minutes": 45, "date": (self.start + datetime.timedelta(minutes=15)).isoformat()},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["duration_minutes"], 45)
+
+    def test_first_free_vet_is_assigned(self):
+        first = self.book(0).json()
+        second = self.book(10).json()
+
+        self.assertEqual(first["veterinarian"], self.first_vet.pk)
+        self.assertEqual(second["veterinarian"], self.second_vet.pk)
+
+    def test_no_free_vet(self):
+        self.book(0, vet=self.first_vet)
+        self.book(0, vet=self.second_vet)
+
+        response = self.book(15)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["date"], ["No veterinarian is free at that time."])
+        self.assertEqual(Appointment.objects.filter(veterinarian__isnull=False).count(), 2)
+
+    def test_deactivated_doctor_cannot_be_booked(self):
+        DoctorProfile.objects.create(user=self.second_vet, is_active=False)
+
+        response = self.book(0, vet=self.second_vet)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("veterinarian", response.json())
+
+        self.book(0, vet=self.first_vet)
+        self.assertEqual(self.book(10).json()["date"], ["No veterinarian is free at that time."])
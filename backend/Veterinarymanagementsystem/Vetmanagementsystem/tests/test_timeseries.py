@@ -0,0 +1,88 @@
+# Vetmanagementsystem/tests/test_timeseries.py
+"""
+Vitals series: LTTB keeps the arrays aligned and the gaps in them, and
+a date-only `until` includes that whole day.
+"""
+import datetime
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Vetmanagementsystem.models import Visit, VitalSigns
+from Vetmanagementsystem.timeseries import lttb_indices
+
+from .fixtures import make_client, make_doctor, seed_clinic
+
+
+class LttbTests(SimpleTestCase):
+
+    def setUp(self):
+        self.x = np.arange(1000, dtype=float) * 3600
+        self.wave = np.sin(np.arange(1000) / 25.0)
+        self.gappy = np.cos(np.arange(1000) / 40.0)
+        self.gappy[300:420] = np.nan
+
+    def test_aligned_indices(self):
+        for points in (3, 10, 50, 999):
+            kept = lttb_indices(self.x, [self.wave, self.gappy], points)
+
+            self.assertEqual(len(kept), points)
+            self.assertEqual((kept[0], kept[-1]), (0, 999))
+            self.assertTrue(np.all(np.diff(kept) > 0))
+
+    def test_gaps_are_kept(self):
+        kept = lttb_indices(self.x, [self.wave, self.gappy], 100)
+        inside = (kept >= 300) & (kept < 420)
+
+        # The other series still chooses points in the gap, where this one stays empty.
+        self.assertTrue(inside.any())
+        self.assertTrue(np.isnan(self.gappy[kept][inside]).all())
+        self.assertFalse(np.isnan(self.gappy[kept][~inside]).any())
+
+    def test_empty_series(self):
+        kept = lttb_indices(self.x, [np.full(1000, np.nan), self.wave], 20)
+
+        self.assertEqual(len(kept), 20)
+        self.assertEqual((kept[0], kept[-1]), (0, 999))
+
+    def test_short_series_are_untouched(self):
+        self.assertEqual(list(lttb_indices(self.x[:5], [self.wave[:5]], 10)), [0, 1, 2, 3, 4])
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class VitalsSeriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = make_doctor()
+        _, client = make_client("owner")
+        (cls.patient,) = seed_clinic(cls.doctor, [client], patients_per_client=1, visits_per_patient=1)
+
+        tz = timezone.get_current_timezone()
+        cls.day = datetime.date(2025, 3, 12)
+        for hour in (0, 9, 23):
+            visit = Visit.objects.create(
+                patient=cls.patient,
+                visit_date=datetime.datetime.combine(cls.day, datetime.time(hour, 30), tzinfo=tz),
+            )
+            VitalSigns.objects.create(visit=visit, weight_lbs=20, temperature=38.5)
+
+    def series(self, query):
+        api = APIClient()
+        api.force_authenticate(self.doctor)
+        response = api.get(f"/api/patients/{self.patient.pk}/vitals-series/?{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_date_only_until_covers_the_day(self):
+        day = self.day.isoformat()
+
+        self.assertEqual(self.series(f"since={day}&until={day}")["total_points"], 3)
+        self.assertEqual(self.series(f"until={day}")["total_points"], 3)
+
+    def test_until_with_a_time_is_exact(self):
+        day = self.day.isoformat()
+
+        self.assertEqual(self.series(f"since={day}&until={day}T10:00:00")["total_points"], 2)
@@ -0,0 +1,222 @@
+# Vetmanagementsystem/timeseries.py
+"""
+A patient's vitals as aligned arrays over a time window.
+
+Rows are read with one query into NumPy arrays. Rolling mean/min/max
+are computed on the full-resolution series. If there are more points
+than requested, the series are then reduced with Largest-Triangle-
+Three-Buckets (LTTB). The rolling stats are sampled at the same indices,
+so they still describe the points that were dropped.
+"""
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .models import VitalSigns
+
+
+KG_PER_LB = 0.45359237
+SECONDS_PER_DAY = 86400.0
+
+# Output name -> decimals in the response.
+METRICS = {
+    "weight_kg": 2,
+    "temperature": 1,
+    "respiration": 1,
+    "heart_rate": 1,
+}
+
+
+def _column(values):
+    return np.fromiter((np.nan if value is None else float(value) for value in values), dtype=float)
+
+
+def load(patient_id, since=None, until=None):
+    """(taken_at datetimes, seconds array, {metric: array}) in time order."""
+
+    rows = VitalSigns.objects.filter(visit__patient_id=patient_id)
+
+    if since is not None:
+        rows = rows.filter(visit__visit_date__gte=since)
+
+    if until is not None:
+        rows = rows.filter(visit__visit_date__lte=until)
+
+    rows = list(
+        rows.order_by("visit__visit_date", "id").values_list(
+            "visit__visit_date", "weight_lbs", "weight_oz", "temperature", "respiration", "heart_rate"
+        )
+    )
+
+    if not rows:
+        return [], np.empty(0), {metric: np.empty(0) for metric in METRICS}
+
+    taken, pounds, ounces, temperature, respiration, heart_rate = zip(*rows)
+    pounds = _column(pounds)
+    ounces = _column(ounces)
+
+    # Weight is stored as pounds + ounces; either part may be missing.
+    weight = (np.nan_to_num(pounds) + np.nan_to_num(ounces) / 16) * KG_PER_LB
+    weight[np.isnan(pounds) & np.isnan(ounces)] = np.nan
+
+    seconds = np.fromiter((moment.timestamp() for moment in taken), dtype=float)
+
+    return list(taken), seconds, {
+        "weight_kg": weight,
+        "temperature": _column(temperature),
+        "respiration": _column(respiration),
+        "heart_rate": _column(heart_rate),
+    }
+
+
+# ============================================================
+# STATISTICS
+# ============================================================
+
+def rolling(values, window):
+    """Trailing mean/min/max over `window` samples, ignoring gaps."""
+
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = sliding_window_view(padded, window)
+
+    # All-NaN windows (no reading yet) are expected and give NaN.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {
+            "mean": np.nanmean(windows, axis=1),
+            "min": np.nanmin(windows, axis=1),
+            "max": np.nanmax(windows, axis=1),
+        }
+
+
+def trend(seconds, values):
+    """Summary of the whole window, with a least-squares slope per day."""
+
+    valid = ~np.isnan(values)
+
+    if not valid.any():
+        return None
+
+    present = values[valid]
+    slope = None
+
+    if valid.sum() >= 2 and np.ptp(seconds[valid]) > 0:
+        slope = float(np.polyfit(seconds[valid] / SECONDS_PER_DAY, present, 1)[0])
+
+    return {
+        "count": int(valid.sum()),
+        "min": float(present.min()),
+        "max": float(present.max()),
+        "mean": float(present.mean()),
+        "last": float(present[-1]),
+        "slope_per_day": slope,
+    }
+
+
+# ============================================================
+# DOWNSAMPLING
+# ============================================================
+
+def lttb_indices(x, series, threshold):
+    """
+    Indices of the points kept by LTTB. With several series the
+    triangle areas are summed, each series scaled to [0, 1] first,
+    so the kept points suit every series and the arrays stay aligned.
+    Gaps (NaN) do not add to the area.
+    """
+
+    n = len(x)
+
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x - x[0]
+    ys = []
+
+    for values in series:
+        if np.isnan(values).all():
+            ys.append(values)
+            continue
+
+        low, high = np.nanmin(values), np.nanmax(values)
+        ys.append((values - low) / (high - low) if high > low else values - low)
+
+    y = np.vstack(ys)
+
+    # Inner buckets; the first and last point are always kept.
+    every = (n - 2) / (threshold - 2)
+    edges = np.append((np.arange(threshold - 1) * every).astype(int) + 1, n)
+    edges[threshold - 2] = n - 1
+
+    kept = np.empty(threshold, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+    anchor = 0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        for bucket in range(threshold - 2):
+            start, end = edges[bucket], edges[bucket + 1]
+            following = slice(edges[bucket + 1], edges[bucket + 2])
+
+            mean_x = x[following].mean()
+            mean_y = np.nanmean(y[:, following], axis=1)[:, None]
+            anchor_y = y[:, anchor][:, None]
+
+            area = np.abs(
+                (x[anchor] - mean_x) * (y[:, start:end] - anchor_y)
+                - (x[anchor] - x[start:end]) * (mean_y - anchor_y)
+            )
+            anchor = start + int(np.argmax(np.nansum(area, axis=0)))
+            kept[bucket + 1] = anchor
+
+    return kept
+
+
+# ============================================================
+# RESPONSE
+# ============================================================
+
+def _list(values, decimals):
+    return [None if np.isnan(value) else round(float(value), decimals) for value in values]
+
+
+def build(patient_id, since=None, until=None, points=200, window=5):
+
+    taken, seconds, series = load(patient_id, since, until)
+    kept = lttb_indices(seconds, list(series.values()), points)
+
+    body = {}
+    summary = {}
+
+    for metric, decimals in METRICS.items():
+        values = series[metric]
+        stats = rolling(values, window) if len(values) else {"mean": values, "min": values, "max": values}
+
+        body[metric] = {
+            "values": _list(values[kept], decimals),
+            "rolling": {name: _list(stat[kept], decimals) for name, stat in stats.items()},
+        }
+
+        summary[metric] = trend(seconds, values)
+
+        if summary[metric] is not None:
+            summary[metric] = {
+                name: value if name == "count" or value is None else round(value, decimals + 3)
+                for name, value in summary[metric].items()
+            }
+
+    return {
+        "patient": patient_id,
+        "since": since,
+        "until": until,
+        "window": window,
+        "total_points": len(taken),
+        "returned_points": len(kept),
+        "downsampled": len(kept) < len(taken),
+        "timestamps": [taken[index] for index in kept],
+        "series": body,
+        "summary": summary,
+    }
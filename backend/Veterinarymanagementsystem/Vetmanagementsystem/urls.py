@@ -1,7 +1,8 @@
 # Vetmanagementsystem/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 
 router = DefaultRouter()
@@ -25,6 +26,15 @@ router.register(r"clients", views.ClientViewSet, basename="clients")
 router.register(r"patients", views.PatientViewSet, basename="patients")
 router.register(r"appointments", views.AppointmentViewSet, basename="appointments")
 router.register(r"receipts", views.ReceiptViewSet, basename="receipts")
+router.register(r"jobs", views.JobViewSet, basename="jobs")
+router.register(r"reminders", views.ReminderViewSet, basename="reminders")
+
+if settings.ASYNC_VIEWS:
+    dashboard_view = async_views.AsyncDashboardView.as_view()
+    overview_view = async_views.AsyncOverviewCustomerView.as_view()
+else:
+    dashboard_view = views.DashboardAPIView.as_view()
+    overview_view = views.OverviewCustomerAPIView.as_view()
 
 # -------------------------
 # URL Patterns
@@ -37,7 +47,30 @@ urlpatterns = [
     path("api/client/register/", views.ClientRegistrationView.as_view(), name="client-register"),
 
 
-    # Dashboard & overview
-    path("api/dashboard/", views.DashboardAPIView.as_view(), name="dashboard"),
-    path("api/overview_customer/", views.OverviewCustomerAPIView.as_view(), name="overview-customer"),
+    # Dashboard & overview (async implementations under the ASGI profile)
+    path("api/dashboard/", dashboard_view, name="dashboard"),
+    path("api/overview_customer/", overview_view, name="overview-customer"),
+
+    # Revenue from the monthly rollup
+    path("api/reports/revenue/", views.RevenueReportView.as_view(), name="revenue-report"),
+
+    # Patient photos
+    path("api/photos/<str:digest>/", views.PatientPhotoView.as_view(), name="patient-photo"),
+    path("api/photos/<str:digest>/<int:size>/", views.PatientPhotoView.as_view(), name="patient-photo"),
+
+    # Resumable document uploads (staff)
+    path("api/document-uploads/", views.DocumentUploadListView.as_view(), name="document-upload-list"),
+    path("api/document-uploads/<uuid:upload_id>/", views.DocumentUploadDetailView.as_view(), name="document-upload-detail"),
+
+    # Response cache counters (staff)
+    path("api/cache/stats/", views.ResponseCacheStatsView.as_view(), name="response-cache-stats"),
+
+    # Full-text search
+    path("api/search/", views.SearchView.as_view(), name="search"),
+
+    # Streamed exports
+    path("api/exports/<str:dataset>/", views.ExportView.as_view(), name="export"),
+
+    # Prometheus scrape target (staff)
+    path("metrics", views.MetricsView.as_view(), name="metrics"),
 ]
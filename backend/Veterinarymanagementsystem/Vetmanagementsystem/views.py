@@ -1,20 +1,35 @@
 # Vetmanagementsystem/views.py
 
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.decorators import action
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
+from rest_framework.mixins import CreateModelMixin
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import (
     IsAuthenticated,
+    IsAdminUser,
     AllowAny,
     BasePermission,
     SAFE_METHODS
 )
 from rest_framework import status
-
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncMonth
+from rest_framework.serializers import BaseSerializer
+from rest_framework.generics import get_object_or_404
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.core.exceptions import FieldDoesNotExist
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.db.models import Prefetch, Count, Max
 from django.contrib.auth.hashers import make_password
-from django.db import transaction
+from django.db import connection, transaction
 
 from .models import (
     Client,
@@ -28,13 +43,18 @@ from .models import (
     ClientNote,
     Medication,
     Document,
+    DocumentUpload,
+    Job,
+    Reminder,
     TreatmentPlan,
     CustomUser,
-    
-
-   
+    SearchEntry,
 )
 
+from . import documents, jobs, metrics, response_cache, revenue, scheduling, search, summaries, timeseries
+from .counters import get_counter
+from .exports import EXPORTS, FORMATS, stream_export
+from .photos import content_type_for, photo_etag, photo_path, photo_sizes, render_thumbnails
 from .serializers import (
     ClientSerializer,
     PatientSerializer,
@@ -49,7 +69,13 @@ from .serializers import (
     DocumentSerializer,
     TreatmentSerializer,
     ClientRegistrationSerializer,
-    
+    PatientOverviewSerializer,
+    AvailabilityQuerySerializer,
+    VitalsSeriesQuerySerializer,
+    RevenueReportQuerySerializer,
+    DocumentUploadSerializer,
+    ReminderSerializer,
+    JobSerializer,
 )
 
 # ============================================================
@@ -107,7 +133,35 @@ def _client_for_user(user):
     if not user.is_authenticated:
         return None
 
-    return Client.objects.filter(user=user).first()
+    # Memoized on the request user; several call sites share it.
+    # vars() because TokenUser answers any attribute from its claims.
+    if "_client_cache" not in vars(user):
+        claimed = getattr(user, "client_pk", None)
+
+        if claimed is not None:
+            user._client_cache = Client.objects.filter(pk=claimed).first()
+        else:
+            user._client_cache = Client.objects.filter(user_id=user.pk).first()
+
+    return user._client_cache
+
+
+def _client_id_for_user(user):
+    """
+    Client pk for scoping reads; free when the token carries it.
+    """
+
+    if not user.is_authenticated:
+        return None
+
+    claimed = getattr(user, "client_pk", None)
+
+    if claimed is not None:
+        return claimed
+
+    client = _client_for_user(user)
+
+    return client.id if client else None
 
 
 def _client_filter_kwargs(user):
@@ -115,22 +169,557 @@ def _client_filter_kwargs(user):
     if user.is_staff:
         return {}
 
-    client = _client_for_user(user)
+    client_id = _client_id_for_user(user)
 
-    if client:
-        return {"client": client}
+    if client_id:
+        return {"client_id": client_id}
 
     return {"client__id": -1}
 
 
+# ============================================================
+# QUERY PLANNING
+# ============================================================
+
+@lru_cache(maxsize=None)
+def _serializer_related_paths(serializer_class):
+    """
+    Derive (select_related, prefetch_related) paths from a serializer:
+    dotted `source`s, nested serializers and Meta.related_fields.
+    """
+
+    serializer = serializer_class()
+    meta = getattr(serializer_class, "Meta", None)
+    model = getattr(meta, "model", None)
+    manifest = getattr(meta, "related_fields", {})
+
+    if model is None:
+        return (), ()
+
+    candidates = set()
+
+    for name, field in serializer.fields.items():
+
+        if field.write_only:
+            continue
+
+        candidates.update(manifest.get(name, ()))
+
+        source = getattr(field, "source", None) or name
+
+        if source == "*":
+            continue
+
+        if isinstance(field, BaseSerializer):
+            candidates.add(source.replace(".", "__"))
+        elif "." in source:
+            candidates.add(source.rsplit(".", 1)[0].replace(".", "__"))
+
+    select, prefetch = set(), set()
+
+    for path in candidates:
+
+        current = model
+        hops = []
+        many = False
+
+        for part in path.split("__"):
+            try:
+                field = current._meta.get_field(part)
+            except FieldDoesNotExist:
+                break
+
+            if not field.is_relation:
+                break
+
+            hops.append(part)
+            many = many or field.many_to_many or field.one_to_many
+            current = field.related_model
+
+        if not hops:
+            continue
+
+        (prefetch if many else select).add("__".join(hops))
+
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+class RelatedFieldsMixin:
+    """
+    Join or prefetch every relation the serializer reads, so list
+    endpoints run a constant number of queries regardless of rows.
+    """
+
+    def filter_queryset(self, queryset):
+
+        queryset = super().filter_queryset(queryset)
+
+        select, prefetch = _serializer_related_paths(self.get_serializer_class())
+
+        if select:
+            queryset = queryset.select_related(*select)
+
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        return queryset
+
+
+class AtomicWritesMixin:
+    """
+    Run each write action in one transaction, so the row and the
+    denormalized data its signals maintain commit together.
+    Reads stay outside a transaction.
+    """
+
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
+
+
+class BulkCreateMixin:
+    """
+    POST a JSON list to create many rows at once. Related pks in
+    `bulk_related_fields` are resolved with one query per field, rows
+    are written with bulk_create in one transaction, and a 400 carries
+    one error object per item (empty for valid items).
+    """
+
+    bulk_related_fields = ()
+    bulk_max_items = 1000
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        related_cache = getattr(self, "_related_cache", None)
+        if related_cache is not None:
+            context["related_cache"] = related_cache
+        return context
+
+    def _preload_related(self, items):
+
+        fields = self.get_serializer().fields
+        select, _ = _serializer_related_paths(self.get_serializer_class())
+        cache = {}
+
+        for name in self.bulk_related_fields:
+            ids = set()
+
+            for item in items:
+                value = item.get(name) if isinstance(item, dict) else None
+                try:
+                    ids.add(int(value))
+                except (TypeError, ValueError):
+                    continue
+
+            nested = [path[len(name) + 2:] for path in select if path.startswith(f"{name}__")]
+            queryset = fields[name].queryset
+
+            if nested:
+                queryset = queryset.select_related(*nested)
+
+            cache[name] = queryset.in_bulk(ids) if ids else {}
+
+        return cache
+
+    def create(self, request, *args, **kwargs):
+
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        items = request.data
+
+        if not items:
+            return Response([], status=status.HTTP_201_CREATED)
+
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {"detail": f"At most {self.bulk_max_items} items per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        self._related_cache = self._preload_related(items)
+
+        serializer = self.get_serializer(data=items, many=True)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            serializer.save()
+
+            # bulk_create sends no post_save: retire cached reads, index
+            # and refresh patient summaries here.
+            model = self.get_serializer_class().Meta.model
+            response_cache.invalidate(model, response_cache.client_ids_for(model, serializer.instance))
+            search.index_instances(model, serializer.instance)
+            summaries.refresh_instances(model, serializer.instance)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+def _estimated_count(queryset):
+    """
+    Planner row estimate for an unfiltered table (Postgres only).
+    None when unavailable, so callers fall back to COUNT(*).
+    """
+
+    if queryset.query.where or connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+
+    # reltuples is -1 until the table has been analyzed.
+    if not row or row[0] < 0:
+        return None
+
+    return row[0]
+
+
+class CountModeMixin:
+    """
+    List endpoints answer counts without serializing rows:
+
+    ?count_only=1                    -> {"count": N}
+    ?count_only=1&group_by=<field>   -> adds per-value counts
+    ?count_only=1&estimate=1         -> planner estimate when unfiltered
+    HEAD                             -> X-Total-Count header only
+
+    group_by is limited to the view's `count_group_fields`.
+    """
+
+    count_group_fields = ()
+
+    def _count_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset.select_related(None).prefetch_related(None).order_by()
+
+    def list(self, request, *args, **kwargs):
+
+        if request.method == "HEAD":
+            response = Response()
+            response["X-Total-Count"] = str(self._count_queryset().count())
+            return response
+
+        if request.query_params.get("count_only") not in ("1", "true", "True"):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self._count_queryset()
+        group_by = request.query_params.get("group_by")
+
+        if group_by and group_by not in self.count_group_fields:
+            return Response(
+                {"detail": f"group_by must be one of: {', '.join(self.count_group_fields) or 'none'}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        count = None
+        estimated = False
+
+        if request.query_params.get("estimate") in ("1", "true", "True"):
+            count = _estimated_count(queryset)
+            estimated = count is not None
+
+        if count is None:
+            count = queryset.count()
+
+        data = {"count": count, "estimated": estimated}
+
+        if group_by:
+            data["groups"] = list(
+                queryset.values(group_by)
+                .annotate(count=Count("pk"))
+                .order_by(group_by)
+            )
+
+        return Response(data)
+
+
+# ============================================================
+# CONDITIONAL GET
+# ============================================================
+
+@lru_cache(maxsize=None)
+def _timestamp_paths(serializer_class):
+    """
+    `updated_at` of the serializer's model plus that of every joined
+    relation it reads, so a rename of e.g. the patient changes the
+    validators of the medications that show its name.
+    """
+
+    model = serializer_class.Meta.model
+    select, _ = _serializer_related_paths(serializer_class)
+    paths = []
+
+    for path in ("",) + select:
+
+        current = model
+        for part in filter(None, path.split("__")):
+            current = current._meta.get_field(part).related_model
+
+        try:
+            current._meta.get_field("updated_at")
+        except FieldDoesNotExist:
+            continue
+
+        paths.append(f"{path}__updated_at" if path else "updated_at")
+
+    if "updated_at" not in paths:
+        return ()
+
+    return tuple(paths)
+
+
+def _strong_etag(*parts):
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(request, etag):
+
+    header = request.headers.get("If-None-Match")
+
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+    return etag in candidates
+
+
+def _not_modified_since(request, last_modified):
+
+    if last_modified is None or "If-None-Match" in request.headers:
+        return False
+
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified on list and detail GETs, answered with a
+    304 before anything is serialized.
+
+    List:   hash of the URL, the user, COUNT(*) and MAX(updated_at)
+            over the scoped queryset (one aggregate query).
+    Detail: hash of the pk and the row's updated_at values.
+
+    Lists only honour If-None-Match: deleting an older row leaves
+    MAX(updated_at) unchanged, so If-Modified-Since alone is unsafe.
+    """
+
+    def _finish(self, response, etag, last_modified):
+
+        response["ETag"] = etag
+
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Authorization",))
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+
+        paths = _timestamp_paths(self.get_serializer_class())
+
+        if not paths:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        state = queryset.aggregate(
+            rows=Count("pk"),
+            **{f"max_{index}": Max(path) for index, path in enumerate(paths)}
+        )
+
+        stamps = [state[f"max_{index}"] for index in range(len(paths))]
+        last_modified = max(filter(None, stamps), default=None)
+        etag = _strong_etag(
+            request.get_full_path(), request.user.pk, state["rows"], *stamps
+        )
+
+        if _etag_matches(request, etag):
+            return self._finish(HttpResponseNotModified(), etag, last_modified)
+
+        return self._finish(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+
+        paths = _timestamp_paths(self.get_serializer_class())
+
+        if not paths:
+            return super().retrieve(request, *args, **kwargs)
+
+        instance = self.get_object()
+        stamps = []
+
+        for path in paths:
+            value = instance
+            for part in path.split("__"):
+                value = getattr(value, part, None) if value is not None else None
+            stamps.append(value)
+
+        last_modified = max(filter(None, stamps), default=None)
+        etag = _strong_etag(instance._meta.label, instance.pk, *stamps)
+
+        if _etag_matches(request, etag) or _not_modified_since(request, last_modified):
+            return self._finish(HttpResponseNotModified(), etag, last_modified)
+
+        serializer = self.get_serializer(instance)
+
+        return self._finish(Response(serializer.data), etag, last_modified)
+
+
+# ============================================================
+# RESPONSE CACHE
+# ============================================================
+
+@lru_cache(maxsize=None)
+def _cached_models(serializer_class):
+    """The serializer's model and every model it joins or prefetches."""
+
+    model = serializer_class.Meta.model
+    select, prefetch = _serializer_related_paths(serializer_class)
+    models = {model}
+
+    for path in select + prefetch:
+        current = model
+        for part in path.split("__"):
+            current = current._meta.get_field(part).related_model
+            models.add(current)
+
+    return tuple(sorted(models, key=lambda item: item._meta.label_lower))
+
+
+# Headers replayed on a 304 served from the cache.
+_VALIDATOR_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Vary")
+
+
+class ResponseCacheMixin:
+    """
+    Serve rendered list/detail GETs from response_cache, keyed by
+    endpoint, scope (the client, or staff), URL and media type.
+    Entries are retired by the signals in signals.py.
+    """
+
+    _response_cache_key = None
+
+    def _cache_lookup(self, request, handler, *args, **kwargs):
+
+        if not settings.RESPONSE_CACHE_ENABLED or request.method != "GET":
+            return handler(request, *args, **kwargs)
+
+        user = request.user
+        scope = response_cache.STAFF_SCOPE if user.is_staff else str(_client_id_for_user(user))
+        tokens = response_cache.generations(_cached_models(self.get_serializer_class()), scope)
+        key = response_cache.entry_key(
+            self.basename,
+            scope,
+            (self.action, request.get_full_path(), request.accepted_media_type),
+            tokens,
+        )
+
+        entry = response_cache.load(key)
+
+        if entry is None:
+            response_cache.record(self.basename, "miss")
+            self._response_cache_key = key
+            return handler(request, *args, **kwargs)
+
+        response_cache.record(self.basename, "hit")
+        content, headers = entry
+        headers = dict(headers)
+
+        if "ETag" in headers and _etag_matches(request, headers["ETag"]):
+            response = HttpResponseNotModified()
+            headers = {name: headers[name] for name in _VALIDATOR_HEADERS if name in headers}
+        else:
+            response = HttpResponse(content)
+
+        for name, value in headers.items():
+            response[name] = value
+
+        response["X-Cache"] = "HIT"
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cache_lookup(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cache_lookup(request, super().retrieve, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if self._response_cache_key is None or response.status_code != 200:
+            return response
+
+        response.render()
+        response_cache.store(self._response_cache_key, (response.content, list(response.items())))
+        response["X-Cache"] = "MISS"
+
+        return response
+
+
+class ResponseCacheStatsView(APIView):
+    """Hit/miss counters of the response cache, per endpoint."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+
+        from .urls import router
+
+        endpoints = [
+            basename
+            for _, viewset, basename in router.registry
+            if issubclass(viewset, ResponseCacheMixin)
+        ]
+
+        return Response(response_cache.stats(endpoints))
+
+
+class MetricsView(APIView):
+    """Request timings of every worker, in the Prometheus text format."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+
+        body, content_type = metrics.exposition()
+
+        return HttpResponse(body, content_type=content_type)
+
+
 # ============================================================
 # CLIENT VIEWSET
 # ============================================================
 
-class ClientViewSet(ModelViewSet):
+class ClientViewSet(ResponseCacheMixin, CountModeMixin, ConditionalGetMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = ClientSerializer
     permission_classes = [IsAuthenticated]
+    ordering = ("id",)
 
     def get_queryset(self):
 
@@ -139,10 +728,10 @@ class ClientViewSet(ModelViewSet):
         if user.is_staff:
             return Client.objects.all()
 
-        client = _client_for_user(user)
+        client_id = _client_id_for_user(user)
 
-        if client:
-            return Client.objects.filter(id=client.id)
+        if client_id:
+            return Client.objects.filter(id=client_id)
 
         return Client.objects.none()
 
@@ -198,10 +787,12 @@ class ClientRegistrationView(APIView):
 # PATIENT (Doctor FULL, Client READ ONLY)
 # ============================================================
 
-class PatientViewSet(ModelViewSet):
+class PatientViewSet(ResponseCacheMixin, CountModeMixin, ConditionalGetMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = PatientSerializer
     permission_classes = [IsClientFullDoctorReadOnly]
+    ordering = ("-created_at", "-id")
+    count_group_fields = ("species", "gender")
 
     def get_queryset(self):
 
@@ -228,17 +819,78 @@ class PatientViewSet(ModelViewSet):
         client = _client_for_user(self.request.user)
         serializer.save(client=client)
 
-    
+    @action(detail=True, methods=["get"], url_path="vitals-series")
+    def vitals_series(self, request, pk=None):
+        """
+        GET /api/patients/{id}/vitals-series/?since=&until=&points=200&window=5
+
+        Weight (kg), temperature, respiration and heart rate as aligned
+        arrays, downsampled to `points` with rolling stats over `window`.
+        """
+
+        params = VitalsSeriesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        # Only the id is needed; get_object() would add the serializer's joins.
+        patient = get_object_or_404(self.get_queryset().only("id"), pk=pk)
+        self.check_object_permissions(request, patient)
+
+        return Response(timeseries.build(patient.id, **params.validated_data))
+
+
+# ============================================================
+# PATIENT PHOTOS (content-addressed, public by digest)
+# ============================================================
+
+class PatientPhotoView(APIView):
+    """
+    Streams a stored photo or one of its thumbnails.
+    The URL is the SHA-256 of the bytes, so responses never change.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, digest, size=None):
+
+        if size is not None and size not in photo_sizes():
+            raise Http404
+
+        try:
+            path = photo_path(digest, size)
+        except ValueError:
+            raise Http404
+
+        if not path.exists():
+            if size is None or not photo_path(digest).exists():
+                raise Http404
+
+            # Its thumbnail job has not run yet.
+            render_thumbnails(digest, sizes=[size])
+
+        etag = photo_etag(digest, size)
+
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        else:
+            content_type = "image/jpeg" if size else content_type_for(path)
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+
+        return response
 
 
 # ============================================================
 # APPOINTMENT (Client FULL, Doctor READ ONLY)
 # ============================================================
 
-class AppointmentViewSet(ModelViewSet):
+class AppointmentViewSet(ResponseCacheMixin, CountModeMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = AppointmentSerializer
     permission_classes = [IsClientFullDoctorReadOnly]
+    ordering = ("-date", "-id")
 
     def get_queryset(self):
 
@@ -252,18 +904,58 @@ class AppointmentViewSet(ModelViewSet):
     def perform_create(self, serializer):
 
         client = _client_for_user(self.request.user)
+        scheduling.assign_and_check(serializer.validated_data)
 
         serializer.save(client=client)
 
+    def perform_update(self, serializer):
+
+        scheduling.assign_and_check(serializer.validated_data, serializer.instance)
+
+        serializer.save()
+
+    @action(detail=False, methods=["get"])
+    def availability(self, request):
+        """
+        GET /api/appointments/availability/?start=YYYY-MM-DD&end=YYYY-MM-DD
+            &duration=30&veterinarian=1,2
+
+        Free start times in clinic hours with the vets free at each.
+        """
+
+        params = AvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        vets, slots = scheduling.free_slots(
+            query["start"],
+            query["end"],
+            query["duration"],
+            vet_ids=query.get("veterinarian"),
+        )
+
+        return Response({
+            "start": query["start"],
+            "end": query["end"],
+            "duration": query["duration"],
+            "veterinarians": {vet.id: scheduling.display_name(vet) for vet in vets},
+            "slots": [
+                {"start": start, "end": end, "veterinarians": free}
+                for start, end, free in slots
+            ],
+        })
+
 
 # ============================================================
 # RECEIPT (Client FULL, Doctor READ ONLY)
 # ============================================================
 
-class ReceiptViewSet(ModelViewSet):
+class ReceiptViewSet(ResponseCacheMixin, CountModeMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = ReceiptSerializer
     permission_classes = [IsClientFullDoctorReadOnly]
+    ordering = ("-date", "-id")
+    count_group_fields = ("status",)
 
     def get_queryset(self):
 
@@ -285,10 +977,12 @@ class ReceiptViewSet(ModelViewSet):
 # MEDICAL RECORD VIEWSETS (Doctor FULL, Client READ ONLY)
 # ============================================================
 
-class VisitViewSet(ModelViewSet):
+class VisitViewSet(ResponseCacheMixin, CountModeMixin, ConditionalGetMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = VisitSerializer
     permission_classes = [IsDoctorFullClientReadOnly]
+    ordering = ("-visit_date", "-id")
+    count_group_fields = ("visit_status", "location_status")
 
     def get_queryset(self):
 
@@ -298,14 +992,16 @@ class VisitViewSet(ModelViewSet):
             return Visit.objects.all()
 
         return Visit.objects.filter(
-            patient__client=_client_for_user(user)
+            patient__client_id=_client_id_for_user(user)
         )
 
 
-class AllergyAlertViewSet(ModelViewSet):
+class AllergyAlertViewSet(ResponseCacheMixin, CountModeMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = AllergyAlertSerializer
     permission_classes = [IsDoctorFullClientReadOnly]
+    ordering = ("-created_at", "-id")
+    count_group_fields = ("severity_level",)
 
     def get_queryset(self):
 
@@ -315,14 +1011,16 @@ class AllergyAlertViewSet(ModelViewSet):
             return AllergyAlert.objects.all()
 
         return AllergyAlert.objects.filter(
-            patient__client=_client_for_user(user)
+            patient__client_id=_client_id_for_user(user)
         )
 
 
-class VitalSignsViewSet(ModelViewSet):
+class VitalSignsViewSet(BulkCreateMixin, ResponseCacheMixin, CountModeMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = VitalSignsSerializer
     permission_classes = [IsDoctorFullClientReadOnly]
+    ordering = ("-recorded_at", "-id")
+    bulk_related_fields = ("visit",)
 
     def get_queryset(self):
 
@@ -332,14 +1030,15 @@ class VitalSignsViewSet(ModelViewSet):
             return VitalSigns.objects.all()
 
         return VitalSigns.objects.filter(
-            visit__patient__client=_client_for_user(user)
+            visit__patient__client_id=_client_id_for_user(user)
         )
 
 
-class CommunicationViewSet(ModelViewSet):
+class CommunicationViewSet(ResponseCacheMixin, CountModeMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = CommunicationSerializer
     permission_classes = [IsDoctorFullClientReadOnly]
+    ordering = ("-date", "-id")
 
     def get_queryset(self):
 
@@ -348,15 +1047,15 @@ class CommunicationViewSet(ModelViewSet):
         if user.is_staff:
             return ClientCommunicationNote.objects.all()
 
-        return ClientCommunicationNote.objects.filter(
-            patient__client=_client_for_user(user)
-        )
+        return ClientCommunicationNote.objects.filter(**_client_filter_kwargs(user))
 
 
-class ClientNoteViewSet(ModelViewSet):
+class ClientNoteViewSet(BulkCreateMixin, ResponseCacheMixin, CountModeMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = ClientNoteSerializer
     permission_classes = [IsDoctorFullClientReadOnly]
+    ordering = ("-created_at", "-id")
+    bulk_related_fields = ("visit",)
 
     def get_queryset(self):
 
@@ -366,14 +1065,16 @@ class ClientNoteViewSet(ModelViewSet):
             return ClientNote.objects.all()
 
         return ClientNote.objects.filter(
-            visit__patient__client=_client_for_user(user)
+            visit__patient__client_id=_client_id_for_user(user)
         )
 
 
-class MedicationViewSet(ModelViewSet):
+class MedicationViewSet(BulkCreateMixin, ResponseCacheMixin, CountModeMixin, ConditionalGetMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = MedicationSerializer
     permission_classes = [IsDoctorFullClientReadOnly]
+    ordering = ("-id",)
+    bulk_related_fields = ("visit",)
 
     def get_queryset(self):
 
@@ -383,14 +1084,16 @@ class MedicationViewSet(ModelViewSet):
             return Medication.objects.all()
 
         return Medication.objects.filter(
-            visit__patient__client=_client_for_user(user)
+            visit__patient__client_id=_client_id_for_user(user)
         )
 
 
-class DocumentViewSet(ModelViewSet):
+class DocumentViewSet(ResponseCacheMixin, CountModeMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = DocumentSerializer
     permission_classes = [IsDoctorFullClientReadOnly]
+    ordering = ("-issued_date", "-id")
+    count_group_fields = ("document_type",)
 
     def get_queryset(self):
 
@@ -400,14 +1103,157 @@ class DocumentViewSet(ModelViewSet):
             return Document.objects.all()
 
         return Document.objects.filter(
-            patient__client=_client_for_user(user)
+            patient__client_id=_client_id_for_user(user)
+        )
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """
+        GET /api/documents/{id}/download/
+
+        The file itself, with Range and conditional request support,
+        or an X-Accel-Redirect / X-Sendfile header when offloaded.
+        """
+
+        document = get_object_or_404(
+            self.get_queryset().only("id", "file", "content_hash", "content_type", "filename"),
+            pk=pk,
         )
+        self.check_object_permissions(request, document)
+
+        try:
+            return documents.serve(request, document)
+        except (FileNotFoundError, ValueError):
+            # ValueError: the row has no file attached.
+            raise Http404
+
+
+# ============================================================
+# RESUMABLE DOCUMENT UPLOADS (Doctor only)
+# ============================================================
+
+def _upload_headers(response, upload, offset):
+
+    response["Upload-Offset"] = str(offset)
+    response["Upload-Length"] = str(upload.size)
+    patch_cache_control(response, no_store=True)
+
+    return response
 
 
-class TreatmentViewSet(ModelViewSet):
+class DocumentUploadListView(APIView):
+    """
+    POST /api/document-uploads/ {patient, filename, size, ...}
+
+    Starts an upload; send the bytes with PATCH to the returned
+    upload_url.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+
+        serializer = DocumentUploadSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        # The request user may be built from token claims, not a model row.
+        upload = serializer.save(created_by_id=request.user.pk)
+
+        response = Response(serializer.data, status=status.HTTP_201_CREATED)
+        response["Location"] = serializer.data["upload_url"]
+
+        return _upload_headers(response, upload, 0)
+
+
+class DocumentUploadDetailView(APIView):
+    """
+    GET/HEAD  -> Upload-Offset: bytes received so far (resume from here)
+    PATCH     -> raw bytes starting at the Upload-Offset request header;
+                 the request that completes the file returns the Document
+    DELETE    -> abandon the upload
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def _upload(self, upload_id):
+        return get_object_or_404(DocumentUpload.objects.all(), pk=upload_id)
+
+    def get(self, request, upload_id):
+
+        upload = self._upload(upload_id)
+        serializer = DocumentUploadSerializer(upload, context={"request": request})
+
+        return _upload_headers(Response(serializer.data), upload, serializer.data["offset"])
+
+    def patch(self, request, upload_id):
+
+        upload = self._upload(upload_id)
+
+        try:
+            offset = int(request.headers["Upload-Offset"])
+        except (KeyError, ValueError):
+            return Response({"detail": "Send the Upload-Offset header."}, status=400)
+
+        # A chunked body has no length to check against the upload; it
+        # would be written as nothing and look like a successful PATCH.
+        if not request.META.get("CONTENT_LENGTH"):
+            return Response({"detail": "Send the Content-Length header."}, status=411)
+
+        try:
+            length = int(request.META["CONTENT_LENGTH"])
+        except ValueError:
+            return Response({"detail": "Content-Length must be a number."}, status=400)
+
+        remaining = upload.size - offset
+
+        if remaining < 0 or length > remaining:
+            return Response({"detail": f"The upload is {upload.size} bytes long."}, status=413)
+
+        # Read the raw body; touching request.data would parse it.
+        try:
+            offset, digest = documents.append_chunk(upload.pk, offset, request.stream, length)
+        except documents.UploadConflict as exc:
+            response = Response({"detail": str(exc), "offset": exc.offset}, status=409)
+            return _upload_headers(response, upload, exc.offset)
+
+        if offset < upload.size:
+            return _upload_headers(Response(status=204), upload, offset)
+
+        with transaction.atomic():
+            # Lock the row so a concurrent retry cannot finish it twice.
+            if not DocumentUpload.objects.select_for_update().filter(pk=upload.pk).exists():
+                raise Http404
+
+            name, content_hash = documents.finish_upload(upload.pk, digest)
+            document = Document.objects.create(
+                patient_id=upload.patient_id,
+                document_type=upload.document_type,
+                issued_date=upload.issued_date,
+                file=name,
+                content_hash=content_hash,
+                size=upload.size,
+                content_type=upload.content_type,
+                filename=upload.filename,
+            )
+            upload.delete()
+
+        data = DocumentSerializer(document, context={"request": request}).data
+
+        return _upload_headers(Response(data, status=status.HTTP_201_CREATED), upload, offset)
+
+    def delete(self, request, upload_id):
+
+        upload = self._upload(upload_id)
+        documents.discard_upload(upload.pk)
+        upload.delete()
+
+        return Response(status=204)
+
+
+class TreatmentViewSet(ResponseCacheMixin, CountModeMixin, ConditionalGetMixin, RelatedFieldsMixin, AtomicWritesMixin, ModelViewSet):
 
     serializer_class = TreatmentSerializer
     permission_classes = [IsDoctorFullClientReadOnly]
+    ordering = ("-id",)
 
     def get_queryset(self):
 
@@ -417,7 +1263,7 @@ class TreatmentViewSet(ModelViewSet):
             return TreatmentPlan.objects.all()
 
         return TreatmentPlan.objects.filter(
-            visit__patient__client=_client_for_user(user)
+            visit__patient__client_id=_client_id_for_user(user)
         )
 
 
@@ -434,84 +1280,381 @@ class DashboardAPIView(APIView):
         user = request.user
 
         if user.is_staff:
+            counter = get_counter()
+            dashboard_for = "doctor"
+        else:
+            client_id = _client_id_for_user(user)
 
-            patients_count = Patient.objects.count()
+            if not client_id:
+                return Response({"detail": "Client not found"}, status=404)
 
-            appointments_count = Appointment.objects.count()
+            counter = get_counter(client_id)
+            dashboard_for = "client"
 
-            receipts = Receipt.objects.all()
+        return Response({
+            "dashboard_for": dashboard_for,
+            "patients_count": counter.patients_count,
+            "appointments_count": counter.appointments_count,
+            "receipts_count": counter.receipts_count,
+            "receipts_total": counter.receipts_total,
+        })
 
-            return Response({
-                "dashboard_for": "doctor",
-                "patients_count": patients_count,
-                "appointments_count": appointments_count,
-                "receipts_count": receipts.count(),
-                "receipts_total": receipts.aggregate(
-                    total=Sum("amount")
-                )["total"] or 0
-            })
 
+# ============================================================
+# REPORTS
+# ============================================================
 
-        client = _client_for_user(user)
+class RevenueReportView(APIView):
+    """
+    GET /api/reports/revenue/?since=YYYY-MM&until=YYYY-MM&client=&by=client
 
-        if not client:
-            return Response({"detail": "Client not found"}, status=404)
+    Receipt count and amount per month and status, with the same month
+    a year earlier. Doctors see the whole clinic, one client (?client=)
+    or the top clients (?by=client); clients see their own receipts.
+    """
 
-        receipts = Receipt.objects.filter(client=client)
+    permission_classes = [IsAuthenticated]
 
-        return Response({
+    def get(self, request):
+
+        params = RevenueReportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
 
-            "dashboard_for": "client",
+        user = request.user
+        client_id = query.get("client")
+        by_client = query["by"] == "client"
 
-            "patients_count":
-                Patient.objects.filter(client=client).count(),
+        if not user.is_staff:
+            if by_client:
+                return Response({"detail": "Only staff can break revenue down by client."}, status=403)
 
-            "appointments_count":
-                Appointment.objects.filter(client=client).count(),
+            client_id = _client_id_for_user(user)
 
-            "receipts_count": receipts.count(),
+            if not client_id:
+                return Response({"detail": "Client not found"}, status=404)
 
-            "receipts_total":
-                receipts.aggregate(total=Sum("amount"))["total"] or 0
-        })
+        elif by_client and client_id:
+            return Response({"detail": "by=client reports the whole clinic; drop ?client=."}, status=400)
+
+        return Response(revenue.report(
+            query["since"],
+            query["until"],
+            client_id=client_id,
+            by_client=by_client,
+            limit=query["limit"],
+        ))
 
 
 # ============================================================
 # CUSTOMER OVERVIEW
 # ============================================================
 
+def _overview_prefetches():
+    """
+    One query per relation, whatever the number of patients.
+    """
+
+    return [
+        Prefetch("allergies", queryset=AllergyAlert.objects.order_by("-created_at", "-id")),
+        Prefetch(
+            "visits",
+            queryset=Visit.objects.select_related("veterinarian").order_by("-visit_date", "-id"),
+        ),
+        Prefetch("visits__vitals", queryset=VitalSigns.objects.order_by("-recorded_at", "-id")),
+        Prefetch("visits__medical_notes", queryset=ClientNote.objects.order_by("-created_at", "-id")),
+        Prefetch("visits__medications", queryset=Medication.objects.order_by("-id")),
+        Prefetch("visits__treatment_plans", queryset=TreatmentPlan.objects.order_by("-id")),
+        Prefetch("documents", queryset=Document.objects.order_by("-issued_date", "-id")),
+    ]
+
+
+def _overview_scope(user, params):
+    """
+    Resolve ?client= / ?patient= for an overview request into
+    (client_id, patient filter kwargs, error). Shared with async_views.
+    """
+
+    patient_id = params.get("patient")
+
+    if user.is_staff:
+        client_id = params.get("client")
+
+        if not client_id and not patient_id:
+            return None, None, (status.HTTP_400_BAD_REQUEST, "Pass ?client= or ?patient= to select an overview.")
+    else:
+        client_id = _client_id_for_user(user)
+
+        if not client_id:
+            return None, None, (status.HTTP_404_NOT_FOUND, "Client not found")
+
+    try:
+        client_id = int(client_id) if client_id else None
+        patient_id = int(patient_id) if patient_id else None
+    except (TypeError, ValueError):
+        return None, None, (status.HTTP_400_BAD_REQUEST, "client and patient must be integers.")
+
+    patient_filter = {}
+
+    if client_id:
+        patient_filter["client_id"] = client_id
+
+    if patient_id:
+        patient_filter["pk"] = patient_id
+
+    return client_id, patient_filter, None
+
+
 class OverviewCustomerAPIView(APIView):
+    """
+    A client's patients with allergies, visits, vitals, notes,
+    medications, documents and treatments nested per patient.
+    ?patient=<id> narrows to one patient; doctors pass ?client=<id>.
+    """
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
 
-        client = _client_for_user(request.user)
+        client_id, patient_filter, error = _overview_scope(request.user, request.query_params)
 
-        patients = Patient.objects.filter(client=client)
+        if error:
+            return Response({"detail": error[1]}, status=error[0])
+
+        patients = (
+            Patient.objects.filter(**patient_filter)
+            .select_related("summary")
+            .order_by("name", "id")
+            .prefetch_related(*_overview_prefetches())
+        )
 
         return Response({
+            "client": client_id,
+            "patients": PatientOverviewSerializer(
+                patients, many=True, context={"request": request}
+            ).data,
+        })
 
-            "patients": PatientSerializer(patients, many=True).data,
 
-            "allergies":
-                AllergySerializer(
-                    AllergyAlert.objects.filter(patient__in=patients),
-                    many=True
-                ).data,
+# ============================================================
+# EXPORTS (streamed CSV / NDJSON)
+# ============================================================
 
-            "visits":
-                VisitSerializer(
-                    Visit.objects.filter(patient__in=patients),
-                    many=True
-                ).data,
+class ExportView(APIView):
+    """
+    GET /api/exports/<visits|receipts|medications>/
+        ?fmt=csv|ndjson&since=YYYY-MM-DD&until=YYYY-MM-DD&async=true
 
-            "medications":
-                MedicationSerializer(
-                    Medication.objects.filter(patient__in=patients),
-                    many=True
-                ).data
+    Clients only ever receive their own rows; doctors may narrow
+    to one client with ?client=<id>. With ?async=true the file is
+    written by a background job and the response is that job (202).
+    """
 
-        })
-    
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, dataset):
+
+        spec = EXPORTS.get(dataset)
+
+        if spec is None:
+            raise Http404
+
+        fmt = request.query_params.get("fmt", "csv")
+
+        if fmt not in FORMATS:
+            return Response(
+                {"detail": f"fmt must be one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        bounds = {}
+
+        for name in ("since", "until"):
+            raw = request.query_params.get(name)
+
+            try:
+                bounds[name] = parse_date(raw) if raw else None
+            except ValueError:  # well formed but not a day, e.g. 2024-02-30
+                bounds[name] = None
+
+            if raw and bounds[name] is None:
+                return Response(
+                    {"detail": f"{name} must be a date (YYYY-MM-DD)."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        scope = _client_filter_kwargs(request.user)
+        client_param = request.query_params.get("client")
+
+        if request.user.is_staff and client_param:
+            if not client_param.isdigit():
+                return Response({"detail": "client must be an id."}, status=status.HTTP_400_BAD_REQUEST)
+            scope = {"client_id": int(client_param)}
+
+        if request.query_params.get("async", "").lower() == "true":
+            job = jobs.enqueue(
+                "exports.write",
+                {
+                    "dataset": dataset,
+                    "fmt": fmt,
+                    "scope": scope,
+                    "since": bounds["since"] and bounds["since"].isoformat(),
+                    "until": bounds["until"] and bounds["until"].isoformat(),
+                },
+                user_id=request.user.pk,
+            )
+            data = JobSerializer(job, context={"request": request}).data
+            response = Response(data, status=status.HTTP_202_ACCEPTED)
+            response["Location"] = request.build_absolute_uri(reverse("jobs-detail", args=[job.pk]))
+            return response
+
+        response = StreamingHttpResponse(
+            stream_export(spec, fmt, scope, **bounds),
+            content_type=FORMATS[fmt],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{dataset}.{fmt}"'
+        patch_cache_control(response, private=True, no_store=True)
+
+        return response
+
+
+# ============================================================
+# BACKGROUND JOBS
+# ============================================================
+
+class JobViewSet(CreateModelMixin, ReadOnlyModelViewSet):
+    """
+    Status of background jobs. Users see the jobs they queued, staff
+    see all; staff may also queue maintenance jobs with POST.
+    """
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    ordering = ("-created_at", "-id")
+
+    def get_queryset(self):
+
+        user = self.request.user
+
+        if user.is_staff:
+            return Job.objects.all()
+
+        return Job.objects.filter(created_by_id=user.pk)
+
+    def create(self, request, *args, **kwargs):
+
+        if not request.user.is_staff:
+            return Response({"detail": "Only staff can queue jobs."}, status=403)
+
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        job = jobs.enqueue(
+            serializer.validated_data["kind"],
+            priority=serializer.validated_data.get("priority", 0),
+            user_id=self.request.user.pk,
+        )
+        serializer.instance = job
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """GET /api/jobs/{id}/download/ -> the file a finished job wrote."""
+
+        job = self.get_object()
+        result = job.result if isinstance(job.result, dict) else {}
+        name = result.get("file")
+
+        if job.status != Job.SUCCEEDED or not name:
+            return Response({"detail": "This job has no file to download."}, status=404)
+
+        path = Path(settings.JOBS_OUTPUT_ROOT) / Path(name).name
+
+        if not path.exists():
+            raise Http404
+
+        response = FileResponse(open(path, "rb"), as_attachment=True, filename=result.get("filename") or path.name)
+        patch_cache_control(response, private=True, no_store=True)
+
+        return response
+
+
+# ============================================================
+# REMINDERS
+# ============================================================
+
+class ReminderViewSet(ReadOnlyModelViewSet):
+    """
+    Follow-up and appointment reminders, newest due first; filter with
+    ?status= and ?kind=. Clients see the reminders sent to them. Created
+    and sent by `manage.py send_reminders` (see reminders.py).
+    """
+
+    serializer_class = ReminderSerializer
+    permission_classes = [IsAuthenticated]
+    ordering = ("-due_at", "-id")
+
+    def get_queryset(self):
+
+        reminders = Reminder.objects.filter(**_client_filter_kwargs(self.request.user))
+
+        for field in ("status", "kind"):
+            value = self.request.query_params.get(field)
+            if value:
+                reminders = reminders.filter(**{field: value})
+
+        return reminders.select_related("patient")
+
+
+# ============================================================
+# SEARCH
+# ============================================================
+
+class SearchView(APIView):
+    """
+    GET /api/search/?q=<text>&kind=patient,note&limit=20
+
+    Ranked full-text (and, on Postgres, trigram) matches over clients,
+    patients, medical notes, visits and treatment plans. Clients only
+    see their own records; doctors may narrow with ?client=<id>.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+
+        text = (request.query_params.get("q") or "").strip()
+
+        if len(text) < 2:
+            return Response(
+                {"detail": "q must be at least 2 characters."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        kinds = [kind for kind in request.query_params.get("kind", "").split(",") if kind]
+        valid_kinds = {kind for kind, _ in SearchEntry.KIND_CHOICES}
+
+        if set(kinds) - valid_kinds:
+            return Response(
+                {"detail": f"kind must be among: {', '.join(sorted(valid_kinds))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        limit = request.query_params.get("limit", "20")
+
+        if not limit.isdigit():
+            return Response({"detail": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+
+        if user.is_staff:
+            client_param = request.query_params.get("client")
+            client_id = int(client_param) if client_param and client_param.isdigit() else None
+        else:
+            client_id = _client_id_for_user(user)
+
+            if not client_id:
+                return Response({"query": text, "results": []})
+
+        results = search.search(text, client_id=client_id, kinds=kinds, limit=int(limit))
 
+        return Response({"query": text, "results": results})
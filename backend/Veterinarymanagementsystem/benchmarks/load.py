@@ -0,0 +1,475 @@
+# benchmarks/load.py
+"""
+Replays fixed traffic mixes against the API and reports throughput,
+p50/p95/p99 latency and per-endpoint query counts as JSON.
+
+    python benchmarks/load.py                          # Django test client
+    python benchmarks/load.py --target server          # local gunicorn
+    python benchmarks/load.py --save-baseline          # update baselines/
+    python benchmarks/load.py --compare                # diff against baselines/
+
+No external services: the data is a throwaway SQLite database filled
+by seed_clinic with a fixed seed and end date, and every mix draws its
+requests from a seeded RNG, so two runs send the same requests.
+Query counts come from the Server-Timing header set by
+MetricsMiddleware, so they are measured the same way in both targets.
+
+Query counts are deterministic and make a good regression signal;
+latencies depend on the machine, so compare them on the same host.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+DATASET = {"clients": 300, "years": 2, "seed": 19, "end_date": "2026-06-30"}
+PASSWORD = "clinic-pass-123"
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+# ============================================================
+# TRAFFIC MIXES
+# ============================================================
+# A mix is a weighted list of (endpoint label, builder). A builder
+# takes the world and an RNG and returns (method, path, body, token).
+
+def _client_user(world, rng):
+    return rng.choice(world["clients"])
+
+
+def _doctor(world, rng):
+    return rng.choice(world["doctors"])
+
+
+def _get(path_for, who):
+    def build(world, rng):
+        user = who(world, rng)
+        return "GET", path_for(user, rng), None, user["token"]
+    return build
+
+
+def _vitals(world, rng, count):
+    return [
+        {
+            "visit": rng.choice(world["visit_ids"]),
+            "temperature": f"{rng.uniform(37.8, 39.6):.1f}",
+            "heart_rate": rng.randint(60, 200),
+            "respiration": rng.randint(10, 40),
+        }
+        for _ in range(count)
+    ]
+
+
+def _post_vitals(count):
+    def build(world, rng):
+        body = _vitals(world, rng, count)
+        return "POST", "/api/vitals/", body if count > 1 else body[0], _doctor(world, rng)["token"]
+    return build
+
+
+def _login(path, who):
+    def build(world, rng):
+        user = who(world, rng)
+        return "POST", path, {"username": user["username"], "password": PASSWORD}, None
+    return build
+
+
+MIXES = {
+    "client-portal": [
+        ("GET /api/dashboard/", 15, _get(lambda user, rng: "/api/dashboard/", _client_user)),
+        ("GET /api/overview_customer/", 15, _get(lambda user, rng: "/api/overview_customer/", _client_user)),
+        ("GET /api/patients/", 15, _get(lambda user, rng: "/api/patients/", _client_user)),
+        ("GET /api/patients/{id}/", 15, _get(
+            lambda user, rng: f"/api/patients/{rng.choice(user['patient_ids'])}/", _client_user,
+        )),
+        ("GET /api/visits/", 15, _get(lambda user, rng: "/api/visits/", _client_user)),
+        ("GET /api/appointments/", 10, _get(lambda user, rng: "/api/appointments/", _client_user)),
+        ("GET /api/receipts/", 10, _get(lambda user, rng: "/api/receipts/", _client_user)),
+        ("GET /api/treatments/", 5, _get(lambda user, rng: "/api/treatments/", _client_user)),
+    ],
+    "doctor-dashboard": [
+        ("GET /api/dashboard/", 40, _get(lambda user, rng: "/api/dashboard/", _doctor)),
+        ("GET /api/appointments/", 20, _get(lambda user, rng: "/api/appointments/?page_size=20", _doctor)),
+        ("GET /api/visits/", 15, _get(lambda user, rng: "/api/visits/?page_size=20", _doctor)),
+        ("GET /api/overview_customer/?client=", 15, _get(
+            lambda user, rng: f"/api/overview_customer/?client={rng.choice(user['client_ids'])}", _doctor,
+        )),
+        ("GET /api/search/", 10, _get(
+            lambda user, rng: f"/api/search/?q={rng.choice(('bel', 'max', 'otitis', 'luna', 'dental'))}", _doctor,
+        )),
+    ],
+    "login-burst": [
+        ("POST /api/login/", 80, _login("/api/login/", _client_user)),
+        ("POST /api/doctor/login/", 20, _login("/api/doctor/login/", _doctor)),
+    ],
+    "vitals-ingest": [
+        ("POST /api/vitals/", 70, _post_vitals(1)),
+        ("POST /api/vitals/ (bulk 20)", 30, _post_vitals(20)),
+    ],
+}
+
+
+# Logins hash a password on purpose (~0.5s each), so that mix runs a
+# quarter of the requested count.
+MIX_SHARE = {"login-burst": 0.25}
+
+
+def request_plan(mix, count, seed):
+    """The same `count` requests, in the same order, for a given seed."""
+
+    rng = random.Random(f"{mix}:{seed}")
+    count = max(1, round(count * MIX_SHARE.get(mix, 1)))
+    entries = MIXES[mix]
+    labels = [label for label, _, _ in entries]
+    weights = [weight for _, weight, _ in entries]
+    builders = {label: build for label, _, build in entries}
+
+    return [(label, builders[label], random.Random(rng.random())) for label in rng.choices(labels, weights, k=count)]
+
+
+# ============================================================
+# WORLD
+# ============================================================
+
+def build_world(sample_clients=50):
+    """Seed the database and pick the users and ids the mixes use."""
+
+    from django.core.management import call_command
+
+    from Vetmanagementsystem.models import Client, CustomUser, Visit
+    from Vetmanagementsystem.serializers import ClaimsTokenObtainPairSerializer
+
+    call_command("migrate", verbosity=0)
+    call_command(
+        "seed_clinic",
+        clients=DATASET["clients"],
+        years=DATASET["years"],
+        seed=DATASET["seed"],
+        end_date=DATASET["end_date"],
+        password=PASSWORD,
+        stdout=open(os.devnull, "w"),
+    )
+
+    def token(user):
+        return str(ClaimsTokenObtainPairSerializer.get_token(user).access_token)
+
+    clients = []
+
+    for client in Client.objects.select_related("user").prefetch_related("patients").order_by("id")[:sample_clients]:
+        patient_ids = [patient.id for patient in client.patients.all()]
+        clients.append({
+            "username": client.user.username,
+            "token": token(client.user),
+            "patient_ids": patient_ids,
+        })
+
+    client_ids = list(Client.objects.order_by("id").values_list("id", flat=True)[:sample_clients])
+    doctors = [
+        {"username": user.username, "token": token(user), "client_ids": client_ids}
+        for user in CustomUser.objects.filter(is_staff=True).order_by("id")
+    ]
+
+    return {
+        "clients": clients,
+        "doctors": doctors,
+        "visit_ids": list(Visit.objects.order_by("id").values_list("id", flat=True)[:2000]),
+    }
+
+
+# ============================================================
+# TARGETS
+# ============================================================
+
+def _queries(server_timing):
+    match = QUERIES_RE.search(server_timing or "")
+    return int(match.group(1)) if match else None
+
+
+class InProcessTarget:
+    """Django test client in this process; requests run one at a time."""
+
+    concurrency = 1
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+
+    def send(self, method, path, body, token):
+
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        started = time.perf_counter()
+        response = self.client.generic(
+            method, path,
+            data=json.dumps(body) if body is not None else "",
+            content_type="application/json",
+            headers=headers,
+        )
+        elapsed = time.perf_counter() - started
+
+        return response.status_code, elapsed, _queries(response.get("Server-Timing"))
+
+    def close(self):
+        pass
+
+
+class ServerTarget:
+    """gunicorn started from gunicorn.conf.py, driven by keep-alive threads."""
+
+    def __init__(self, concurrency, workers, mode):
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+
+        self.concurrency = concurrency
+        self.local = threading.local()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+            cwd=BASE_DIR,
+            env={**os.environ, "SERVER_MODE": mode, "WEB_CONCURRENCY": str(workers), "PORT": str(self.port)},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        deadline = time.monotonic() + 30
+
+        while True:
+            if self.process.poll() is not None:
+                raise RuntimeError("gunicorn exited during startup")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("gunicorn did not start in time")
+                time.sleep(0.2)
+
+    def _connection(self):
+
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+
+        return self.local.connection
+
+    def send(self, method, path, body, token):
+
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        payload = json.dumps(body).encode() if body is not None else None
+        started = time.perf_counter()
+
+        try:
+            connection = self._connection()
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.local.connection = None
+            return 599, time.perf_counter() - started, None
+
+        return response.status, time.perf_counter() - started, _queries(response.getheader("Server-Timing"))
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+# ============================================================
+# RUN
+# ============================================================
+
+def _percentiles(samples):
+
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 2)
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99)}
+
+
+def run_mix(target, world, mix, count, seed):
+
+    plan = request_plan(mix, count, seed)
+    results = [None] * len(plan)
+
+    def worker(offset):
+        for index in range(offset, len(plan), target.concurrency):
+            label, build, rng = plan[index]
+            method, path, body, token = build(world, rng)
+            results[index] = (label, *target.send(method, path, body, token))
+
+    started = time.perf_counter()
+
+    if target.concurrency == 1:
+        worker(0)
+    else:
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(target.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    wall = time.perf_counter() - started
+    endpoints = {}
+
+    for label, status, elapsed, queries in results:
+        row = endpoints.setdefault(label, {"latencies": [], "queries": [], "errors": 0})
+        row["latencies"].append(elapsed)
+        if queries is not None:
+            row["queries"].append(queries)
+        if status >= 400:
+            row["errors"] += 1
+
+    return {
+        "requests": len(results),
+        "errors": sum(row["errors"] for row in endpoints.values()),
+        "throughput_rps": round(len(results) / wall, 1),
+        "latency_ms": _percentiles([elapsed for _, _, elapsed, _ in results]),
+        "endpoints": {
+            label: {
+                "requests": len(row["latencies"]),
+                "errors": row["errors"],
+                "latency_ms": _percentiles(row["latencies"]),
+                "queries": {
+                    "median": statistics.median(row["queries"]) if row["queries"] else None,
+                    "max": max(row["queries"]) if row["queries"] else None,
+                },
+            }
+            for label, row in sorted(endpoints.items())
+        },
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Lines describing changes against `baseline`, and whether any is a regression."""
+
+    lines = []
+    regressed = False
+
+    for mix, current in report["mixes"].items():
+        previous = baseline.get("mixes", {}).get(mix)
+
+        if previous is None:
+            lines.append(f"{mix}: no baseline")
+            continue
+
+        for label, row in current["endpoints"].items():
+            before = previous["endpoints"].get(label)
+
+            if before is None:
+                lines.append(f"{mix} {label}: new endpoint")
+                continue
+
+            # Medians: an occasional extra query (the token denylist
+            # refresh) must not read as a regression.
+            now_q, was_q = row["queries"]["median"], before["queries"]["median"]
+            if now_q is not None and was_q is not None and now_q != was_q:
+                regressed = regressed or now_q > was_q
+                lines.append(f"{mix} {label}: median queries {was_q} -> {now_q}")
+
+            now_p95, was_p95 = row["latency_ms"]["p95"], before["latency_ms"]["p95"]
+            if was_p95 and abs(now_p95 - was_p95) / was_p95 > tolerance:
+                lines.append(f"{mix} {label}: p95 {was_p95}ms -> {now_p95}ms")
+
+            if row["errors"] > before["errors"]:
+                regressed = True
+                lines.append(f"{mix} {label}: errors {before['errors']} -> {row['errors']}")
+
+    return lines, regressed
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Replay traffic mixes against the API.")
+    parser.add_argument("--target", choices=("inprocess", "server"), default="inprocess")
+    parser.add_argument("--mixes", nargs="+", choices=sorted(MIXES), default=sorted(MIXES))
+    parser.add_argument("--requests", type=int, default=400, help="Requests per mix.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the request plan.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads (server target).")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers (server target).")
+    parser.add_argument("--server-mode", choices=("wsgi", "asgi"), default="wsgi")
+    parser.add_argument("--save-baseline", action="store_true", help="Write baselines/<target>.json.")
+    parser.add_argument("--compare", action="store_true", help="Diff against baselines/<target>.json.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="p95 change reported by --compare.")
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    os.environ.update({
+        "DJANGO_SETTINGS_MODULE": "Veterinarymanagementsystem.settings",
+        "SQLITE_PATH": str(Path(scratch.name) / "load.sqlite3"),
+        "DEBUG": "False",
+        "RESPONSE_CACHE_DIR": str(Path(scratch.name) / "responses"),
+        "PROMETHEUS_MULTIPROC_DIR": str(Path(scratch.name) / "metrics"),
+    })
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    sys.path.insert(0, str(BASE_DIR))
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connections
+
+    settings.ALLOWED_HOSTS = ["*"]
+    world = build_world()
+    connections.close_all()
+
+    if args.target == "server":
+        target = ServerTarget(args.concurrency, args.workers, args.server_mode)
+    else:
+        target = InProcessTarget()
+
+    try:
+        report = {
+            "target": args.target,
+            "server_mode": args.server_mode if args.target == "server" else None,
+            "concurrency": target.concurrency,
+            "requests_per_mix": args.requests,
+            "seed": args.seed,
+            "dataset": DATASET,
+            "mixes": {mix: run_mix(target, world, mix, args.requests, args.seed) for mix in args.mixes},
+        }
+    finally:
+        target.close()
+        scratch.cleanup()
+
+    baseline_path = BASELINE_DIR / f"{args.target}.json"
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    if args.compare:
+        if not baseline_path.exists():
+            sys.exit(f"No baseline at {baseline_path}; run with --save-baseline first.")
+
+        lines, regressed = compare(report, json.loads(baseline_path.read_text()), args.tolerance)
+        sys.stderr.write("\n".join(lines or ["No changes against the baseline."]) + "\n")
+
+        if regressed:
+            sys.exit(1)
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        sys.stderr.write(f"Wrote {baseline_path}\n")
+
+
+if __name__ == "__main__":
+    main()
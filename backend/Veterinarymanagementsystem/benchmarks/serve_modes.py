@@ -0,0 +1,216 @@
+# benchmarks/serve_modes.py
+"""
+Throughput and latency of the dashboard and customer overview under
+the WSGI and ASGI serving profiles, at the same worker count.
+
+    python benchmarks/serve_modes.py --workers 2 --concurrency 16 --seconds 10
+
+Each profile is started with gunicorn.conf.py against a throwaway
+SQLite database (or DATABASE_URL when set), seeded once. Requests
+alternate between the doctor and the seeded clients. Results are
+printed as JSON.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+OVERVIEW = "/api/overview_customer/"
+ENDPOINTS = ("/api/dashboard/", OVERVIEW)
+
+
+def _seed(env, clients, patients, visits):
+    """
+    Migrate and seed in a child process. Returns (token, overview query)
+    per user: the doctor reads a client's overview via ?client=.
+    """
+
+    subprocess.run(
+        [sys.executable, "manage.py", "migrate", "--noinput", "-v", "0"],
+        cwd=BASE_DIR, env=env, check=True,
+    )
+    script = f"""
+import json
+from Vetmanagementsystem.serializers import ClaimsTokenObtainPairSerializer
+from Vetmanagementsystem.tests.fixtures import make_client, make_doctor, seed_clinic
+
+doctor = make_doctor("bench-doctor")
+pairs = [make_client(f"bench-client-{{index}}") for index in range({clients})]
+seed_clinic(doctor, [client for _, client in pairs], {patients}, {visits})
+users = [(doctor, f"?client={{pairs[0][1].id}}")] + [(user, "") for user, _ in pairs]
+print(json.dumps([
+    [str(ClaimsTokenObtainPairSerializer.get_token(user).access_token), query]
+    for user, query in users
+]))
+"""
+    output = subprocess.run(
+        [sys.executable, "manage.py", "shell", "-c", script],
+        cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port():
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(port, process, timeout=30):
+
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+
+    raise RuntimeError("gunicorn did not start in time")
+
+
+def _load(port, path, users, concurrency, seconds):
+    """Closed-loop load: `concurrency` keep-alive clients for `seconds`."""
+
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker(offset):
+
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        own = []
+        failed = 0
+        count = offset
+
+        while time.monotonic() < deadline:
+            token, query = users[count % len(users)]
+            url = path + query if path == OVERVIEW else path
+            count += 1
+            started = time.perf_counter()
+            try:
+                connection.request("GET", url, headers={"Authorization": f"Bearer {token}"})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            own.append(time.perf_counter() - started)
+
+        connection.close()
+
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+
+    if not latencies:
+        return {"requests": 0, "errors": errors[0]}
+
+    def percentile(fraction):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 2)
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "throughput_rps": round(len(latencies) / seconds, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 2),
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+        },
+    }
+
+
+def run_mode(mode, env, users, args):
+
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+        cwd=BASE_DIR,
+        env={
+            **env,
+            "SERVER_MODE": mode,
+            "WEB_CONCURRENCY": str(args.workers),
+            "PORT": str(port),
+        },
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        _wait_until_up(port, process)
+
+        for path in ENDPOINTS:
+            _load(port, path, users, args.concurrency, min(args.seconds, 2))
+
+        return {
+            path: _load(port, path, users, args.concurrency, args.seconds)
+            for path in ENDPOINTS
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=("wsgi", "asgi"), default=["wsgi", "asgi"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--patients", type=int, default=3, help="Patients per client.")
+    parser.add_argument("--visits", type=int, default=4, help="Visits per patient.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        env = {**os.environ, "DEBUG": "False", "SQLITE_PATH": str(Path(scratch) / "bench.sqlite3")}
+        users = _seed(env, args.clients, args.patients, args.visits)
+
+        results = {
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "seconds": args.seconds,
+            "dataset": {
+                "clients": args.clients,
+                "patients_per_client": args.patients,
+                "visits_per_patient": args.visits,
+            },
+            "modes": {mode: run_mode(mode, env, users, args) for mode in args.modes},
+        }
+
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# gunicorn.conf.py
+"""
+Serving profiles, chosen with SERVER_MODE:
+
+    wsgi (default)  sync workers running Veterinarymanagementsystem.wsgi
+    asgi            uvicorn workers running Veterinarymanagementsystem.asgi;
+                    the dashboard and overview switch to async views;
+                    exports and downloads are streamed from async
+                    iterators (Vetmanagementsystem/streaming.py)
+
+    gunicorn --config gunicorn.conf.py
+
+WEB_CONCURRENCY sets the worker count in both profiles, so the two
+can be compared like for like (see benchmarks/serve_modes.py).
+
+Workers write request metrics to PROMETHEUS_MULTIPROC_DIR, which is
+emptied at startup; /metrics merges them.
+"""
+import glob
+import os
+import tempfile
+
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi").strip().lower()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "Veterinarymanagementsystem.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "Veterinarymanagementsystem.wsgi:application"
+    worker_class = "sync"
+
+
+# Set before the workers fork, so prometheus_client sees it on import.
+METRICS_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), f"vetms-metrics-{os.getpid()}"),
+)
+
+
+def on_starting(server):
+    # Samples left by a previous run would be merged into this one's.
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.db")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -97,6 +97,27 @@ export const getDocuments = () => API.get("documents/");
 export const getAllergies = () => API.get("allergies/");
 export const getTreatments = () => API.get("treatments/");
 export const getOverview = () => API.get("overview_customer/"); // client overview
+export const revokeTokens = (refresh) => API.post("logout/", { refresh }); // deny-list
+
+// ------------------
+// Every row of a paginated list: follows `next` until it is null.
+// Lists are pages of 50 by default; ask for the largest page instead.
+// ------------------
+export const LIST_PAGE_SIZE = 500;
+
+export async function listAll(url, params = {}, client = API) {
+  const rows = [];
+  let res = await client.get(url, { params: { page_size: LIST_PAGE_SIZE, ...params } });
+
+  for (;;) {
+    const data = res.data;
+    if (Array.isArray(data)) return data;
+    if (Array.isArray(data?.results)) rows.push(...data.results);
+    if (!data?.next) return rows;
+    // `next` is absolute and already carries the cursor and page size.
+    res = await client.get(data.next);
+  }
+}
 
 // ------------------
 // Set tokens after login
@@ -1 +1 @@
-export { default, setTokens, clearTokens } from "./api.js";
+export { default, setTokens, clearTokens, listAll } from "./api.js";
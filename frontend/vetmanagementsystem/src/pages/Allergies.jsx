@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 
 export default function Allergies() {
   const [patients, setPatients] = useState([]);
@@ -18,16 +18,9 @@ export default function Allergies() {
     loadAllergies();
   }, []);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   async function loadPatients() {
     try {
-      const res = await API.get("/patients/");
-      setPatients(toList(res.data));
+      setPatients(await listAll("/patients/"));
     } catch (err) {
       console.error("loadPatients:", err);
       setStatus("Could not load patients");
@@ -36,8 +29,7 @@ export default function Allergies() {
 
   async function loadAllergies() {
     try {
-      const res = await API.get("/allergies/");
-      setAllergies(toList(res.data));
+      setAllergies(await listAll("/allergies/"));
     } catch (err) {
       console.error("loadAllergies:", err);
       setStatus("Could not load allergies");
@@ -1,5 +1,5 @@
 import React, { useEffect, useMemo, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 
 export default function Appointments() {
   const [clients, setClients] = useState([]);
@@ -20,16 +20,9 @@ export default function Appointments() {
     loadAppointments();
   }, []);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   async function loadClients() {
     try {
-      const res = await API.get("/clients/");
-      setClients(toList(res.data));
+      setClients(await listAll("/clients/"));
     } catch (err) {
       console.error(err);
     }
@@ -37,8 +30,7 @@ export default function Appointments() {
 
   async function loadPatients() {
     try {
-      const res = await API.get("/patients/");
-      setPatients(toList(res.data));
+      setPatients(await listAll("/patients/"));
     } catch (err) {
       console.error(err);
     }
@@ -46,8 +38,7 @@ export default function Appointments() {
 
   async function loadAppointments() {
     try {
-      const res = await API.get("/appointments/");
-      setAppointments(toList(res.data));
+      setAppointments(await listAll("/appointments/"));
     } catch (err) {
       console.error(err);
       setStatus("Could not load appointments");
@@ -1,5 +1,5 @@
 import React, { useEffect, useMemo, useRef, useState } from "react";
-import API from "../api";
+import { listAll } from "../api";
 import { logout } from "../utils/auth";
 
 export default function CustomerDashboard() {
@@ -33,13 +33,6 @@ export default function CustomerDashboard() {
   const [chartLabels, setChartLabels] = useState([]);
   const [chartData, setChartData] = useState([]);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    if (Array.isArray(data?.data)) return data.data;
-    return [];
-  }
-
   function monthlyVisits(visits) {
     const grouped = {};
     visits.forEach((v) => {
@@ -64,18 +57,18 @@ export default function CustomerDashboard() {
 
     async function loadData() {
       const [patientsRes, appointmentsRes, receiptsRes, visitsRes, clientsRes] = await Promise.allSettled([
-        API.get("/patients/"),
-        API.get("/appointments/"),
-        API.get("/receipts/"),
-        API.get("/visits/"),
-        API.get("/clients/"),
+        listAll("/patients/"),
+        listAll("/appointments/"),
+        listAll("/receipts/"),
+        listAll("/visits/"),
+        listAll("/clients/"),
       ]);
 
-      const patients = patientsRes.status === "fulfilled" ? toList(patientsRes.value.data) : [];
-      const appointments = appointmentsRes.status === "fulfilled" ? toList(appointmentsRes.value.data) : [];
-      const receipts = receiptsRes.status === "fulfilled" ? toList(receiptsRes.value.data) : [];
-      const visits = visitsRes.status === "fulfilled" ? toList(visitsRes.value.data) : [];
-      const clients = clientsRes.status === "fulfilled" ? toList(clientsRes.value.data) : [];
+      const patients = patientsRes.status === "fulfilled" ? patientsRes.value : [];
+      const appointments = appointmentsRes.status === "fulfilled" ? appointmentsRes.value : [];
+      const receipts = receiptsRes.status === "fulfilled" ? receiptsRes.value : [];
+      const visits = visitsRes.status === "fulfilled" ? visitsRes.value : [];
+      const clients = clientsRes.status === "fulfilled" ? clientsRes.value : [];
 
       const paidCount = receipts.filter((r) => String(r?.status || "").toLowerCase() === "paid").length;
       const receiptsTotal = receipts.reduce((sum, r) => sum + (Number.parseFloat(r?.amount) || 0), 0);
@@ -31,39 +31,26 @@ export default function CustomerOverview() {
       setLoading(true);
       setError("");
       try {
-        const endpoints = {
-          allergies: "/allergies/",
-          visits: "/visits/",
-          vitals: "/vitals/",
-          medical_notes: "/medical-notes/",
-          medications: "/medications/",
-          documents: "/documents/",
-          treatments: "/treatments/",
-        };
+        const sections = [
+          "allergies",
+          "visits",
+          "vitals",
+          "medical_notes",
+          "medications",
+          "documents",
+          "treatments",
+        ];
 
-        const keys = Object.keys(endpoints);
-        const [patientsRes, ...responses] = await Promise.allSettled([
-          API.get("/patients/"),
-          ...keys.map((k) => API.get(endpoints[k])),
-        ]);
-
-        if (patientsRes.status === "fulfilled") {
-          const patientList = toList(patientsRes.value.data);
-          setPatients(patientList);
-          if (patientList.length === 1) {
-            setSelectedPatientId(String(patientList[0].id ?? patientList[0].patient_id));
-          }
-        } else {
-          setPatients([]);
+        const res = await API.get("/overview_customer/");
+        const patientList = toList(res.data?.patients);
+        setPatients(patientList);
+        if (patientList.length === 1) {
+          setSelectedPatientId(String(patientList[0].id ?? patientList[0].patient_id));
         }
 
         const next = { ...data };
-        keys.forEach((k, idx) => {
-          if (responses[idx].status === "fulfilled") {
-            next[k] = toList(responses[idx].value.data);
-          } else {
-            next[k] = [];
-          }
+        sections.forEach((k) => {
+          next[k] = patientList.flatMap((p) => toList(p?.[k]));
         });
 
         setData(next);
@@ -15,10 +15,11 @@ export default function DoctorDashboard() {
   const [menuOpen, setMenuOpen] = useState(false);
   const didLoadRef = useRef(false);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
+  function toCount(data) {
+    if (typeof data?.count === "number") return data.count;
+    if (Array.isArray(data)) return data.length;
+    if (Array.isArray(data?.results)) return data.results.length;
+    return 0;
   }
 
   useEffect(() => {
@@ -28,14 +29,14 @@ export default function DoctorDashboard() {
     async function fetchData() {
       try {
         const [patientsRes, visitsRes, treatmentsRes] = await Promise.allSettled([
-          API.get("/patients/"),
-          API.get("/visits/"),
-          API.get("/treatments/"),
+          API.get("/patients/", { params: { count_only: 1 } }),
+          API.get("/visits/", { params: { count_only: 1 } }),
+          API.get("/treatments/", { params: { count_only: 1 } }),
         ]);
 
-        const patients = patientsRes.status === "fulfilled" ? toList(patientsRes.value.data).length : 0;
-        const visits = visitsRes.status === "fulfilled" ? toList(visitsRes.value.data).length : 0;
-        const treatments = treatmentsRes.status === "fulfilled" ? toList(treatmentsRes.value.data).length : 0;
+        const patients = patientsRes.status === "fulfilled" ? toCount(patientsRes.value.data) : 0;
+        const visits = visitsRes.status === "fulfilled" ? toCount(visitsRes.value.data) : 0;
+        const treatments = treatmentsRes.status === "fulfilled" ? toCount(treatmentsRes.value.data) : 0;
 
         setStats({ patients, visits, treatments });
       } catch (err) {
@@ -1,5 +1,5 @@
 import React, { useEffect, useMemo, useState } from "react";
-import API from "../api";
+import { listAll } from "../api";
 
 export default function DoctorOverview() {
   const [clients, setClients] = useState([]);
@@ -11,12 +11,6 @@ export default function DoctorOverview() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   function getClientIdFrom(item) {
     if (!item) return null;
     if (item.client && typeof item.client === "object") return item.client.id ?? item.client.pk ?? null;
@@ -51,16 +45,16 @@ export default function DoctorOverview() {
       setError("");
       try {
         const [clientsRes, apptsRes, receiptsRes] = await Promise.allSettled([
-          API.get("/clients/"),
-          API.get("/appointments/"),
-          API.get("/receipts/"),
+          listAll("/clients/"),
+          listAll("/appointments/"),
+          listAll("/receipts/"),
         ]);
 
         if (!mounted) return;
 
-        setClients(clientsRes.status === "fulfilled" ? toList(clientsRes.value.data) : []);
-        setAppointments(apptsRes.status === "fulfilled" ? toList(apptsRes.value.data) : []);
-        setReceipts(receiptsRes.status === "fulfilled" ? toList(receiptsRes.value.data) : []);
+        setClients(clientsRes.status === "fulfilled" ? clientsRes.value : []);
+        setAppointments(apptsRes.status === "fulfilled" ? apptsRes.value : []);
+        setReceipts(receiptsRes.status === "fulfilled" ? receiptsRes.value : []);
 
         if (clientsRes.status !== "fulfilled" && apptsRes.status !== "fulfilled" && receiptsRes.status !== "fulfilled") {
           setError("Failed to load overview data.");
@@ -1,5 +1,5 @@
 ﻿import React, { useEffect, useRef, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 import { crudThemeStyles } from "../styles/crudThemeStyles";
 import { generatePatientReportPdf, loadPatientReportData } from "../utils/patientReportPdf";
 
@@ -25,16 +25,9 @@ export default function Documents() {
     loadDocuments();
   }, []);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   async function loadPatients() {
     try {
-      const res = await API.get("/patients/");
-      setPatients(toList(res.data));
+      setPatients(await listAll("/patients/"));
     } catch (err) {
       console.error(err);
     }
@@ -42,8 +35,7 @@ export default function Documents() {
 
   async function loadClients() {
     try {
-      const res = await API.get("/clients/");
-      setClients(toList(res.data));
+      setClients(await listAll("/clients/"));
     } catch (err) {
       console.error(err);
     }
@@ -51,8 +43,7 @@ export default function Documents() {
 
   async function loadDocuments() {
     try {
-      const res = await API.get("/documents/");
-      setDocuments(toList(res.data));
+      setDocuments(await listAll("/documents/"));
     } catch (err) {
       console.error(err);
       setStatus("Could not load documents");
@@ -1,5 +1,6 @@
 import { useEffect } from "react";
 import { useNavigate, useSearchParams } from "react-router-dom";
+import { revokeTokens } from "../api/api";
 
 export default function Logout() {
   const navigate = useNavigate();
@@ -8,6 +9,11 @@ export default function Logout() {
   useEffect(() => {
     const roleFromQuery = searchParams.get("role");
     const role = roleFromQuery || localStorage.getItem("role");
+    const refresh = localStorage.getItem("refresh_token");
+
+    if (refresh) {
+      revokeTokens(refresh).catch(() => {});
+    }
 
     localStorage.removeItem("access_token");
     localStorage.removeItem("refresh_token");
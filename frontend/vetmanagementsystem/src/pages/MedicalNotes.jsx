@@ -1,5 +1,5 @@
 ﻿import React, { useEffect, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 import { crudThemeStyles } from "../styles/crudThemeStyles";
 
 export default function MedicalNotes() {
@@ -19,16 +19,9 @@ export default function MedicalNotes() {
     loadNotes();
   }, []);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   async function loadPatients() {
     try {
-      const res = await API.get("/patients/");
-      setPatients(toList(res.data));
+      setPatients(await listAll("/patients/"));
     } catch (err) {
       console.error(err);
     }
@@ -40,8 +33,7 @@ export default function MedicalNotes() {
       return;
     }
     try {
-      const res = await API.get(`/visits/?patient=${encodeURIComponent(patientId)}`);
-      setVisits(toList(res.data));
+      setVisits(await listAll(`/visits/?patient=${encodeURIComponent(patientId)}`));
     } catch (err) {
       console.error(err);
       setVisits([]);
@@ -50,8 +42,7 @@ export default function MedicalNotes() {
 
   async function loadNotes() {
     try {
-      const res = await API.get("/medical-notes/");
-      setNotes(toList(res.data));
+      setNotes(await listAll("/medical-notes/"));
     } catch (err) {
       console.error(err);
       setStatus("Could not load notes");
@@ -1,5 +1,5 @@
 ﻿import React, { useEffect, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 import { crudThemeStyles } from "../styles/crudThemeStyles";
 
 export default function Medications() {
@@ -23,16 +23,9 @@ export default function Medications() {
     loadMedications();
   }, []);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   async function loadPatients() {
     try {
-      const res = await API.get("/patients/");
-      setPatients(toList(res.data));
+      setPatients(await listAll("/patients/"));
     } catch (err) {
       console.error(err);
     }
@@ -41,8 +34,7 @@ export default function Medications() {
   async function loadVisits(patientId) {
     if (!patientId) return setVisits([]);
     try {
-      const res = await API.get(`/visits/?patient=${encodeURIComponent(patientId)}`);
-      setVisits(toList(res.data));
+      setVisits(await listAll(`/visits/?patient=${encodeURIComponent(patientId)}`));
     } catch (err) {
       console.error(err);
       setVisits([]);
@@ -51,8 +43,7 @@ export default function Medications() {
 
   async function loadMedications() {
     try {
-      const res = await API.get("/medications/");
-      setMedications(toList(res.data));
+      setMedications(await listAll("/medications/"));
     } catch (err) {
       console.error(err);
       setStatus("Could not load medications");
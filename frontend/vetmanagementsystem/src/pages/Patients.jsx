@@ -1,5 +1,5 @@
 ﻿import React, { useEffect, useRef, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 import { crudThemeStyles } from "../styles/crudThemeStyles";
 
 export default function Patients() {
@@ -34,13 +34,6 @@ export default function Patients() {
     await loadPatients(client);
   }
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    if (Array.isArray(data?.data)) return data.data;
-    return [];
-  }
-
   async function loadPatients(clientOverride = null) {
     try {
       const activeClient = clientOverride || currentClient;
@@ -51,8 +44,8 @@ export default function Patients() {
         ""
       );
 
-      const res = await API.get("/patients/");
-      let list = toList(res.data);
+      // Every page: the client filter below must see all of their patients.
+      let list = await listAll("/patients/");
 
       if (activeClientId) {
         list = list.filter(
@@ -61,12 +54,6 @@ export default function Patients() {
       }
 
       setPatients(list);
-      list.forEach((p) => {
-        if (p?.photo_data && String(p.photo_data).startsWith("data:image/")) {
-          const keys = [p.id, p.patient_id].filter(Boolean);
-          cachePhotoForKeys(keys, p.photo_data);
-        }
-      });
     } catch (err) {
       console.error(err);
       setStatus("Could not load patients");
@@ -80,8 +67,7 @@ export default function Patients() {
     const email = String(localStorage.getItem("email") || "").toLowerCase();
 
     try {
-      const res = await API.get("/clients/");
-      const list = toList(res.data);
+      const list = await listAll("/clients/");
       if (!list.length) {
         setCurrentClient(null);
         setStatus("Could not load logged customer");
@@ -161,8 +147,8 @@ export default function Patients() {
   }
 
   function getPhotoForPatient(patient) {
-    if (patient?.photo_data && String(patient.photo_data).startsWith("data:image/")) {
-      return patient.photo_data;
+    if (patient?.photo_thumbnail_url) {
+      return patient.photo_thumbnail_url;
     }
     return getCachedPhotoForPatient(patient);
   }
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 
 export default function Receipts() {
   const [receipts, setReceipts] = useState([]);
@@ -18,16 +18,9 @@ export default function Receipts() {
     loadClients();
   }, []);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   async function loadReceipts() {
     try {
-      const res = await API.get("/receipts/");
-      setReceipts(toList(res.data));
+      setReceipts(await listAll("/receipts/"));
     } catch (err) {
       console.error(err);
       setStatus("Could not load receipts");
@@ -36,8 +29,7 @@ export default function Receipts() {
 
   async function loadClients() {
     try {
-      const res = await API.get("/clients/");
-      setClients(toList(res.data));
+      setClients(await listAll("/clients/"));
     } catch (err) {
       console.error(err);
     }
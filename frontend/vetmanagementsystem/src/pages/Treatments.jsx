@@ -1,5 +1,5 @@
 ﻿import React, { useEffect, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 import { crudThemeStyles } from "../styles/crudThemeStyles";
 
 export default function Treatments() {
@@ -22,16 +22,9 @@ export default function Treatments() {
     loadTreatments();
   }, []);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   async function loadPatients() {
     try {
-      const res = await API.get("/patients/");
-      setPatients(toList(res.data));
+      setPatients(await listAll("/patients/"));
     } catch (err) {
       console.error(err);
     }
@@ -40,8 +33,7 @@ export default function Treatments() {
   async function loadVisits(patientId) {
     if (!patientId) return setVisits([]);
     try {
-      const res = await API.get(`/visits/?patient=${encodeURIComponent(patientId)}`);
-      setVisits(toList(res.data));
+      setVisits(await listAll(`/visits/?patient=${encodeURIComponent(patientId)}`));
     } catch (err) {
       console.error(err);
       setVisits([]);
@@ -50,8 +42,7 @@ export default function Treatments() {
 
   async function loadTreatments() {
     try {
-      const res = await API.get("/treatments/");
-      setTreatments(toList(res.data));
+      setTreatments(await listAll("/treatments/"));
     } catch (err) {
       console.error(err);
       setStatus("Could not load treatments");
@@ -1,5 +1,5 @@
 ﻿import React, { useEffect, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 import { crudThemeStyles } from "../styles/crudThemeStyles";
 
 export default function Visits() {
@@ -32,8 +32,7 @@ export default function Visits() {
 
   async function loadPatients() {
     try {
-      const res = await API.get("/patients/");
-      setPatients(toList(res.data));
+      setPatients(await listAll("/patients/"));
     } catch (err) {
       console.error(err);
     }
@@ -56,8 +55,7 @@ export default function Visits() {
 
   async function loadVisits() {
     try {
-      const res = await API.get("/visits/");
-      setVisits(toList(res.data));
+      setVisits(await listAll("/visits/"));
     } catch (err) {
       console.error(err);
       setStatus("Could not load visits");
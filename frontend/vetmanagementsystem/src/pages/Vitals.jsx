@@ -1,5 +1,5 @@
 ﻿import React, { useEffect, useState } from "react";
-import API from "../api";
+import API, { listAll } from "../api";
 import { crudThemeStyles } from "../styles/crudThemeStyles";
 
 export default function Vitals() {
@@ -24,16 +24,9 @@ export default function Vitals() {
     loadVitals();
   }, []);
 
-  function toList(data) {
-    if (Array.isArray(data)) return data;
-    if (Array.isArray(data?.results)) return data.results;
-    return [];
-  }
-
   async function loadPatients() {
     try {
-      const res = await API.get("/patients/");
-      setPatients(toList(res.data));
+      setPatients(await listAll("/patients/"));
     } catch (err) {
       console.error(err);
     }
@@ -45,8 +38,7 @@ export default function Vitals() {
       return;
     }
     try {
-      const res = await API.get(`/visits/?patient=${patientId}`);
-      setVisits(toList(res.data));
+      setVisits(await listAll(`/visits/?patient=${patientId}`));
     } catch (err) {
       console.error(err);
       setVisits([]);
@@ -55,8 +47,7 @@ export default function Vitals() {
 
   async function loadVitals() {
     try {
-      const res = await API.get("/vitals/");
-      setVitals(toList(res.data));
+      setVitals(await listAll("/vitals/"));
     } catch (err) {
       console.error(err);
       setStatus("Could not load vitals");
@@ -1,3 +1,5 @@
+import { listAll } from "../api";
+
 const SECTION_ENDPOINTS = {
   allergies: "/allergies/",
   visits: "/visits/",
@@ -10,12 +12,6 @@ const SECTION_ENDPOINTS = {
   receipts: "/receipts/",
 };
 
-function toList(data) {
-  if (Array.isArray(data)) return data;
-  if (Array.isArray(data?.results)) return data.results;
-  return [];
-}
-
 function normalizeId(v) {
   if (v === null || v === undefined || v === "") return "";
   return String(v);
@@ -39,19 +35,19 @@ export function getPatientIdFromRecord(sectionKey, item, visitPatientMap) {
 
 export async function loadPatientReportData(API, patientId) {
   const [patientsRes, clientsRes, ...sectionResults] = await Promise.allSettled([
-    API.get("/patients/"),
-    API.get("/clients/"),
-    ...Object.values(SECTION_ENDPOINTS).map((url) => API.get(url)),
+    listAll("/patients/", {}, API),
+    listAll("/clients/", {}, API),
+    ...Object.values(SECTION_ENDPOINTS).map((url) => listAll(url, {}, API)),
   ]);
 
-  const patients = patientsRes.status === "fulfilled" ? toList(patientsRes.value.data) : [];
-  const clients = clientsRes.status === "fulfilled" ? toList(clientsRes.value.data) : [];
+  const patients = patientsRes.status === "fulfilled" ? patientsRes.value : [];
+  const clients = clientsRes.status === "fulfilled" ? clientsRes.value : [];
   const patient = patients.find((p) => normalizeId(p.id ?? p.patient_id) === normalizeId(patientId));
   const patientClientId = normalizeId(patient?.client?.id ?? patient?.client_id ?? patient?.client);
 
   const sections = {};
   const visitItems = sectionResults[Object.keys(SECTION_ENDPOINTS).indexOf("visits")];
-  const visits = visitItems?.status === "fulfilled" ? toList(visitItems.value.data) : [];
+  const visits = visitItems?.status === "fulfilled" ? visitItems.value : [];
   const visitPatientMap = {};
   visits.forEach((visit) => {
     const visitId = normalizeId(visit.id ?? visit.visit_id);
@@ -63,7 +59,7 @@ export async function loadPatientReportData(API, patientId) {
 
   Object.keys(SECTION_ENDPOINTS).forEach((key, idx) => {
     const r = sectionResults[idx];
-    const items = r.status === "fulfilled" ? toList(r.value.data) : [];
+    const items = r.status === "fulfilled" ? r.value : [];
     if (key === "receipts") {
       sections[key] = items.filter((x) => {
         const receiptClientId = normalizeId(x.client?.id ?? x.client_id ?? x.client);
@@ -127,8 +123,8 @@ function getCachedPatientPhoto(patient) {
 }
 
 function getPatientPhotoData(patient) {
-  if (patient?.photo_data && String(patient.photo_data).startsWith("data:image/")) {
-    return String(patient.photo_data);
+  if (patient?.photo_url) {
+    return String(patient.photo_url);
   }
   return getCachedPatientPhoto(patient);
 }
@@ -164,6 +160,7 @@ async function normalizePhotoForPdf(dataUrl) {
       }
     };
     img.onerror = () => resolve(null);
+    img.crossOrigin = "anonymous";
     img.src = dataUrl;
   });
 }